@@ -0,0 +1,157 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+import threading
+
+import fixtures
+from oslo_config import cfg
+from tempest import config
+from tempest.lib import exceptions
+from tempest.tests import fake_config
+import testtools
+
+from watcher_tempest_plugin import config as watcher_config
+from watcher_tempest_plugin.services import base
+from watcher_tempest_plugin.services.infra_optim.v1.json import client
+
+
+class FakeAuthProvider:
+    """Auth provider serving a fixed endpoint without keystone."""
+
+    def __init__(self, base_url='http://watcher/'):
+        self.url = base_url
+
+    def auth_request(self, method, url, headers=None, body=None,
+                     filters=None):
+        # Resources may be given with a leading slash, e.g., '/audits'
+        path = '/'.join(part for part in url.split('/') if part)
+        return self.url + path, dict(headers or {}), body
+
+    def base_url(self, filters, auth_data=None):
+        return self.url
+
+
+class FakeResponse(dict):
+    """Response compatible with tempest.lib.common.http."""
+
+    def __init__(self, status, headers=None):
+        super(FakeResponse, self).__init__(headers or {})
+        self.status = status
+        self['status'] = str(status)
+        self.reason = None
+        self.version = 11
+
+
+class FakeHttp:
+    """HTTP transport answering the requests with a handler.
+
+    The handler is called with the method, URL, headers and body of every
+    request, and returns the status, the headers and the body of the
+    response. A dict or list body is sent as JSON.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def request(self, url, method, headers=None, body=None, **kwargs):
+        with self._lock:
+            self.requests.append((method, url))
+        status, resp_headers, resp_body = self.handler(
+            method, url, headers or {}, body)
+        if isinstance(resp_body, (dict, list)):
+            resp_body = json.dumps(resp_body).encode('utf-8')
+        return FakeResponse(status, resp_headers), resp_body
+
+
+class FakeClock(fixtures.Fixture):
+    """Patch time.monotonic in a module, the time being set with .now."""
+
+    def __init__(self, module):
+        super(FakeClock, self).__init__()
+        self.module = module
+
+    def _setUp(self):
+        self.now = 1000.0
+        self.useFixture(fixtures.MockPatchObject(
+            self.module.time, 'monotonic', side_effect=lambda: self.now))
+
+
+class FakeCmdClient(base.BaseCmdClient):
+    """Command client answering the commands with a handler.
+
+    The handler is called with the command and its input data, which is
+    joined when streamed, and returns the stdout of the command, or a
+    (stdout, stderr, exit_status) tuple. Commands are recorded in
+    .calls.
+    """
+
+    def __init__(self, handler=lambda cmd, input_data: ''):
+        self.handler = handler
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def run_cmd(self, cmd, input_data=None, timeout=None):
+        if input_data is not None:
+            input_data = b''.join(
+                bytes(chunk) for chunk in base._iter_input_chunks(
+                    input_data)).decode('utf-8')
+        with self._lock:
+            self.calls.append((cmd, input_data))
+        result = self.handler(cmd, input_data)
+        if isinstance(result, str):
+            result = (result, '', 0)
+        return base.CmdResult(*result)
+
+    def exec_cmd(self, cmd, input_data=None, timeout=None):
+        result = self.run_cmd(cmd, input_data=input_data, timeout=timeout)
+        if result.exit_status != 0:
+            raise exceptions.SSHExecCommandFailed(
+                command=cmd, exit_status=result.exit_status,
+                stderr=result.stderr, stdout=result.stdout)
+        return result.stdout
+
+
+class TestCase(testtools.TestCase):
+    """Base class of the unit tests of the plugin services.
+
+    The tests run without any cloud nor tempest configuration file, the
+    options of tempest and of the plugin keep their default values unless
+    overridden with self.config.
+    """
+
+    def setUp(self):
+        super(TestCase, self).setUp()
+        self.config_fixture = self.useFixture(fake_config.ConfigFixture())
+        # The options are registered by tempest when the plugin is installed
+        if watcher_config.optimization_group.name not in cfg.CONF:
+            cfg.CONF.register_group(watcher_config.optimization_group)
+            cfg.CONF.register_opts(watcher_config.OptimizationGroup,
+                                   watcher_config.optimization_group)
+        self.useFixture(fixtures.MockPatchObject(
+            config, 'TempestConfigPrivate', fake_config.FakePrivate))
+
+    def config(self, **kwargs):
+        """Override options of the [optimize] group."""
+        self.config_fixture.config(
+            group=watcher_config.optimization_group.name, **kwargs)
+
+    def infra_optim_client(self, handler):
+        """Return a Watcher API client answered by a FakeHttp handler."""
+        api = client.InfraOptimClientJSON(
+            FakeAuthProvider(), 'infra-optim', 'RegionOne')
+        api.http_obj = FakeHttp(handler)
+        return api
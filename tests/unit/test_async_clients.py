@@ -0,0 +1,198 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import asyncio
+import ssl
+from unittest import mock
+
+from tempest.lib import exceptions
+import testtools
+
+from tests.unit import base
+from watcher_tempest_plugin.services import async_base
+from watcher_tempest_plugin.services.infra_optim.v1.json import (
+    async_client
+)
+
+web = None
+if async_base.aiohttp is not None:
+    from aiohttp import web
+
+AUDITS = [{'uuid': f'audit-{i}'} for i in range(5)]
+
+
+class FakeAuthProvider:
+
+    def __init__(self, base_url):
+        self.url = base_url
+
+    def auth_request(self, method, url, headers=None, body=None,
+                     filters=None):
+        # Resources may be given with a leading slash, e.g., '/audits'
+        path = '/'.join(part for part in url.split('/') if part)
+        return self.url + path, dict(headers or {}), body
+
+    def base_url(self, filters, auth_data=None):
+        return self.url
+
+
+@testtools.skipIf(web is None, "aiohttp is not installed")
+class TestAsyncInfraOptimClient(base.TestCase):
+
+    def setUp(self):
+        super(TestAsyncInfraOptimClient, self).setUp()
+        self.requests = []
+        self.deleted = []
+
+    async def _list_audits(self, request):
+        self.requests.append(dict(request.query))
+        limit = int(request.query.get('limit', len(AUDITS)))
+        uuids = [audit['uuid'] for audit in AUDITS]
+        start = 0
+        if 'marker' in request.query:
+            start = uuids.index(request.query['marker']) + 1
+        page = AUDITS[start:start + limit]
+        body = {'audits': page}
+        if start + limit < len(AUDITS):
+            body['next'] = (f'http://watcher/v1/audits?limit={limit}'
+                            f'&marker={page[-1]["uuid"]}')
+        return web.json_response(body)
+
+    async def _show_audit(self, request):
+        uuid = request.match_info['uuid']
+        if uuid == 'missing':
+            return web.json_response({'error_message': 'not found'},
+                                     status=404)
+        return web.json_response({'uuid': uuid})
+
+    async def _list_action_plans(self, request):
+        return web.json_response({'action_plans': [
+            {'uuid': 'plan-1'}, {'uuid': 'plan-2'}]})
+
+    async def _delete_action_plan(self, request):
+        uuid = request.match_info['uuid']
+        self.deleted.append(uuid)
+        if uuid == 'plan-2':
+            return web.json_response({'error_message': 'not found'},
+                                     status=404)
+        return web.Response(status=204)
+
+    def _run(self, test, client=None):
+        """Run a coroutine using a client of a local Watcher API.
+
+        A given client is pointed at the local API and left open, as
+        synchronous tests calling it with asyncio.run() would do.
+        """
+
+        async def _main():
+            app = web.Application()
+            app.router.add_get('/v1/audits', self._list_audits)
+            app.router.add_get('/v1/audits/{uuid}', self._show_audit)
+            app.router.add_get('/v1/action_plans', self._list_action_plans)
+            app.router.add_delete('/v1/action_plans/{uuid}',
+                                  self._delete_action_plan)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = runner.addresses[0][1]
+            try:
+                if client is not None:
+                    client.auth_provider.url = f'http://127.0.0.1:{port}/'
+                    return await test(client)
+                async with async_client.AsyncInfraOptimClient(
+                        FakeAuthProvider(f'http://127.0.0.1:{port}/'),
+                        'infra-optim', 'RegionOne') as new_client:
+                    return await test(new_client)
+            finally:
+                await runner.cleanup()
+
+        return asyncio.run(_main())
+
+    def test_list_all_follows_pages(self):
+        audits = self._run(
+            lambda client: client.list_all('audits', page_size=2))
+
+        self.assertEqual(AUDITS, audits)
+        self.assertEqual([{'limit': '2'},
+                          {'limit': '2', 'marker': 'audit-1'},
+                          {'limit': '2', 'marker': 'audit-3'}],
+                         self.requests)
+
+    def test_client_used_by_successive_event_loops(self):
+        client = async_client.AsyncInfraOptimClient(
+            FakeAuthProvider(''), 'infra-optim', 'RegionOne')
+
+        for _ in range(2):
+            audits = self._run(
+                lambda client: client.list_all('audits', page_size=2),
+                client=client)
+            self.assertEqual(AUDITS, audits)
+        # Only the state of the last loop is kept
+        self.assertEqual(1, len(client._loops))
+
+    def test_show_many_reports_errors_per_item(self):
+        results = self._run(lambda client: client.show_many(
+            'audits', ['audit-1', 'missing', 'audit-2']))
+
+        self.assertEqual(['audit-1', 'missing', 'audit-2'],
+                         [result.uuid for result in results])
+        self.assertEqual({'uuid': 'audit-1'}, results[0].body)
+        self.assertIsNone(results[0].error)
+        self.assertIsNone(results[1].body)
+        self.assertIsInstance(results[1].error, exceptions.NotFound)
+        self.assertEqual({'uuid': 'audit-2'}, results[2].body)
+
+    def test_handle_errors_ignores_awaited_errors(self):
+        result = self._run(lambda client: client.delete_action_plan(
+            'plan-2', ignore_errors=exceptions.NotFound))
+
+        self.assertIsNone(result)
+        self.assertEqual(['plan-2'], self.deleted)
+
+    def test_handle_errors_raises_other_errors(self):
+        self.assertRaises(
+            exceptions.NotFound, self._run,
+            lambda client: client.delete_action_plan('plan-2'))
+
+    def test_delete_action_plans_by_audit(self):
+        self.assertRaises(
+            exceptions.NotFound, self._run,
+            lambda client: client.delete_action_plans_by_audit('audit-1'))
+        self.assertEqual(['plan-1', 'plan-2'], sorted(self.deleted))
+
+
+@testtools.skipIf(web is None, "aiohttp is not installed")
+class TestAsyncClientSsl(base.TestCase):
+
+    def _client(self, **kwargs):
+        return async_client.AsyncInfraOptimClient(
+            FakeAuthProvider('https://watcher/'), 'infra-optim',
+            'RegionOne', **kwargs)
+
+    def test_ssl_verification_disabled(self):
+        client = self._client(disable_ssl_certificate_validation=True)
+        self.assertIs(False, client._ssl_context())
+
+    def test_ssl_default_verification(self):
+        self.assertIs(True, self._client()._ssl_context())
+
+    @mock.patch.object(ssl, 'create_default_context')
+    def test_ssl_ca_certs(self, create_default_context):
+        client = self._client(ca_certs='/etc/ssl/ca.pem')
+
+        self.assertIs(create_default_context.return_value,
+                      client._ssl_context())
+        create_default_context.assert_called_once_with(
+            cafile='/etc/ssl/ca.pem')
@@ -0,0 +1,88 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from urllib import parse
+
+from tests.unit import base
+
+AUDITS = [{'uuid': f'audit-{i}'} for i in range(5)]
+
+
+class TestPagination(base.TestCase):
+
+    def setUp(self):
+        super(TestPagination, self).setUp()
+        self.queries = []
+        # Builds the 'next' link of a page from its query and last item
+        self.next_link = self._next_link
+
+    def _next_link(self, query, last):
+        return (f'http://watcher/v1/audits?limit={query["limit"]}'
+                f'&marker={last["uuid"]}')
+
+    def _list_audits(self, method, url, headers, body):
+        query = dict(parse.parse_qsl(parse.urlsplit(url).query))
+        self.queries.append(query)
+        uuids = [audit['uuid'] for audit in AUDITS]
+        start = 0
+        if 'marker' in query:
+            start = uuids.index(query['marker']) + 1
+        limit = int(query.get('limit', len(AUDITS)))
+        page = AUDITS[start:start + limit]
+        body = {'audits': page}
+        if start + limit < len(AUDITS):
+            body['next'] = self.next_link(query, page[-1])
+        return 200, {}, body
+
+    def test_follows_pages(self):
+        client = self.infra_optim_client(self._list_audits)
+
+        self.assertEqual(AUDITS, client.list_all(
+            'audits', page_size=2, state='SUCCEEDED'))
+        # Filters left out of the 'next' links are kept
+        self.assertEqual([
+            {'state': 'SUCCEEDED', 'limit': '2'},
+            {'state': 'SUCCEEDED', 'limit': '2', 'marker': 'audit-1'},
+            {'state': 'SUCCEEDED', 'limit': '2', 'marker': 'audit-3'},
+        ], self.queries)
+
+    def test_pages_fetched_lazily(self):
+        client = self.infra_optim_client(self._list_audits)
+
+        audits = client.iter_audits(page_size=2)
+        self.assertEqual(AUDITS[:2], [next(audits), next(audits)])
+        self.assertEqual(1, len(self.queries))
+        self.assertEqual(AUDITS[2], next(audits))
+        self.assertEqual(2, len(self.queries))
+
+    def test_stops_at_last_page(self):
+        client = self.infra_optim_client(self._list_audits)
+
+        self.assertEqual(AUDITS, client.list_all('audits', page_size=5))
+        self.assertEqual([{'limit': '5'}], self.queries)
+
+    def test_stops_on_next_link_without_marker(self):
+        self.next_link = lambda query, last: 'http://watcher/v1/audits'
+        client = self.infra_optim_client(self._list_audits)
+
+        self.assertEqual(AUDITS[:2], client.list_all('audits', page_size=2))
+        self.assertEqual(1, len(self.queries))
+
+    def test_stops_on_next_link_with_same_marker(self):
+        self.next_link = lambda query, last: (
+            'http://watcher/v1/audits?limit=2&marker=audit-1')
+        client = self.infra_optim_client(self._list_audits)
+
+        self.assertEqual(AUDITS[:4], client.list_all('audits', page_size=2))
+        self.assertEqual(2, len(self.queries))
@@ -0,0 +1,161 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import multiprocessing
+import os
+from unittest import mock
+
+import fixtures
+import testtools
+
+from watcher_tempest_plugin.services import cassette
+
+
+class FakeCmdClient:
+
+    def __init__(self):
+        self.calls = []
+
+    def exec_cmd(self, cmd, input_data=None, timeout=None):
+        self.calls.append(cmd)
+        return f"output {len(self.calls)}"
+
+
+class EchoCmdClient:
+
+    def exec_cmd(self, cmd, input_data=None, timeout=None):
+        return f"output of {cmd}"
+
+
+def _record_in_worker(directory, worker, barrier):
+    """Record commands in a test worker process, alongside another one."""
+    barrier.wait()
+    recording = cassette.get_cassette(directory, 'promtool', cassette.RECORD)
+    client = cassette.CassetteCmdClient(EchoCmdClient(), recording)
+    for i in range(100):
+        client.exec_cmd(f'{worker} {i}')
+    # Both workers are recording at this point
+    barrier.wait()
+    recording.close()
+
+
+class TestCassette(testtools.TestCase):
+
+    def setUp(self):
+        super(TestCassette, self).setUp()
+        self.path = os.path.join(
+            self.useFixture(fixtures.TempDir()).path, 'promtool.jsonl')
+
+    def _record(self, *cmds):
+        recording = cassette.Cassette(self.path, cassette.RECORD)
+        client = cassette.CassetteCmdClient(FakeCmdClient(), recording)
+        outputs = [client.exec_cmd(cmd) for cmd in cmds]
+        recording.close()
+        return outputs
+
+    def _replay_client(self, **kwargs):
+        return cassette.CassetteCmdClient(
+            None, cassette.Cassette(self.path, cassette.REPLAY, **kwargs))
+
+    def test_record_replaces_previous_recording(self):
+        self._record(['promtool', 'old'])
+        self._record(['promtool', 'new'])
+
+        client = self._replay_client()
+        self.assertEqual('output 1', client.exec_cmd(['promtool', 'new']))
+        self.assertRaises(cassette.CassetteMismatch,
+                          client.exec_cmd, ['promtool', 'old'])
+
+    def test_replay_ignores_time_arguments(self):
+        self._record(['promtool', 'query', 'instant', '--time=1700000000.5',
+                      'http://prometheus', 'up'],
+                     ['curl', '-d', 'start=1700000000', '-d', 'match=x'])
+
+        client = self._replay_client()
+        self.assertEqual('output 1', client.exec_cmd(
+            ['promtool', 'query', 'instant', '--time=1800000000',
+             'http://prometheus', 'up']))
+        self.assertEqual('output 2', client.exec_cmd(
+            ['curl', '-d', 'start=1800000000', '-d', 'match=x']))
+        self.assertRaises(cassette.CassetteMismatch, client.exec_cmd,
+                          ['curl', '-d', 'start=1', '-d', 'match=y'])
+
+    def test_replay_in_recorded_order_then_repeats_last(self):
+        self._record('a', 'b', 'a')
+
+        client = self._replay_client()
+        self.assertEqual('output 2', client.exec_cmd('b'))
+        self.assertEqual('output 1', client.exec_cmd('a'))
+        self.assertEqual('output 3', client.exec_cmd('a'))
+        self.assertEqual('output 3', client.exec_cmd('a'))
+
+    def test_replay_reads_ahead_at_most_max_pending(self):
+        self._record(*[f'cmd {i}' for i in range(10)])
+
+        client = self._replay_client(max_pending=4)
+        self.assertEqual('output 4', client.exec_cmd('cmd 3'))
+        self.assertEqual(3, client.cassette._pending_count)
+        self.assertRaises(cassette.CassetteMismatch,
+                          client.exec_cmd, 'cmd 8')
+        self.assertEqual('output 1', client.exec_cmd('cmd 0'))
+
+
+class TestGetCassette(testtools.TestCase):
+
+    def setUp(self):
+        super(TestGetCassette, self).setUp()
+        self.directory = self.useFixture(fixtures.TempDir()).path
+        self.useFixture(fixtures.MockPatchObject(cassette, '_CASSETTES', {}))
+
+    def test_record_in_parallel_workers(self):
+        context = multiprocessing.get_context('spawn')
+        barrier = context.Barrier(2)
+        workers = [context.Process(target=_record_in_worker,
+                                   args=(self.directory, worker, barrier))
+                   for worker in ('a', 'b')]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(60)
+            self.assertEqual(0, worker.exitcode)
+
+        self.assertEqual(2, len(os.listdir(self.directory)))
+        replay = cassette.CassetteCmdClient(None, cassette.get_cassette(
+            self.directory, 'promtool', cassette.REPLAY))
+        for worker in ('b', 'a'):
+            for i in range(100):
+                self.assertEqual(f"output of {worker} {i}",
+                                 replay.exec_cmd(f'{worker} {i}'))
+
+    def test_record_removes_previous_recordings(self):
+        previous = os.path.join(self.directory, 'promtool.1.jsonl')
+        legacy = os.path.join(self.directory, 'promtool.jsonl')
+        other = os.path.join(self.directory, 'metric.1.jsonl')
+        for path in (previous, legacy, other):
+            with open(path, 'w') as f:
+                f.write('{}\n')
+            os.utime(path, (0, 0))
+        current = os.path.join(self.directory, 'promtool.2.jsonl')
+        with open(current, 'w') as f:
+            f.write('{}\n')
+
+        with mock.patch.object(os, 'getpid', return_value=3):
+            recording = cassette.get_cassette(
+                self.directory, 'promtool', cassette.RECORD)
+        recording.record('cmd', 'true', 0, output='')
+        recording.close()
+
+        self.assertEqual(['metric.1.jsonl', 'promtool.2.jsonl',
+                          'promtool.3.jsonl'],
+                         sorted(os.listdir(self.directory)))
@@ -0,0 +1,138 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import threading
+import time
+
+from tempest.lib import exceptions
+import testtools
+
+from watcher_tempest_plugin.services import base
+
+
+class FakeCmdClient(base.BaseCmdClient):
+    """Command client echoing the commands after a delay."""
+
+    def __init__(self, name, delay=0, exit_status=0, error=None,
+                 running=None):
+        self.name = name
+        self.delay = delay
+        self.exit_status = exit_status
+        self.error = error
+        self.running = running
+        self.calls = []
+
+    def exec_cmd(self, cmd, input_data=None, timeout=None):
+        return self.run_cmd(cmd, input_data=input_data,
+                            timeout=timeout).stdout
+
+    def run_cmd(self, cmd, input_data=None, timeout=None):
+        self.calls.append((cmd, input_data, timeout))
+        if self.running is not None:
+            self.running.enter()
+        try:
+            time.sleep(self.delay)
+        finally:
+            if self.running is not None:
+                self.running.exit()
+        if self.error is not None:
+            raise self.error
+        return base.CmdResult(f'{self.name}: {cmd}', '', self.exit_status)
+
+
+class RunningCounter:
+    """Count the commands running at the same time."""
+
+    def __init__(self):
+        self.current = 0
+        self.maximum = 0
+        self._lock = threading.Lock()
+
+    def enter(self):
+        with self._lock:
+            self.current += 1
+            self.maximum = max(self.maximum, self.current)
+
+    def exit(self):
+        with self._lock:
+            self.current -= 1
+
+
+class TestFanOutCmdExecutor(testtools.TestCase):
+
+    def test_results_in_target_order(self):
+        # The first targets are the last ones to answer
+        clients = {f'compute-{i}': FakeCmdClient(f'compute-{i}',
+                                                 delay=0.05 * (3 - i))
+                   for i in range(4)}
+        executor = base.FanOutCmdExecutor(clients)
+
+        results = executor.run('hostname', input_data='in', timeout=5)
+
+        self.assertEqual(list(clients), list(results))
+        for target, result in results.items():
+            self.assertEqual(target, result.target)
+            self.assertEqual(f'{target}: hostname', result.stdout)
+            self.assertEqual(0, result.exit_status)
+            self.assertIsNone(result.error)
+            self.assertEqual([('hostname', 'in', 5)], clients[target].calls)
+
+    def test_command_per_target(self):
+        clients = {name: FakeCmdClient(name)
+                   for name in ('compute-0', 'compute-1', 'compute-2')}
+        executor = base.FanOutCmdExecutor(clients)
+
+        results = executor.run({'compute-2': 'uptime', 'compute-0': 'date'})
+
+        self.assertEqual(['compute-2', 'compute-0'], list(results))
+        self.assertEqual('compute-2: uptime', results['compute-2'].stdout)
+        self.assertEqual('compute-0: date', results['compute-0'].stdout)
+        self.assertEqual([], clients['compute-1'].calls)
+
+    def test_partial_failure(self):
+        error = exceptions.SSHTimeout(host='compute-1', user='root',
+                                      password=None)
+        clients = {
+            'compute-0': FakeCmdClient('compute-0'),
+            'compute-1': FakeCmdClient('compute-1', error=error),
+            'compute-2': FakeCmdClient('compute-2', exit_status=2),
+        }
+        executor = base.FanOutCmdExecutor(clients)
+
+        results = executor.run('hostname')
+
+        # A target failing does not prevent the others from running
+        self.assertEqual(0, results['compute-0'].exit_status)
+        self.assertIs(error, results['compute-1'].error)
+        self.assertIsNone(results['compute-1'].exit_status)
+        self.assertIsNone(results['compute-1'].stdout)
+        self.assertEqual(2, results['compute-2'].exit_status)
+        self.assertIsNone(results['compute-2'].error)
+        self.assertEqual(['compute-1', 'compute-2'],
+                         sorted(executor.failures(results)))
+
+    def test_concurrency_bound(self):
+        running = RunningCounter()
+        clients = {f'compute-{i}': FakeCmdClient(f'compute-{i}', delay=0.05,
+                                                 running=running)
+                   for i in range(6)}
+        executor = base.FanOutCmdExecutor(clients, max_workers=2)
+
+        results = executor.run('hostname')
+
+        self.assertEqual(6, len(results))
+        self.assertEqual(2, running.maximum)
+
+    def test_no_targets(self):
+        self.assertEqual({}, base.FanOutCmdExecutor({}).run('hostname'))
@@ -0,0 +1,123 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from http import server
+import threading
+from unittest import mock
+
+import fixtures
+import testtools
+import urllib3
+
+from watcher_tempest_plugin.services import http_pool
+
+
+class _Handler(server.BaseHTTPRequestHandler):
+    """Handler answering every GET request on a kept-alive connection."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+class HttpServer(fixtures.Fixture):
+    """Local HTTP server keeping the connections alive."""
+
+    def _setUp(self):
+        self.server = server.ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.daemon_threads = True
+        thread = threading.Thread(target=self.server.serve_forever,
+                                  daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.endpoint = f"http://127.0.0.1:{self.server.server_port}"
+
+
+class TestKeepAliveHttp(testtools.TestCase):
+
+    def setUp(self):
+        super(TestKeepAliveHttp, self).setUp()
+        self.server = self.useFixture(HttpServer())
+        self.http = http_pool.KeepAliveHttp()
+        self.addCleanup(self.http.clear)
+
+    def _get(self, http=None):
+        resp, body = (http or self.http).request(
+            f"{self.server.endpoint}/v1/audits", 'GET')
+        self.assertEqual(200, resp.status)
+        self.assertEqual(b'ok', body)
+
+    def test_connections_reused(self):
+        for _ in range(3):
+            self._get()
+
+        self.assertEqual(
+            {self.server.endpoint: {'requests': 3, 'connections': 1,
+                                    'reused': 2}},
+            self.http.pool_stats())
+
+    def test_counters_outlive_evicted_pools(self):
+        self._get()
+        self._get()
+        # Pools are evicted when more endpoints are used than num_pools
+        self.http.clear()
+        self._get()
+
+        self.assertEqual(
+            {self.server.endpoint: {'requests': 3, 'connections': 2,
+                                    'reused': 1}},
+            self.http.pool_stats())
+
+    def test_shared_pool_stats(self):
+        self.useFixture(fixtures.MockPatchObject(
+            http_pool, '_SHARED_HTTP', {}))
+        http = http_pool.get_shared_http(timeout=5)
+        other = http_pool.get_shared_http(timeout=10)
+        self.addCleanup(http.clear)
+        self.addCleanup(other.clear)
+        self._get(http)
+        self._get(http)
+        self._get(other)
+
+        self.assertEqual(
+            {self.server.endpoint: {'requests': 3, 'connections': 2,
+                                    'reused': 1}},
+            http_pool.pool_stats())
+
+
+class TestSharedHttp(testtools.TestCase):
+
+    def setUp(self):
+        super(TestSharedHttp, self).setUp()
+        patcher = mock.patch.dict(http_pool._SHARED_HTTP, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_same_timeout_settings_share_the_pool(self):
+        http = http_pool.get_shared_http(
+            timeout=urllib3.Timeout(connect=5, read=60))
+
+        self.assertIs(http, http_pool.get_shared_http(
+            timeout=urllib3.Timeout(connect=5, read=60)))
+        self.assertIsNot(http, http_pool.get_shared_http(
+            timeout=urllib3.Timeout(connect=5, read=30)))
+        self.assertEqual(2, len(http_pool._SHARED_HTTP))
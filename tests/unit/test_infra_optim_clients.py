@@ -0,0 +1,42 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from tempest.lib import exceptions
+
+from tests.unit import base
+from watcher_tempest_plugin import infra_optim_clients
+
+
+class TestMetricsRunLabels(base.TestCase):
+
+    def test_unlabelled_by_default(self):
+        self.config(prometheus_stable_series=True)
+        self.assertEqual({}, infra_optim_clients.get_metrics_run_labels())
+
+    def test_random_run_id(self):
+        self.config(metrics_run_label='tempest_run')
+        self.assertEqual({'tempest_run': infra_optim_clients._RUN_ID},
+                         infra_optim_clients.get_metrics_run_labels())
+
+    def test_stable_series_with_fixed_run_id(self):
+        self.config(metrics_run_label='tempest_run', metrics_run_id='ci',
+                    prometheus_stable_series=True)
+        self.assertEqual({'tempest_run': 'ci'},
+                         infra_optim_clients.get_metrics_run_labels())
+
+    def test_stable_series_with_random_run_id(self):
+        self.config(metrics_run_label='tempest_run',
+                    prometheus_stable_series=True)
+        self.assertRaises(exceptions.InvalidConfiguration,
+                          infra_optim_clients.get_metrics_run_labels)
@@ -0,0 +1,124 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+import os
+
+import fixtures
+import testtools
+
+from tests.unit import base
+from watcher_tempest_plugin.services import instrumentation
+
+
+class TestBodySize(testtools.TestCase):
+
+    def test_body_size(self):
+        self.assertEqual(0, instrumentation.body_size(None))
+        self.assertEqual(0, instrumentation.body_size(''))
+        self.assertEqual(3, instrumentation.body_size(b'abc'))
+        # Non-ASCII characters are counted as their UTF-8 bytes
+        self.assertEqual(len('{"name": "été ✓"}'.encode('utf-8')),
+                         instrumentation.body_size('{"name": "été ✓"}'))
+
+
+class TestLatencyHistogram(testtools.TestCase):
+
+    def test_empty(self):
+        histogram = instrumentation.LatencyHistogram()
+
+        self.assertIsNone(histogram.percentile(50))
+        self.assertEqual({'count': 0, 'mean': None, 'min': None,
+                          'max': None, 'p50': None, 'p95': None,
+                          'p99': None, 'bytes_in': 0, 'bytes_out': 0},
+                         histogram.to_dict())
+
+    def test_percentiles(self):
+        histogram = instrumentation.LatencyHistogram()
+        for ms in range(1, 1001):
+            histogram.add(ms / 1000.0, bytes_in=10, bytes_out=1)
+
+        stats = histogram.to_dict()
+        self.assertEqual(1000, stats['count'])
+        self.assertAlmostEqual(0.5005, stats['mean'])
+        self.assertEqual((0.001, 1.0), (stats['min'], stats['max']))
+        # Percentiles are reported with at most a 5% error
+        for name, expected in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99)):
+            self.assertLessEqual(abs(stats[name] - expected),
+                                 expected * 0.05, name)
+        self.assertEqual((10000, 1000),
+                         (stats['bytes_in'], stats['bytes_out']))
+
+    def test_percentiles_within_min_and_max(self):
+        histogram = instrumentation.LatencyHistogram()
+        histogram.add(0.0)
+        histogram.add(0.2)
+
+        # The first bucket holds the latencies up to MIN_LATENCY, and
+        # bucket bounds never exceed the maximum latency
+        self.assertEqual(instrumentation.LatencyHistogram.MIN_LATENCY,
+                         histogram.percentile(1))
+        self.assertEqual(0.2, histogram.percentile(100))
+
+
+class TestRequestStats(testtools.TestCase):
+
+    def test_endpoint_groups_uuids(self):
+        self.assertEqual(
+            'infra-optim GET /v1/audits/{uuid}',
+            instrumentation.RequestStats.endpoint(
+                'infra-optim', 'GET',
+                'v1/audits/6c9e4a2b-1f3d-4e5a-8b7c-0d1e2f3a4b5c?limit=5'))
+        self.assertEqual(
+            'metric POST /v1/metric/{uuid}/measures',
+            instrumentation.RequestStats.endpoint(
+                'metric', 'POST',
+                '/v1/metric/6c9e4a2b1f3d4e5a8b7c0d1e2f3a4b5c/measures'))
+
+    def test_record_snapshot_and_dump(self):
+        stats = instrumentation.RequestStats()
+        stats.record('metric GET /v1/resource', 0.1, bytes_in=5)
+        stats.record('infra-optim GET /v1/audits', 0.2, bytes_out=3)
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            'stats.json')
+
+        stats.dump(path)
+
+        with open(path) as f:
+            dumped = json.load(f)
+        self.assertEqual(stats.snapshot(), dumped)
+        self.assertEqual(['infra-optim GET /v1/audits',
+                          'metric GET /v1/resource'], list(dumped))
+        self.assertEqual(5, dumped['metric GET /v1/resource']['bytes_in'])
+        stats.reset()
+        self.assertEqual({}, stats.snapshot())
+
+
+class TestClientRequestStats(base.TestCase):
+
+    def test_request_sizes(self):
+        stats = instrumentation.RequestStats()
+        self.useFixture(fixtures.MockPatchObject(
+            instrumentation, 'STATS', stats))
+        client = self.infra_optim_client(
+            lambda method, url, headers, body: (200, {}, 'réponse'))
+        body = '{"name": "été"}'
+
+        client.request('POST', 'v1/audits', body=body)
+
+        endpoint = stats.snapshot()['infra-optim POST /v1/audits']
+        self.assertEqual(1, endpoint['count'])
+        self.assertEqual(len(body.encode('utf-8')), endpoint['bytes_out'])
+        self.assertEqual(len('réponse'.encode('utf-8')),
+                         endpoint['bytes_in'])
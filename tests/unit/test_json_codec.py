@@ -0,0 +1,83 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import datetime
+import json
+from unittest import mock
+
+import testtools
+
+from tests.unit import base
+from watcher_tempest_plugin.services import json_codec
+
+DOCUMENT = {'uuid': 'audit-1', 'name': 'audité ✓', 'interval': 3600,
+            'parameters': {'weights': [0.5, 1.0], 'enabled': True},
+            'scope': None}
+
+
+class TestGetCodec(testtools.TestCase):
+
+    def _codecs(self, *names):
+        return mock.patch.dict(json_codec.CODECS, {
+            name: json_codec.JSONCodec(name, json.loads, json.dumps)
+            for name in ('json',) + names}, clear=True)
+
+    def test_default_is_json(self):
+        with self._codecs('orjson', 'ujson'):
+            self.assertEqual('json', json_codec.get_codec().name)
+
+    def test_auto_prefers_accelerated_backends(self):
+        with self._codecs('orjson', 'ujson'):
+            self.assertEqual('orjson', json_codec.get_codec('auto').name)
+        with self._codecs('ujson'):
+            self.assertEqual('ujson', json_codec.get_codec('auto').name)
+        with self._codecs():
+            self.assertEqual('json', json_codec.get_codec('auto').name)
+
+    def test_unavailable_backend_falls_back_to_json(self):
+        with self._codecs('ujson'):
+            self.assertEqual('ujson', json_codec.get_codec('ujson').name)
+            self.assertEqual('json', json_codec.get_codec('orjson').name)
+
+
+class TestCodecs(testtools.TestCase):
+
+    def test_round_trip(self):
+        for codec in json_codec.CODECS.values():
+            encoded = codec.dumps(DOCUMENT)
+            # Responses are parsed from bytes, cassettes replay str
+            if isinstance(encoded, str):
+                encoded_bytes, encoded_str = encoded.encode('utf-8'), encoded
+            else:
+                encoded_bytes, encoded_str = encoded, encoded.decode('utf-8')
+            self.assertEqual(DOCUMENT, codec.loads(encoded_bytes),
+                             codec.name)
+            self.assertEqual(DOCUMENT, codec.loads(encoded_str), codec.name)
+            self.assertEqual(DOCUMENT, json.loads(encoded_str), codec.name)
+
+    def test_dumps_non_json_types(self):
+        value = datetime.datetime(2025, 1, 2, 3, 4, 5)
+        for codec in json_codec.CODECS.values():
+            # The backends may or may not print the microseconds
+            self.assertTrue(json.loads(codec.dumps({'at': value}))[
+                'at'].startswith('2025-01-02T03:04:05'), codec.name)
+
+
+class TestClientCodec(base.TestCase):
+
+    def test_client_uses_configured_codec(self):
+        self.assertEqual('json', self.infra_optim_client(None).codec.name)
+        self.config(json_codec='auto')
+        self.assertEqual(json_codec.get_codec('auto').name,
+                         self.infra_optim_client(None).codec.name)
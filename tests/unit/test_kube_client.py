@@ -0,0 +1,388 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import base64
+import hashlib
+import json
+import os
+import queue
+import socketserver
+import struct
+import subprocess
+import threading
+import time
+from urllib import parse
+
+import fixtures
+import testtools
+
+from watcher_tempest_plugin.services import base
+from watcher_tempest_plugin.services.metric import kube_client
+from watcher_tempest_plugin.services.metric import pod_pool
+
+LABELS = 'app.kubernetes.io/name=prometheus'
+QUERY = 'rate(node_cpu_seconds_total{mode="idle"}[1m])'
+
+KUBECONFIG = """apiVersion: v1
+kind: Config
+clusters:
+- cluster: {{server: 'http://127.0.0.1:{port}'}}
+  name: fake
+contexts:
+- context: {{cluster: fake, namespace: openstack, user: fake}}
+  name: fake
+current-context: fake
+users:
+- name: fake
+  user: {{token: fake}}
+"""
+
+
+def _read_exact(rfile, size):
+    data = rfile.read(size)
+    if len(data) < size:
+        raise EOFError()
+    return data
+
+
+def _read_frame(rfile):
+    header = _read_exact(rfile, 2)
+    length = header[1] & 0x7f
+    if length == 126:
+        length = struct.unpack('>H', _read_exact(rfile, 2))[0]
+    elif length == 127:
+        length = struct.unpack('>Q', _read_exact(rfile, 8))[0]
+    mask = _read_exact(rfile, 4) if header[1] & 0x80 else None
+    data = _read_exact(rfile, length)
+    if mask:
+        data = bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+    return header[0] & 0x0f, data
+
+
+def _frame(data, opcode=2):
+    length = len(data)
+    if length < 126:
+        header = bytes([0x80 | opcode, length])
+    elif length < 1 << 16:
+        header = bytes([0x80 | opcode, 126]) + struct.pack('>H', length)
+    else:
+        header = bytes([0x80 | opcode, 127]) + struct.pack('>Q', length)
+    return header + data
+
+
+class _Handler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        api = self.server.api
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            _, target, _ = line.decode().split(' ', 2)
+            headers = {}
+            while True:
+                header = self.rfile.readline().decode().strip()
+                if not header:
+                    break
+                name, value = header.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+            url = parse.urlsplit(target)
+            query = parse.parse_qs(url.query)
+            if headers.get('upgrade', '').lower() == 'websocket':
+                return self._exec(api, url.path, query, headers)
+            if query.get('watch', [''])[0].lower() == 'true':
+                return self._watch(
+                    api, int(query.get('resourceVersion', ['0'])[0]))
+            body = json.dumps(api.pod_list()).encode()
+            self.wfile.write(b'HTTP/1.1 200 OK\r\nContent-Type: '
+                             b'application/json\r\nContent-Length: %d\r\n'
+                             b'\r\n' % len(body) + body)
+
+    def _watch(self, api, resource_version):
+        self.wfile.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/'
+                         b'json\r\nTransfer-Encoding: chunked\r\n\r\n')
+        events = api.subscribe(resource_version)
+        while True:
+            event = events.get()
+            if event is None:
+                return
+            data = json.dumps(event).encode() + b'\n'
+            self.wfile.write(b'%x\r\n' % len(data) + data + b'\r\n')
+            self.wfile.flush()
+
+    def _exec(self, api, path, query, headers):
+        api.execs.append(query['command'])
+        key = headers['sec-websocket-key'] + (
+            '258EAFA5-E914-47DA-95CA-C5AB0DC85B11')
+        accept = base64.b64encode(
+            hashlib.sha1(key.encode()).digest()).decode()  # nosec
+        offered = headers.get('sec-websocket-protocol', '')
+        protocol = next(p for p in api.protocols if p in offered)
+        self.wfile.write(
+            ('HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n'
+             f'Connection: Upgrade\r\nSec-WebSocket-Accept: {accept}\r\n'
+             f'Sec-WebSocket-Protocol: {protocol}\r\n\r\n').encode())
+        lock = threading.Lock()
+
+        def send(channel, data):
+            with lock:
+                self.wfile.write(_frame(bytes([channel]) + data))
+                self.wfile.flush()
+
+        pod = path.split('/')[-2]
+        if pod not in api.pods:
+            send(3, json.dumps({'status': 'Failure',
+                                'message': 'pod not found'}).encode())
+            self.wfile.write(_frame(b'', 8))
+            return
+        # The commands run locally, in the environment of the pod
+        process = subprocess.Popen(
+            query['command'], env=dict(os.environ, POD_NAME=pod),
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE)
+
+        def feed():
+            try:
+                while True:
+                    opcode, data = _read_frame(self.rfile)
+                    if opcode == 8:
+                        break
+                    if data[:1] == b'\x00':
+                        process.stdin.write(data[1:])
+                        process.stdin.flush()
+                    elif data[:2] == b'\xff\x00':
+                        # v5 close of the stdin channel
+                        process.stdin.close()
+            except (EOFError, OSError, ValueError):
+                pass
+            if process.poll() is None:
+                process.kill()
+
+        def relay(pipe, channel):
+            while True:
+                data = os.read(pipe.fileno(), 65536)
+                if not data:
+                    break
+                send(channel, data)
+
+        threading.Thread(target=feed, daemon=True).start()
+        relays = [threading.Thread(target=relay, args=(process.stdout, 1)),
+                  threading.Thread(target=relay, args=(process.stderr, 2))]
+        for relay_thread in relays:
+            relay_thread.start()
+        for relay_thread in relays:
+            relay_thread.join()
+        status = {'metadata': {}, 'status': 'Success'}
+        returncode = process.wait()
+        if returncode:
+            status = {'metadata': {}, 'status': 'Failure',
+                      'reason': 'NonZeroExitCode',
+                      'details': {'causes': [{'reason': 'ExitCode',
+                                              'message': str(returncode)}]}}
+        send(3, json.dumps(status).encode())
+        with lock:
+            self.wfile.write(_frame(b'', 8))
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class FakeKubeApi(fixtures.Fixture):
+    """Kubernetes API serving the pods of a namespace, and their exec."""
+
+    def __init__(self, protocols=('v5.channel.k8s.io', 'v4.channel.k8s.io')):
+        super(FakeKubeApi, self).__init__()
+        self.protocols = protocols
+
+    def _setUp(self):
+        self.pods = {}
+        self.execs = []
+        self._version = 1
+        self._lock = threading.Lock()
+        self._watchers = []
+        # (resource version, event) of all the events
+        self._history = []
+        server = _Server(('127.0.0.1', 0), _Handler)
+        server.api = self
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.addCleanup(self._stop_watches)
+        self.kubeconfig = os.path.join(
+            self.useFixture(fixtures.TempDir()).path, 'kubeconfig')
+        with open(self.kubeconfig, 'w') as f:
+            f.write(KUBECONFIG.format(port=server.server_address[1]))
+
+    def _stop_watches(self):
+        with self._lock:
+            for events in self._watchers:
+                events.put(None)
+
+    def subscribe(self, resource_version):
+        """Return a queue of the events following a resource version."""
+        events = queue.Queue()
+        with self._lock:
+            for version, event in self._history:
+                if version > resource_version:
+                    events.put(event)
+            self._watchers.append(events)
+        return events
+
+    def pod_list(self):
+        with self._lock:
+            return {'kind': 'PodList', 'apiVersion': 'v1',
+                    'metadata': {'resourceVersion': str(self._version)},
+                    'items': list(self.pods.values())}
+
+    def _notify(self, event_type, pod):
+        event = {'type': event_type, 'object': pod}
+        self._history.append((self._version, event))
+        for events in self._watchers:
+            events.put(event)
+
+    def set_pod(self, name, ready=True):
+        with self._lock:
+            self._version += 1
+            pod = {'apiVersion': 'v1', 'kind': 'Pod',
+                   'metadata': {'name': name, 'namespace': 'openstack',
+                                'resourceVersion': str(self._version),
+                                'labels': {'app.kubernetes.io/name':
+                                           'prometheus'}},
+                   'status': {'phase': 'Running', 'containerStatuses': [
+                       {'name': 'prometheus', 'ready': ready,
+                        'restartCount': 0, 'image': 'prometheus',
+                        'imageID': 'prometheus'}]}}
+            event_type = 'MODIFIED' if name in self.pods else 'ADDED'
+            self.pods[name] = pod
+            self._notify(event_type, pod)
+
+    def delete_pod(self, name):
+        with self._lock:
+            self._version += 1
+            self._notify('DELETED', self.pods.pop(name))
+
+
+class FakeCmdClient(base.BaseCmdClient):
+
+    def __init__(self):
+        self.calls = []
+
+    def exec_cmd(self, cmd, input_data=None, timeout=None):
+        return self.run_cmd(cmd, input_data=input_data).stdout
+
+    def run_cmd(self, cmd, input_data=None, timeout=None):
+        self.calls.append((cmd, input_data))
+        return base.CmdResult('pushed', '', 0)
+
+
+@testtools.skipUnless(kube_client.is_available(),
+                      "The kubernetes library is not installed")
+class TestKubeClient(testtools.TestCase):
+
+    def _client(self, **kwargs):
+        self.api = self.useFixture(FakeKubeApi(**kwargs))
+        self.api.set_pod('prometheus-0')
+        client = kube_client.KubeClient(kubeconfig=self.api.kubeconfig)
+        self.addCleanup(client.close)
+        return client
+
+    def _watch(self, client):
+        watch = client.watch_pods(LABELS)
+        self.addCleanup(watch.stop)
+        return watch
+
+    def _wait_for_pods(self, watch, names):
+        deadline = time.monotonic() + 10
+        while pod_pool.ready_pod_names(watch.pods()) != names:
+            if time.monotonic() > deadline:
+                self.fail(f"Pods {names} not found, "
+                          f"{pod_pool.ready_pod_names(watch.pods())} "
+                          "instead")
+            time.sleep(0.05)
+
+    def test_list_and_watch_pods(self):
+        client = self._client()
+        self.assertEqual('openstack', client.namespace)
+        self.assertEqual(['prometheus-0'], pod_pool.ready_pod_names(
+            client.list_pods(LABELS)))
+
+        watch = self._watch(client)
+        self._wait_for_pods(watch, ['prometheus-0'])
+        self.api.set_pod('prometheus-1')
+        self._wait_for_pods(watch, ['prometheus-0', 'prometheus-1'])
+        self.api.set_pod('prometheus-0', ready=False)
+        self._wait_for_pods(watch, ['prometheus-1'])
+        self.api.delete_pod('prometheus-1')
+        self._wait_for_pods(watch, [])
+
+    def test_exec_with_stdin(self):
+        cmd_client = kube_client.KubeExecCmdClient(
+            self._client(), 'prometheus-0', fallback=FakeCmdClient())
+
+        self.assertEqual(QUERY, cmd_client.exec_cmd(
+            ['cat'], input_data=[b'rate(', QUERY[5:].encode()]))
+        self.assertEqual(
+            base.CmdResult(f'{QUERY}\n', 'error\n', 3),
+            cmd_client.run_cmd(
+                ['sh', '-c', 'printf "%s\\n" "$0"; echo error >&2; exit 3',
+                 QUERY]))
+        self.assertEqual([], cmd_client.fallback.calls)
+
+    def test_exec_with_stdin_falls_back_without_v5(self):
+        cmd_client = kube_client.KubeExecCmdClient(
+            self._client(protocols=('v4.channel.k8s.io',)), 'prometheus-0',
+            fallback=FakeCmdClient())
+
+        self.assertEqual('prometheus-0\n',
+                         cmd_client.exec_cmd('echo "$POD_NAME"'))
+        self.assertEqual('pushed', cmd_client.exec_cmd(
+            ['promtool', 'push', 'metrics'], input_data='m 1\n'))
+        self.assertEqual([(['promtool', 'push', 'metrics'], 'm 1\n')],
+                         cmd_client.fallback.calls)
+        self.assertEqual([['sh', '-c', 'echo "$POD_NAME"']], self.api.execs)
+
+    def test_exec_probes_protocol_before_sending_stdin(self):
+        cmd_client = kube_client.KubeExecCmdClient(
+            self._client(protocols=('v4.channel.k8s.io',)), 'prometheus-0',
+            fallback=FakeCmdClient())
+
+        cmd_client.exec_cmd(['promtool', 'push', 'metrics'], input_data='')
+        self.assertEqual([['true']], self.api.execs)
+        self.assertEqual(1, len(cmd_client.fallback.calls))
+
+    def test_exec_with_stdin_without_v5_or_fallback(self):
+        cmd_client = kube_client.KubeExecCmdClient(
+            self._client(protocols=('v4.channel.k8s.io',)), 'prometheus-0')
+
+        self.assertRaises(base.StreamingNotSupported, cmd_client.run_cmd,
+                          ['cat'], input_data='m 1\n')
+
+    def test_failover_to_another_pod(self):
+        client = self._client()
+        self.api.set_pod('prometheus-1')
+        watch = self._watch(client)
+        self._wait_for_pods(watch, ['prometheus-0', 'prometheus-1'])
+        pool = pod_pool.PodPool(
+            lambda: pod_pool.ready_pod_names(watch.pods()), ttl=300)
+        router = pod_pool.PodRouterCmdClient(
+            pool, lambda pod: kube_client.KubeExecCmdClient(client, pod))
+        self.assertEqual('prometheus-0\n', router.exec_cmd('echo $POD_NAME'))
+
+        self.api.delete_pod('prometheus-0')
+        self._wait_for_pods(watch, ['prometheus-1'])
+
+        self.assertEqual('prometheus-1\n', router.exec_cmd('echo $POD_NAME'))
+        self.assertEqual('prometheus-1', pool.primary())
@@ -0,0 +1,163 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+
+from tempest.lib import exceptions
+import testtools
+
+from tests.unit import base
+from watcher_tempest_plugin.services.metric import pod_pool
+
+
+def _pod(name, phase='Running', ready=(True,), deleted=False):
+    metadata = {'name': name}
+    if deleted:
+        metadata['deletionTimestamp'] = '2025-01-01T00:00:00Z'
+    return {'metadata': metadata,
+            'status': {'phase': phase, 'containerStatuses': [
+                {'name': f'c{i}', 'ready': r} for i, r in enumerate(ready)]}}
+
+
+class TestReadyPods(testtools.TestCase):
+
+    def test_ready_pods(self):
+        pods_json = json.dumps({'items': [
+            _pod('prometheus-1'),
+            _pod('prometheus-0', ready=(True, True)),
+            _pod('prometheus-2', ready=(True, False)),
+            _pod('prometheus-3', phase='Pending'),
+            _pod('prometheus-4', deleted=True),
+            _pod('prometheus-5', ready=()),
+        ]})
+
+        self.assertEqual(['prometheus-0', 'prometheus-1'],
+                         pod_pool.ready_pods(pods_json))
+
+
+class TestPodPool(testtools.TestCase):
+
+    def setUp(self):
+        super(TestPodPool, self).setUp()
+        self.clock = self.useFixture(base.FakeClock(pod_pool))
+        self.ready = ['prometheus-0', 'prometheus-1']
+        self.listings = 0
+        self.pool = pod_pool.PodPool(self._list_pods, ttl=15)
+
+    def _list_pods(self):
+        self.listings += 1
+        return list(self.ready)
+
+    def test_pods_cached(self):
+        self.assertEqual('prometheus-0', self.pool.primary())
+        self.ready = ['prometheus-1']
+
+        self.clock.now += 15
+        self.assertEqual('prometheus-0', self.pool.primary())
+        self.clock.now += 1
+        self.assertEqual('prometheus-1', self.pool.primary())
+        self.assertEqual(2, self.listings)
+
+    def test_next(self):
+        self.assertEqual(['prometheus-1', 'prometheus-0', 'prometheus-1'],
+                         [self.pool.next() for _ in range(3)])
+
+    def test_no_ready_pod(self):
+        self.ready = []
+
+        self.assertRaises(Exception, self.pool.pods)
+        # The pods are listed again on the next call
+        self.ready = ['prometheus-0']
+        self.assertEqual('prometheus-0', self.pool.primary())
+
+
+class TestPodRouterCmdClient(testtools.TestCase):
+
+    def setUp(self):
+        super(TestPodRouterCmdClient, self).setUp()
+        self.ready = ['prometheus-0', 'prometheus-1', 'prometheus-2']
+        self.failing = set()
+        self.oc_client = base.FakeCmdClient(self._run_oc)
+        pool = pod_pool.PodPool(lambda: list(self.ready), ttl=300)
+        self.router = pod_pool.PodRouterCmdClient(
+            pool, lambda pod: pod_pool.PodCmdClient(
+                self.oc_client, ['oc', '-n', 'openstack'], pod))
+
+    def _run_oc(self, cmd, input_data):
+        pod = cmd[4]
+        if pod in self.failing:
+            # The pod is stopped while running the command
+            self.ready.remove(pod)
+            return ('', 'error: pod not found', 1)
+        return f'{pod}: {input_data}'
+
+    def _pods_called(self):
+        return [cmd[4] for cmd, _ in self.oc_client.calls]
+
+    def test_run_in_primary_pod(self):
+        self.assertEqual('prometheus-0: data', self.router.exec_cmd(
+            ['cat'], input_data='data'))
+        self.assertEqual([(['oc', '-n', 'openstack', 'rsh', 'prometheus-0',
+                            'cat'], 'data')], self.oc_client.calls)
+
+    def test_failover_to_next_pod(self):
+        self.failing = {'prometheus-0'}
+
+        self.assertEqual('prometheus-1: data', self.router.exec_cmd(
+            ['cat'], input_data='data'))
+        self.assertEqual(['prometheus-0', 'prometheus-1'],
+                         self._pods_called())
+
+    def test_run_cmd_failover_to_next_pod(self):
+        self.failing = {'prometheus-0'}
+
+        result = self.router.run_cmd(['cat'], input_data=['data'])
+
+        self.assertEqual(0, result.exit_status)
+        self.assertEqual('prometheus-1: data', result.stdout)
+
+    def test_give_up_after_all_pods_fail(self):
+        self.failing = set(self.ready)
+
+        e = self.assertRaises(Exception, self.router.exec_cmd, ['cat'],
+                              input_data='data')
+        self.assertEqual("Could not find a ready pod.", str(e))
+        # Every pod is tried once
+        self.assertEqual(['prometheus-0', 'prometheus-1', 'prometheus-2'],
+                         self._pods_called())
+
+    def test_no_failover_from_ready_pod(self):
+        self.failing = {'prometheus-0'}
+        # The command failed, but the pod is still ready
+        self.ready.append('prometheus-0')
+
+        self.assertRaises(exceptions.SSHExecCommandFailed,
+                          self.router.exec_cmd, ['false'])
+        self.assertEqual(['prometheus-0'], self._pods_called())
+
+    def test_no_failover_of_iterators(self):
+        self.failing = {'prometheus-0'}
+
+        self.assertRaises(exceptions.SSHExecCommandFailed,
+                          self.router.exec_cmd, ['cat'],
+                          input_data=iter(['data']))
+        self.assertEqual(['prometheus-0'], self._pods_called())
+
+    def test_round_robin(self):
+        self.router.round_robin = True
+
+        self.assertEqual(
+            ['prometheus-1', 'prometheus-2', 'prometheus-0'],
+            [self.router.exec_cmd(['hostname']).split(':')[0]
+             for _ in range(3)])
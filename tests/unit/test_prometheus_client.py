@@ -0,0 +1,314 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from unittest import mock
+from urllib import parse
+
+from tempest.lib import exceptions
+import testtools
+
+from tests.unit import base
+from watcher_tempest_plugin.services.metric import prometheus_client
+from watcher_tempest_plugin.services.metric import prometheus_query
+from watcher_tempest_plugin.services.metric import remote_write
+
+
+class TestStableSeries(testtools.TestCase):
+
+    def setUp(self):
+        super(TestStableSeries, self).setUp()
+        patcher = mock.patch.dict(prometheus_client._SERIES_TRACKERS,
+                                  clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = self._client()
+        self.query = self.client.query
+
+    def _client(self):
+        client = prometheus_client.PromtoolClient(
+            'http://prometheus:9090', stable_series=True)
+        patcher = mock.patch.object(client, 'query')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return client
+
+    def test_last_timestamps_beyond_lookback_delta(self):
+        self.query.return_value = prometheus_query.decode_result({
+            'resultType': 'vector',
+            'result': [{'metric': {'job': 'promtool', 'cpu': '0'},
+                        'value': [1700000600, '1699990000.5']}]})
+
+        self.assertEqual(
+            {(('__name__', 'node_cpu_seconds_total'), ('cpu', '0')):
+             1699990000500},
+            self.client._get_last_timestamps('node_cpu_seconds_total'))
+        selector = '{job="promtool",__name__="node_cpu_seconds_total"}'
+        self.query.assert_called_once_with(
+            f'timestamp({selector}) or '
+            f'max_over_time(timestamp({selector})[1d:5m])')
+
+    def test_last_timestamps_command_errors(self):
+        for error in (prometheus_query.QueryError('bad query'),
+                      exceptions.SSHExecCommandFailed(
+                          command='promtool', exit_status=1, stderr='',
+                          stdout=''),
+                      exceptions.CommandFailed(1, 'promtool', '', 'err'),
+                      exceptions.TimeoutException()):
+            self.query.side_effect = error
+            self.assertEqual({}, self.client._get_last_timestamps('m'))
+
+    def test_filter_skips_samples_already_written(self):
+        key = (('__name__', 'm'), ('cpu', '0'))
+        self.query.return_value = prometheus_query.decode_result({
+            'resultType': 'vector',
+            'result': [{'metric': {'job': 'promtool', 'cpu': '0'},
+                        'value': [1000, '2']}]})
+
+        series = self.client.series_tracker.filter([remote_write.Series(
+            dict(key), [(3000, 3.0), (1000, 1.0), (2000, 2.0)])])
+
+        self.assertEqual([remote_write.Series(dict(key), [(3000, 3.0)])],
+                         series)
+
+    def test_tracker_shared_by_clients(self):
+        key = (('__name__', 'm'), ('cpu', '0'))
+        self.query.return_value = []
+        tracker = self.client.series_tracker
+        tracker.record(tracker.filter([remote_write.Series(
+            dict(key), [(1000, 1.0), (2000, 2.0)])]))
+
+        # The series were deleted, the queries of the next clients no
+        # longer see their samples
+        client = self._client()
+        client.query.return_value = []
+        series = client.series_tracker.filter([remote_write.Series(
+            dict(key), [(1000, 1.0), (2000, 2.0), (3000, 3.0)])])
+
+        self.assertIs(self.client.series_tracker, client.series_tracker)
+        self.assertEqual([remote_write.Series(dict(key), [(3000, 3.0)])],
+                         series)
+        client.query.assert_not_called()
+        self.assertIsNot(self.client.series_tracker, prometheus_client.
+                         PromtoolClient('http://other:9090',
+                                        stable_series=True).series_tracker)
+
+
+class TestMetricBatch(testtools.TestCase):
+
+    def setUp(self):
+        super(TestMetricBatch, self).setUp()
+        self.client = prometheus_client.PromtoolClient(
+            'http://prometheus:9090')
+        self.client.client = base.FakeCmdClient(
+            lambda cmd, input_data: 'SUCCESS')
+
+    def _pushed(self):
+        """Return the series pushed by every promtool call."""
+        pushes = []
+        for cmd, input_data in self.client.client.calls:
+            self.assertEqual(['promtool', 'push', 'metrics',
+                              self.client.prometheus_write_url], cmd)
+            pushes.append(sorted(
+                (tuple(sorted(labels.items())), samples) for labels, samples
+                in remote_write.parse_exposition(input_data)))
+        return pushes
+
+    def test_flush_on_exit(self):
+        with self.client.batch() as batch:
+            batch.add('m{cpu="0"} 1 1000\nm{cpu="1"} 2 1000\n')
+            batch.add([remote_write.Series(
+                {'__name__': 'm', 'cpu': '0'}, [(2000, 3.0)])])
+            self.assertEqual([], self._pushed())
+
+        # The samples of a series are merged in a single push
+        self.assertEqual(
+            [[((('__name__', 'm'), ('cpu', '0')),
+               [(1000, 1.0), (2000, 3.0)]),
+              ((('__name__', 'm'), ('cpu', '1')), [(1000, 2.0)])]],
+            self._pushed())
+        stats = batch.stats()
+        self.assertEqual(1, stats['flushes'])
+        self.assertEqual(2, stats['series'])
+        self.assertEqual(3, stats['samples'])
+        self.assertEqual(len(self.client.client.calls[0][1]), stats['bytes'])
+
+    def test_flush_on_size(self):
+        with self.client.batch(max_samples=3) as batch:
+            batch.add('m{cpu="0"} 1 1000\nm{cpu="0"} 2 2000\n')
+            self.assertEqual(0, len(self._pushed()))
+            batch.add('m{cpu="0"} 3 3000\n')
+            self.assertEqual(1, len(self._pushed()))
+            batch.add('m{cpu="0"} 4 4000\n')
+            self.assertEqual(1, len(self._pushed()))
+
+        self.assertEqual(
+            [[((('__name__', 'm'), ('cpu', '0')),
+               [(1000, 1.0), (2000, 2.0), (3000, 3.0)])],
+             [((('__name__', 'm'), ('cpu', '0')), [(4000, 4.0)])]],
+            self._pushed())
+        self.assertEqual(2, batch.stats()['flushes'])
+        self.assertEqual(4, batch.stats()['samples'])
+
+    def test_no_flush_on_error(self):
+        def _add_and_fail():
+            with self.client.batch() as batch:
+                batch.add('m{cpu="0"} 1 1000\n')
+                raise ValueError("Test failure")
+
+        self.assertRaises(ValueError, _add_and_fail)
+        self.assertEqual([], self._pushed())
+
+    def test_empty_batch(self):
+        with self.client.batch() as batch:
+            pass
+
+        self.assertEqual([], self._pushed())
+        self.assertEqual(0, batch.stats()['flushes'])
+
+
+class TestBackfill(testtools.TestCase):
+
+    def setUp(self):
+        super(TestBackfill, self).setUp()
+        self.client = prometheus_client.PromtoolClient(
+            'http://prometheus:9090', tsdb_path='/prometheus/')
+        self.outputs = {
+            'mktemp': '/prometheus/backfill.x1\n',
+            'ls': '01HBLOCK1\n01HBLOCK2\n',
+        }
+        self.client.client = base.FakeCmdClient(
+            lambda cmd, input_data: self.outputs.get(cmd[0], ''))
+        patcher = mock.patch.object(self.client, 'query')
+        self.query = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.series = [
+            remote_write.Series({'__name__': 'm', 'cpu': '0'},
+                                [(1000, 1.0), (61000, 2.0)]),
+            remote_write.Series({'__name__': 'm', 'cpu': '1'}, [])]
+
+    def test_create_blocks(self):
+        self.query.return_value = [mock.sentinel.sample]
+
+        blocks = self.client.backfill(self.series, timeout=10)
+
+        self.assertEqual(['01HBLOCK1', '01HBLOCK2'], blocks)
+        calls = self.client.client.calls
+        self.assertEqual([
+            ['mktemp', '-d', '/prometheus/backfill.XXXXXX'],
+            ['cp', '/dev/stdin', '/prometheus/backfill.x1/metrics.om'],
+            ['promtool', 'tsdb', 'create-blocks-from', 'openmetrics',
+             '/prometheus/backfill.x1/metrics.om',
+             '/prometheus/backfill.x1/blocks'],
+            ['ls', '/prometheus/backfill.x1/blocks'],
+            ['mv', '/prometheus/backfill.x1/blocks/01HBLOCK1',
+             '/prometheus/backfill.x1/blocks/01HBLOCK2', '/prometheus'],
+            ['rm', '-rf', '/prometheus/backfill.x1']],
+            [cmd for cmd, _ in calls])
+        # Series without samples are not written
+        self.assertEqual(remote_write.render_openmetrics(
+            self.series[:1], {'job': 'promtool'}), calls[1][1])
+        self.query.assert_called_once_with(
+            '{__name__="m",cpu="0",job="promtool"}', time=61.0)
+
+    def test_create_blocks_failure(self):
+        self.outputs['promtool'] = ('', 'invalid sample', 1)
+
+        self.assertRaises(exceptions.SSHExecCommandFailed,
+                          self.client.backfill, self.series)
+        # The work directory is removed
+        self.assertEqual(['rm', '-rf', '/prometheus/backfill.x1'],
+                         self.client.client.calls[-1][0])
+        self.query.assert_not_called()
+
+    @mock.patch.object(prometheus_client.time, 'sleep')
+    @mock.patch.object(prometheus_client.time, 'monotonic')
+    def test_timeout_waiting_for_samples(self, monotonic, sleep):
+        monotonic.side_effect = [100, 105, 110, 115.5]
+        self.query.return_value = []
+
+        self.assertRaises(exceptions.TimeoutException,
+                          self.client.backfill, self.series, timeout=15)
+        # Prometheus is queried until the deadline
+        self.assertEqual(3, self.query.call_count)
+        self.assertEqual([mock.call(5)] * 2, sleep.call_args_list)
+
+    def test_no_samples(self):
+        self.assertEqual([], self.client.backfill(self.series[1:]))
+        self.assertEqual([], self.client.client.calls)
+
+
+class TestDeleteSeries(testtools.TestCase):
+
+    def setUp(self):
+        super(TestDeleteSeries, self).setUp()
+        self.client = prometheus_client.PromtoolClient(
+            'http://prometheus:9090', run_labels={'tempest_run': 'r1'})
+        self.series = [{'__name__': 'm1', 'job': 'promtool'},
+                       {'__name__': 'm1', 'job': 'promtool', 'cpu': '1'},
+                       {'__name__': 'm2', 'job': 'promtool'}]
+        self.http_requests = []
+        self.client.http = base.FakeHttp(self._handle)
+
+    def _handle(self, method, url, headers, body):
+        url, _, query = url.partition('?')
+        self.http_requests.append(
+            (method, url, parse.parse_qsl(body if method == 'POST'
+                                          else query)))
+        if url.endswith('/api/v1/series'):
+            return 200, {}, {'status': 'success', 'data': self.series}
+        return 204, {}, b''
+
+    def test_delete_multiple_matchers(self):
+        deleted = self.client.delete_series(
+            ['m1{job="promtool"}', 'm2{job="promtool"}'],
+            start=1700000000, end='2025-01-01T00:00:00Z',
+            clean_tombstones=True)
+
+        self.assertEqual(self.series, deleted)
+        params = [('match[]', 'm1{job="promtool"}'),
+                  ('match[]', 'm2{job="promtool"}'),
+                  ('start', '1700000000'), ('end', '2025-01-01T00:00:00Z')]
+        # The series are listed, then deleted in a single request
+        self.assertEqual([
+            ('GET', 'http://prometheus:9090/api/v1/series', params),
+            ('POST',
+             'http://prometheus:9090/api/v1/admin/tsdb/delete_series',
+             params),
+            ('POST',
+             'http://prometheus:9090/api/v1/admin/tsdb/clean_tombstones',
+             [])], self.http_requests)
+
+    def test_delete_series_of_the_client(self):
+        self.client.delete_series()
+
+        self.assertEqual(
+            [('match[]', '{job="promtool",tempest_run="r1"}')],
+            self.http_requests[1][2])
+        self.assertEqual(2, len(self.http_requests))
+
+    def test_nothing_to_delete(self):
+        self.series = []
+
+        self.assertEqual([], self.client.delete_series('m3'))
+        self.assertEqual(['GET'], [r[0] for r in self.http_requests])
+
+    def test_delete_failure(self):
+        def _handle(method, url, headers, body):
+            if method == 'GET':
+                return 200, {}, {'status': 'success', 'data': self.series}
+            return 400, {}, {'status': 'error', 'error': 'bad matcher'}
+        self.client.http = base.FakeHttp(_handle)
+
+        e = self.assertRaises(Exception, self.client.delete_series, 'm1')
+        self.assertIn('bad matcher', str(e))
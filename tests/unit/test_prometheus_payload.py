@@ -0,0 +1,69 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import testtools
+
+from watcher_tempest_plugin.services.metric import prometheus_payload
+from watcher_tempest_plugin.services.metric import remote_write
+
+
+class TestPayloadBuilder(testtools.TestCase):
+
+    def setUp(self):
+        super(TestPayloadBuilder, self).setUp()
+        self.builder = prometheus_payload.PayloadBuilder()
+        for cpu in range(2):
+            self.builder.add(
+                'node_cpu_seconds_total', {'cpu': str(cpu), 'mode': 'idle'},
+                self.builder.timestamps(3, 30, 100000),
+                self.builder.counter_values(3, 1.0, 30.0),
+                metric_type='counter')
+        self.builder.add('node_memory_MemTotal_bytes', {'fqdn': 'a"b'},
+                         self.builder.timestamps(3, 30, 100000),
+                         self.builder.counter_values(3, 1024.0, 0),
+                         metric_type='gauge')
+
+    def test_to_series(self):
+        samples = ((10000, 31.0), (40000, 61.0), (70000, 91.0))
+        self.assertEqual([
+            remote_write.Series({'cpu': '0', 'mode': 'idle',
+                                 '__name__': 'node_cpu_seconds_total'},
+                                samples),
+            remote_write.Series({'cpu': '1', 'mode': 'idle',
+                                 '__name__': 'node_cpu_seconds_total'},
+                                samples),
+            remote_write.Series(
+                {'fqdn': 'a"b', '__name__': 'node_memory_MemTotal_bytes'},
+                ((10000, 1024.0), (40000, 1024.0), (70000, 1024.0))),
+        ], self.builder.to_series())
+        self.assertEqual(9, self.builder.samples)
+
+    def test_series_share_arrays(self):
+        self.assertIs(self.builder.timestamps(3, 30, 100000),
+                      self.builder.timestamps(3, 30, 100000))
+        series = self.builder.to_series()
+        self.assertIs(series[0].samples, series[1].samples)
+
+    def test_to_exposition(self):
+        text = self.builder.to_exposition()
+
+        self.assertIn('# TYPE node_cpu_seconds_total counter\n', text)
+        self.assertIn('# TYPE node_memory_MemTotal_bytes gauge\n', text)
+        self.assertEqual(
+            [(s.labels, list(s.samples)) for s in self.builder.to_series()],
+            [(s.labels, s.samples)
+             for s in remote_write.parse_exposition(text)])
+
+    def test_add_arrays_of_different_sizes(self):
+        self.assertRaises(ValueError, self.builder.add, 'm', {}, [1, 2], [1])
@@ -0,0 +1,90 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+from unittest import mock
+
+import testtools
+
+from watcher_tempest_plugin.services.metric import prometheus_query
+
+
+class TestDecodeResult(testtools.TestCase):
+
+    def _decode(self, result_type, result):
+        return [(series.labels, list(series.timestamps), list(series.values))
+                for series in prometheus_query.decode_result(
+                    {'resultType': result_type, 'result': result})]
+
+    def test_matrix(self):
+        self.assertEqual(
+            [({'cpu': '0'}, [10.0, 20.5], [1.0, 2.5]),
+             ({'cpu': '1'}, [], [])],
+            self._decode('matrix', [
+                {'metric': {'cpu': '0'},
+                 'values': [[10, '1'], [20.5, '2.5']]},
+                {'metric': {'cpu': '1'}, 'values': []}]))
+
+    def test_vector(self):
+        self.assertEqual(
+            [({'cpu': '0'}, [10.0], [float('inf')]), ({}, [10.0], [3.0])],
+            self._decode('vector', [
+                {'metric': {'cpu': '0'}, 'value': [10, '+Inf']},
+                {'value': [10, '3']}]))
+
+    def test_scalar(self):
+        self.assertEqual([({}, [10.0], [0.5])],
+                         self._decode('scalar', [10, '0.5']))
+
+    def test_string(self):
+        e = self.assertRaises(prometheus_query.QueryError,
+                              self._decode, 'string', [10, 'text'])
+        self.assertIn('string', str(e))
+
+    def test_unknown_type(self):
+        self.assertRaises(prometheus_query.QueryError,
+                          self._decode, 'histogram', [])
+
+
+class TestPrometheusQueryClient(testtools.TestCase):
+
+    def setUp(self):
+        super(TestPrometheusQueryClient, self).setUp()
+        self.http = mock.Mock()
+        self.client = prometheus_query.PrometheusQueryClient(
+            'http://prometheus:9090', self.http)
+
+    def _respond(self, status, document):
+        self.http.request.return_value = (
+            mock.Mock(status=status), json.dumps(document).encode('utf-8'))
+
+    def test_query(self):
+        self._respond(200, {'status': 'success', 'data': {
+            'resultType': 'vector',
+            'result': [{'metric': {}, 'value': [10, '1']}]}})
+
+        result = self.client.query('up', time=10)
+
+        self.assertEqual([1.0], list(result[0].values))
+        self.http.request.assert_called_once_with(
+            'http://prometheus:9090/api/v1/query', 'POST',
+            headers={'Content-Type': 'application/x-www-form-urlencoded'},
+            body='query=up&time=10')
+
+    def test_query_error(self):
+        self._respond(400, {'status': 'error', 'error': 'parse error'})
+
+        e = self.assertRaises(prometheus_query.QueryError,
+                              self.client.query_range, 'up{', 0, 10, 5)
+        self.assertIn('status 400: parse error', str(e))
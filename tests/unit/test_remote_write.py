@@ -0,0 +1,237 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import math
+import struct
+from unittest import mock
+
+from oslo_utils import importutils
+import testtools
+
+from watcher_tempest_plugin.services.metric import remote_write
+
+snappy = importutils.try_import('snappy')
+cramjam = importutils.try_import('cramjam')
+
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, pos
+
+
+def _decode_fields(data):
+    """Decode a protobuf message as a list of (field, wire type, value)."""
+    fields = []
+    pos = 0
+    while pos < len(data):
+        key, pos = _read_varint(data, pos)
+        number, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value, pos = _read_varint(data, pos)
+        elif wire_type == 1:
+            value = struct.unpack('<d', data[pos:pos + 8])[0]
+            pos += 8
+        elif wire_type == 2:
+            length, pos = _read_varint(data, pos)
+            value = data[pos:pos + length]
+            pos += length
+        else:
+            raise ValueError(f"Unexpected wire type {wire_type}")
+        fields.append((number, wire_type, value))
+    return fields
+
+
+def _decode_write_request(data):
+    """Decode a WriteRequest as a list of (labels, samples)."""
+    series = []
+    for number, wire_type, timeseries in _decode_fields(data):
+        assert (number, wire_type) == (1, 2)
+        labels = []
+        samples = []
+        for number, wire_type, value in _decode_fields(timeseries):
+            fields = _decode_fields(value)
+            if number == 1:
+                assert [(1, 2), (2, 2)] == [f[:2] for f in fields]
+                labels.append((fields[0][2].decode('utf-8'),
+                               fields[1][2].decode('utf-8')))
+            else:
+                assert number == 2
+                assert [(1, 1), (2, 0)] == [f[:2] for f in fields]
+                timestamp = fields[1][2]
+                if timestamp >= 1 << 63:
+                    timestamp -= 1 << 64
+                samples.append((timestamp, fields[0][2]))
+        series.append((labels, samples))
+    return series
+
+
+def _snappy_decompress(data):
+    if snappy is not None:
+        return snappy.uncompress(data)
+    return bytes(cramjam.snappy.decompress_raw(data))
+
+
+class TestEncodeWriteRequest(testtools.TestCase):
+
+    def test_fields(self):
+        series = [
+            remote_write.Series(
+                {'__name__': 'node_cpu_seconds_total', 'mode': 'idle',
+                 'job': 'node'},
+                [(1700000060000, 2.5), (1700000000000, -1.0)]),
+            remote_write.Series({'__name__': 'up'}, [(-5, math.inf)]),
+        ]
+
+        data = remote_write.encode_write_request(
+            series, extra_labels={'job': 'promtool', 'run': 'ab"c'})
+
+        self.assertEqual([
+            ([('__name__', 'node_cpu_seconds_total'), ('job', 'promtool'),
+              ('mode', 'idle'), ('run', 'ab"c')],
+             [(1700000000000, -1.0), (1700000060000, 2.5)]),
+            ([('__name__', 'up'), ('job', 'promtool'), ('run', 'ab"c')],
+             [(-5, math.inf)]),
+        ], _decode_write_request(data))
+
+    def test_long_labels(self):
+        value = 'é' * 200
+        data = remote_write.encode_write_request(
+            [remote_write.Series({'__name__': 'm', 'long': value},
+                                 [(0, 0.0)])])
+
+        self.assertEqual([([('__name__', 'm'), ('long', value)],
+                           [(0, 0.0)])], _decode_write_request(data))
+
+
+@testtools.skipIf(snappy is None and cramjam is None,
+                  "Neither python-snappy nor cramjam is installed")
+class TestSnappyLiterals(testtools.TestCase):
+
+    def _assert_round_trip(self, data):
+        self.assertEqual(
+            data, _snappy_decompress(remote_write._snappy_literals(data)))
+
+    def test_short_chunk(self):
+        self._assert_round_trip(b'')
+        self._assert_round_trip(b'x' * 60)
+
+    def test_long_chunks(self):
+        self._assert_round_trip(b'y' * 61)
+        self._assert_round_trip(bytes(range(256)) * 1000)
+
+    def test_chunk_boundaries(self):
+        chunk = remote_write._LITERAL_CHUNK
+        self._assert_round_trip(b'z' * chunk)
+        self._assert_round_trip(b'z' * (chunk + 1))
+
+
+class TestExposition(testtools.TestCase):
+
+    def test_parse_escaped_label_values(self):
+        text = ('# HELP m A metric\n'
+                'm{path="C:\\\\tmp",quote="say \\"hi\\"",nl="a\\nb",'
+                'other="\\t"} 1.5 1700000000000\n'
+                'm{path="x"} +Inf\n'
+                'n 3\n')
+
+        series = remote_write.parse_exposition(text, default_timestamp=42)
+
+        self.assertEqual([
+            remote_write.Series(
+                {'path': 'C:\\tmp', 'quote': 'say "hi"', 'nl': 'a\nb',
+                 'other': '\\t', '__name__': 'm'},
+                [(1700000000000, 1.5)]),
+            remote_write.Series({'path': 'x', '__name__': 'm'},
+                                [(42, math.inf)]),
+            remote_write.Series({'__name__': 'n'}, [(42, 3.0)]),
+        ], series)
+
+    def test_parse_quoted_label_names_and_braces(self):
+        series = remote_write.parse_exposition(
+            'm{"host"="compute-0", expr="rate(x{a=\\"b\\"}[1m])" , } 2\n',
+            default_timestamp=0)
+
+        self.assertEqual([remote_write.Series(
+            {'host': 'compute-0', 'expr': 'rate(x{a="b"}[1m])',
+             '__name__': 'm'}, [(0, 2.0)])], series)
+
+    def test_parse_errors(self):
+        for line in ('m{a="b} 1', 'm{a=b} 1', 'm', 'm 1 2 3', 'm x'):
+            self.assertRaises(remote_write.ParseError,
+                              remote_write.parse_exposition, line)
+
+    def test_render_exposition_round_trip(self):
+        series = [remote_write.Series(
+            {'__name__': 'm', 'v': 'a\\b"c\nd'}, [(1000, 1.0), (2000, 2.0)])]
+
+        self.assertEqual(series, remote_write.parse_exposition(
+            remote_write.render_exposition(series)))
+
+    def test_render_openmetrics(self):
+        series = [
+            remote_write.Series({'__name__': 'm', 'v': 'a"b'},
+                                [(2500, 2.0), (1000, 1.0)]),
+            remote_write.Series({'__name__': 'n', 'job': 'node'},
+                                [(3, 0.5)]),
+            remote_write.Series({'__name__': 'm', 'v': 'c\nd'},
+                                [(1000, 3.0)]),
+        ]
+
+        self.assertEqual(
+            'm{v="a\\"b",job="promtool"} 1.0 1.000\n'
+            'm{v="a\\"b",job="promtool"} 2.0 2.500\n'
+            'm{v="c\\nd",job="promtool"} 3.0 1.000\n'
+            'n{job="promtool"} 0.5 0.003\n'
+            '# EOF\n',
+            remote_write.render_openmetrics(
+                series, extra_labels={'job': 'promtool'}))
+
+
+class TestRemoteWriteClient(testtools.TestCase):
+
+    def setUp(self):
+        super(TestRemoteWriteClient, self).setUp()
+        self.http = mock.Mock()
+        self.client = remote_write.RemoteWriteClient(
+            'http://prometheus/api/v1/write', self.http)
+        self.series = [remote_write.Series({'__name__': 'm'}, [(1, 1.0)])]
+
+    @mock.patch.object(remote_write, 'snappy_compress',
+                       side_effect=lambda data: data)
+    def test_push(self, snappy_compress):
+        self.http.request.return_value = (mock.Mock(status=204), b'')
+
+        size = self.client.push(self.series)
+
+        body = self.http.request.call_args.kwargs['body']
+        self.assertEqual(len(body), size)
+        self.assertEqual([([('__name__', 'm'), ('job', 'promtool')],
+                           [(1, 1.0)])], _decode_write_request(body))
+        self.http.request.assert_called_once_with(
+            'http://prometheus/api/v1/write', 'POST',
+            headers=remote_write.RemoteWriteClient.HEADERS, body=body)
+
+    def test_push_rejected(self):
+        self.http.request.return_value = (
+            mock.Mock(status=400), b'out of order sample\n')
+
+        e = self.assertRaises(remote_write.RemoteWriteError,
+                              self.client.push, self.series)
+        self.assertIn('status 400: out of order sample', str(e))
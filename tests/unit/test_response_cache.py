@@ -0,0 +1,143 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import testtools
+
+from tests.unit import base
+from watcher_tempest_plugin.services import response_cache
+
+
+class TestResponseCache(testtools.TestCase):
+
+    def setUp(self):
+        super(TestResponseCache, self).setUp()
+        self.clock = self.useFixture(base.FakeClock(response_cache))
+        self.cache = response_cache.ResponseCache(
+            ttls={'goals': 10, 'strategies': 10}, maxsize=2)
+
+    def _store(self, resource, key, etag=None):
+        resp = base.FakeResponse(200, {'etag': etag} if etag else {})
+        self.cache.store(resource, key, resp, f'body of {key}')
+
+    def test_ttl_expiry(self):
+        self._store('goals', 'a')
+
+        self.clock.now += 9
+        entry, fresh = self.cache.lookup('a')
+        self.assertTrue(fresh)
+        self.assertEqual('body of a', entry.body)
+
+        self.clock.now += 2
+        entry, fresh = self.cache.lookup('a')
+        self.assertFalse(fresh)
+        self.assertEqual('body of a', entry.body)
+
+    def test_revalidated_entry_is_fresh_again(self):
+        self._store('goals', 'a', etag='"v1"')
+        self.clock.now += 11
+
+        self.assertEqual('"v1"', self.cache.revalidated('a').etag)
+        self.assertTrue(self.cache.lookup('a')[1])
+
+    def test_lru_eviction(self):
+        self._store('goals', 'a')
+        self._store('goals', 'b')
+        # 'a' becomes the most recently used entry
+        self.cache.lookup('a')
+        self._store('goals', 'c')
+
+        self.assertIsNone(self.cache.lookup('b')[0])
+        self.assertIsNotNone(self.cache.lookup('a')[0])
+        self.assertIsNotNone(self.cache.lookup('c')[0])
+        self.assertEqual(1, self.cache.stats()['evictions'])
+
+    def test_invalidate_resource(self):
+        self._store('goals', 'a')
+        self._store('strategies', 'b')
+
+        self.cache.invalidate('goals')
+
+        self.assertIsNone(self.cache.lookup('a')[0])
+        self.assertIsNotNone(self.cache.lookup('b')[0])
+
+    def test_uncached_resource(self):
+        self._store('audits', 'a')
+
+        self.assertFalse(self.cache.is_cacheable('audits'))
+        self.assertEqual(0, self.cache.stats()['size'])
+
+
+class TestClientResponseCache(base.TestCase):
+
+    def setUp(self):
+        super(TestClientResponseCache, self).setUp()
+        self.config(response_cache_ttl=10)
+        self.clock = self.useFixture(base.FakeClock(response_cache))
+        self.etag = '"v1"'
+        self.conditional_headers = []
+        self.client = self.infra_optim_client(self._handle)
+
+    def _handle(self, method, url, headers, body):
+        if method == 'DELETE':
+            return 204, {}, b''
+        self.conditional_headers.append(headers.get('If-None-Match'))
+        if headers.get('If-None-Match') == self.etag:
+            return 304, {}, b''
+        return 200, {'etag': self.etag}, {'goals': [{'name': self.etag}]}
+
+    def test_fresh_responses_served_from_cache(self):
+        self.client.list_goals()
+        _, body = self.client.list_goals()
+
+        self.assertEqual({'goals': [{'name': '"v1"'}]}, body)
+        self.assertEqual([None], self.conditional_headers)
+
+    def test_stale_response_revalidated_with_etag(self):
+        self.client.list_goals()
+        self.clock.now += 11
+
+        resp, body = self.client.list_goals()
+        self.assertEqual(200, resp.status)
+        self.assertEqual({'goals': [{'name': '"v1"'}]}, body)
+
+        # Revalidated responses are fresh again
+        self.client.list_goals()
+        self.assertEqual([None, '"v1"'], self.conditional_headers)
+
+    def test_changed_response_replaces_cached_one(self):
+        self.client.list_goals()
+        self.clock.now += 11
+        self.etag = '"v2"'
+
+        _, body = self.client.list_goals()
+
+        self.assertEqual({'goals': [{'name': '"v2"'}]}, body)
+        self.client.list_goals()
+        self.assertEqual([None, '"v1"'], self.conditional_headers)
+
+    def test_write_invalidates_resource(self):
+        self.client.list_goals()
+        self.client._delete_request('goals', 'goal-1')
+
+        self.client.list_goals()
+        self.assertEqual([None, None], self.conditional_headers)
+
+    def test_uncached_resource(self):
+        self.client.list_audits()
+        self.client.list_audits()
+
+        self.assertEqual([None, None], self.conditional_headers)
+        self.assertEqual({'hits': 0, 'misses': 0, 'stale': 0,
+                          'revalidations': 0, 'evictions': 0, 'size': 0},
+                         self.client.cache_stats())
@@ -0,0 +1,115 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from unittest import mock
+
+import fixtures
+from tempest.lib import exceptions
+import testtools
+
+from tests.unit import base
+from watcher_tempest_plugin.services import retry
+
+
+def _error(status, headers=None):
+    return exceptions.UnexpectedResponseCode(
+        resp=base.FakeResponse(status, headers))
+
+
+class TestRetryAfter(testtools.TestCase):
+
+    def test_seconds(self):
+        self.assertEqual(
+            2.5, retry._retry_after(base.FakeResponse(
+                503, {'retry-after': '2.5'})))
+        self.assertEqual(
+            0.0, retry._retry_after(base.FakeResponse(
+                503, {'retry-after': '-3'})))
+
+    @mock.patch.object(retry.time, 'time', return_value=1445412480.0)
+    def test_http_date(self, time):
+        # 2015-10-21 07:28:00 GMT plus 30 seconds
+        self.assertEqual(
+            30.0, retry._retry_after(base.FakeResponse(
+                503, {'retry-after': 'Wed, 21 Oct 2015 07:28:30 GMT'})))
+        self.assertEqual(
+            0.0, retry._retry_after(base.FakeResponse(
+                503, {'retry-after': 'Wed, 21 Oct 2015 07:00:00 GMT'})))
+
+    def test_missing_or_invalid(self):
+        self.assertIsNone(retry._retry_after(None))
+        self.assertIsNone(retry._retry_after(base.FakeResponse(503)))
+        self.assertIsNone(retry._retry_after(base.FakeResponse(
+            503, {'retry-after': 'soon'})))
+
+
+class TestRetryPolicy(testtools.TestCase):
+
+    def setUp(self):
+        super(TestRetryPolicy, self).setUp()
+        self.sleep = self.useFixture(fixtures.MockPatchObject(
+            retry.time, 'sleep')).mock
+        # Backoffs take their upper bound
+        self.useFixture(fixtures.MockPatchObject(
+            retry.random, 'uniform', side_effect=lambda low, high: high))
+        self.policy = retry.RetryPolicy(
+            max_attempts=6, backoff_base=0.5, backoff_max=3.0,
+            max_elapsed=60.0, retry_statuses=(409, 503))
+
+    def _call(self, method, *errors):
+        fn = mock.Mock(side_effect=list(errors) + ['ok'])
+        return self.policy.call(method, fn), fn.call_count
+
+    def test_idempotent_request_retried(self):
+        self.assertEqual(('ok', 3), self._call(
+            'GET', _error(409), ConnectionError()))
+        self.assertEqual({'retried_requests': 1, 'retries': 2,
+                          'recovered': 1, 'exhausted': 0},
+                         self.policy.stats())
+
+    def test_post_only_retried_on_503(self):
+        self.assertEqual(('ok', 2), self._call('POST', _error(503)))
+        self.assertRaises(exceptions.UnexpectedResponseCode,
+                          self._call, 'POST', _error(409))
+        self.assertRaises(ConnectionError,
+                          self._call, 'PATCH', ConnectionError())
+
+    def test_other_errors_not_retried(self):
+        self.assertRaises(exceptions.UnexpectedResponseCode,
+                          self._call, 'GET', _error(404))
+        self.assertRaises(ValueError, self._call, 'GET', ValueError())
+        self.sleep.assert_not_called()
+
+    def test_backoff_doubles_up_to_cap(self):
+        self._call('GET', *[_error(503) for _ in range(5)])
+
+        self.assertEqual([0.5, 1.0, 2.0, 3.0, 3.0],
+                         [c.args[0] for c in self.sleep.call_args_list])
+
+    def test_retry_after_extends_backoff(self):
+        self._call('GET', _error(503, {'retry-after': '7'}))
+
+        self.sleep.assert_called_once_with(7.0)
+
+    def test_max_attempts(self):
+        self.assertRaises(exceptions.UnexpectedResponseCode, self._call,
+                          'GET', *[_error(503) for _ in range(6)])
+        self.assertEqual(5, self.sleep.call_count)
+        self.assertEqual(1, self.policy.stats()['exhausted'])
+
+    def test_max_elapsed(self):
+        # A retry would end past the time budget
+        self.assertRaises(exceptions.UnexpectedResponseCode, self._call,
+                          'GET', _error(503, {'retry-after': '61'}))
+        self.sleep.assert_not_called()
@@ -0,0 +1,123 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import threading
+from unittest import mock
+import uuid
+
+from tempest.lib import exceptions
+import testtools
+
+from watcher_tempest_plugin.services import base
+from watcher_tempest_plugin.services import shell_session
+
+QUERY = ('sum by (instance) (rate(node_cpu_seconds_total{mode="idle",'
+         'instance=~"compute-.*"}[1m])) > 0.5 or on() vector(0)')
+
+
+class FakeStream:
+    """Shell stream writing fixed outputs, then hanging until closed."""
+
+    def __init__(self, stdout, stderr):
+        self.outputs = {False: [stdout], True: [stderr]}
+        self.closed = threading.Event()
+
+    def read(self, stderr=False):
+        if self.outputs[stderr]:
+            return self.outputs[stderr].pop()
+        self.closed.wait()
+        return b''
+
+    def write(self, data):
+        pass
+
+    def close(self):
+        self.closed.set()
+
+
+class StreamlessCmdClient(base.SubProcessCmdClient):
+    """Command client without command streams."""
+
+    def open_stream(self, cmd):
+        return base.BaseCmdClient.open_stream(self, cmd)
+
+
+class TestSession(testtools.TestCase):
+
+    @mock.patch.object(uuid, 'uuid4')
+    def test_timeout_waiting_for_exit_status(self, uuid4):
+        uuid4.return_value.hex = 'abc'
+        marker = b'__watcher_abc__'
+        # The command ended, but its exit status was never written
+        session = shell_session._Session(
+            FakeStream(b'out' + marker, b'err' + marker))
+        self.addCleanup(session.close)
+
+        self.assertRaises(exceptions.TimeoutException,
+                          session.run, 'true', 0.2)
+
+
+class TestShellSessionCmdClient(testtools.TestCase):
+
+    def setUp(self):
+        super(TestShellSessionCmdClient, self).setUp()
+        self.client = shell_session.ShellSessionCmdClient(
+            base.SubProcessCmdClient(), lambda: ['WATCHER_TEST=a b', 'sh'])
+        self.addCleanup(self.client.close)
+
+    def test_run_cmd_quotes_arguments(self):
+        result = self.client.run_cmd(
+            ['printf', '%s\\n', 'query', QUERY, "it's $HOME"])
+
+        self.assertEqual(base.CmdResult(f"query\n{QUERY}\nit's $HOME\n", '',
+                                        0), result)
+
+    def test_run_cmd_with_input_data(self):
+        self.assertEqual(f'{QUERY}\n', self.client.exec_cmd(
+            ['cat'], input_data=[QUERY.encode('utf-8')]))
+
+    def test_shell_environment(self):
+        self.assertEqual('a b\n', self.client.exec_cmd('echo "$WATCHER_TEST"'))
+
+    def test_exec_cmd_failure_reports_quoted_command(self):
+        e = self.assertRaises(exceptions.SSHExecCommandFailed,
+                              self.client.exec_cmd, ['grep', '-q', QUERY])
+        self.assertIn(f"grep -q '{QUERY}'", str(e))
+
+    def test_default_timeout(self):
+        self.client.timeout = 0.5
+
+        self.assertRaises(exceptions.TimeoutException,
+                          self.client.exec_cmd, ['sleep', '10'])
+        # The shell stuck in the command was replaced
+        self.assertEqual('ok\n', self.client.exec_cmd(['echo', 'ok']))
+
+    def test_fallback_without_streams(self):
+        fallback = mock.Mock(spec=base.BaseCmdClient)
+        fallback.run_cmd.return_value = base.CmdResult('ok\n', '', 0)
+        client = shell_session.ShellSessionCmdClient(
+            StreamlessCmdClient(), lambda: 'sh', fallback=fallback)
+
+        self.assertEqual('ok\n', client.exec_cmd(['echo', 'ok']))
+        self.assertEqual('ok\n', client.exec_cmd(['echo', 'ok'], timeout=5))
+        fallback.run_cmd.assert_has_calls([
+            mock.call(['echo', 'ok'], input_data=None, timeout=300),
+            mock.call(['echo', 'ok'], input_data=None, timeout=5)])
+
+    def test_no_fallback_without_streams(self):
+        client = shell_session.ShellSessionCmdClient(
+            StreamlessCmdClient(), lambda: 'sh')
+
+        self.assertRaises(base.StreamingNotSupported,
+                          client.exec_cmd, ['echo', 'ok'])
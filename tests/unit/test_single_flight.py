@@ -0,0 +1,120 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from concurrent import futures
+import threading
+import time
+
+import testtools
+
+from tests.unit import base
+from watcher_tempest_plugin.services import single_flight
+
+CALLERS = 5
+
+
+def _wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out waiting for the callers")
+        time.sleep(0.01)
+
+
+class TestSingleFlight(testtools.TestCase):
+
+    def setUp(self):
+        super(TestSingleFlight, self).setUp()
+        self.flight = single_flight.SingleFlight()
+        self.release = threading.Event()
+        self.calls = 0
+
+    def _call(self, result):
+        self.calls += 1
+        self.release.wait(10)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _concurrent_calls(self, result):
+        """Call the same key from CALLERS threads while the first runs."""
+        with futures.ThreadPoolExecutor(CALLERS) as executor:
+            calls = [executor.submit(self.flight.do, 'key',
+                                     lambda: self._call(result))
+                     for _ in range(CALLERS)]
+            _wait_for(lambda: self.flight.stats()['coalesced']
+                      == CALLERS - 1)
+            self.release.set()
+            return [call.exception() or call.result() for call in calls]
+
+    def test_concurrent_calls_coalesced(self):
+        result = object()
+
+        self.assertEqual([result] * CALLERS, self._concurrent_calls(result))
+        self.assertEqual(1, self.calls)
+        self.assertEqual({'executed': 1, 'coalesced': CALLERS - 1},
+                         self.flight.stats())
+
+    def test_error_shared_with_waiters_only(self):
+        self.flight.window = 60
+        error = ValueError('failed')
+
+        self.assertEqual([error] * CALLERS, self._concurrent_calls(error))
+        self.assertEqual(1, self.calls)
+
+        # The error is not cached for the next callers
+        self.assertEqual('ok', self.flight.do('key', lambda: 'ok'))
+
+    def test_result_shared_within_window(self):
+        self.flight.window = 60
+        self.release.set()
+
+        self.assertEqual(1, self.flight.do('key', lambda: self._call(1)))
+        self.assertEqual(1, self.flight.do('key', lambda: self._call(2)))
+        self.assertEqual(2, self.flight.do('other', lambda: self._call(2)))
+        self.assertEqual(2, self.calls)
+
+    def test_result_not_shared_without_window(self):
+        self.release.set()
+
+        self.assertEqual(1, self.flight.do('key', lambda: self._call(1)))
+        self.assertEqual(2, self.flight.do('key', lambda: self._call(2)))
+
+
+class TestClientCoalescing(base.TestCase):
+
+    def setUp(self):
+        super(TestClientCoalescing, self).setUp()
+        self.config(request_coalescing=True)
+        self.release = threading.Event()
+
+    def _show_audit(self, method, url, headers, body):
+        self.release.wait(10)
+        return 200, {}, {'uuid': url.rsplit('/', 1)[-1]}
+
+    def test_concurrent_gets_coalesced(self):
+        client = self.infra_optim_client(self._show_audit)
+
+        with futures.ThreadPoolExecutor(CALLERS + 1) as executor:
+            shows = [executor.submit(client.show_audit, 'audit-1')
+                     for _ in range(CALLERS)]
+            other = executor.submit(client.show_audit, 'audit-2')
+            _wait_for(lambda: client.coalescing_stats()['coalesced']
+                      == CALLERS - 1)
+            self.release.set()
+            bodies = [show.result()[1] for show in shows]
+
+        self.assertEqual([{'uuid': 'audit-1'}] * CALLERS, bodies)
+        self.assertEqual({'uuid': 'audit-2'}, other.result()[1])
+        self.assertEqual(2, len(client.http_obj.requests))
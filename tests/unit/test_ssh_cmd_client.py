@@ -0,0 +1,142 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import subprocess
+import threading
+import time
+from unittest import mock
+
+import paramiko
+from tempest.lib.common import ssh
+from tempest.lib import exceptions
+import testtools
+
+from watcher_tempest_plugin.services import base
+
+
+def _run_locally(cmd):
+    """Run a remote command with the local shell, as sshd would."""
+    return subprocess.run(['sh', '-c', cmd], check=True, capture_output=True,
+                          text=True).stdout
+
+
+class FakeChannel:
+    """SSH channel of a command exiting when its stdin is closed."""
+
+    def __init__(self, send_error=None):
+        self.send_error = send_error
+        self.sent = []
+        self.stdin_closed = threading.Event()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def exec_command(self, cmd):
+        self.cmd = cmd
+
+    def sendall(self, data):
+        if self.send_error is not None:
+            raise self.send_error
+        self.sent.append(bytes(data))
+
+    def shutdown_write(self):
+        self.stdin_closed.set()
+
+    def recv_ready(self):
+        return False
+
+    def recv_stderr_ready(self):
+        return False
+
+    def exit_status_ready(self):
+        return self.stdin_closed.is_set()
+
+    def recv_exit_status(self):
+        return 0
+
+
+class TestSshCmdClient(testtools.TestCase):
+
+    def setUp(self):
+        super(TestSshCmdClient, self).setUp()
+        self.client = base.SshCmdClient('compute-0', 'zuul', password='pw',
+                                        pkey_type='ecdsa')
+
+    def test_build_cmd_quotes_arguments(self):
+        self.client.cmd_prefix = 'sudo'
+        cmd = ['promtool', 'query', 'instant', 'http://prometheus',
+               'rate(node_cpu_seconds_total{mode="idle"}[1m])']
+
+        cmd_str = self.client._build_cmd(cmd)
+
+        self.assertEqual(
+            "sudo promtool query instant http://prometheus "
+            "'rate(node_cpu_seconds_total{mode=\"idle\"}[1m])'", cmd_str)
+        self.assertEqual(cmd[1:], _run_locally(
+            'printf "%s\\n" ' + cmd_str[len('sudo '):]).split('\n')[1:-1])
+
+    def test_build_cmd_keeps_string_commands(self):
+        self.assertEqual('cat /proc/loadavg | cut -d" " -f1',
+                         self.client._build_cmd(
+                             'cat /proc/loadavg | cut -d" " -f1'))
+
+    @mock.patch.object(ssh, 'Client')
+    def test_run_cmd_without_persistent_connection(self, client_cls):
+        client_cls.return_value.exec_command.side_effect = _run_locally
+        self.patch(base.SshCmdClient, '_connect', lambda self: None)
+
+        result = self.client.run_cmd(['cat'], input_data=[b'a b\n', 'c'])
+        self.assertEqual(base.CmdResult('a b\nc\n', '', 0), result)
+        client_cls.assert_called_with(
+            host='compute-0', username='zuul', password='pw', timeout=300,
+            pkey=None, channel_timeout=10, look_for_keys=True,
+            key_filename=None, port=22, ssh_key_type='ecdsa')
+
+        result = self.client.run_cmd('echo out; exit 3', timeout=5)
+        self.assertEqual(base.CmdResult('out\n', '', 3), result)
+        self.assertEqual(5, client_cls.call_args.kwargs['timeout'])
+        self.assertRaises(exceptions.SSHExecCommandFailed,
+                          self.client.exec_cmd, ['false'])
+
+    def test_connect_without_private_helper(self):
+        self.patch(ssh.Client, '_get_ssh_connection', None)
+        del ssh.Client._get_ssh_connection
+
+        self.assertIsNone(self.client._connect())
+        self.assertIsNone(self.client._open_channel())
+
+    def _run_in_channel(self, channel, input_data):
+        self.patch(self.client, '_open_channel', lambda: channel)
+        self.patch(base.select, 'select',
+                   lambda *args: time.sleep(0.01))
+        return self.client.run_cmd(['cat'], input_data=input_data)
+
+    def test_run_cmd_streams_input(self):
+        channel = FakeChannel()
+
+        result = self._run_in_channel(channel, iter([b'a b\n', 'c']))
+
+        self.assertEqual(base.CmdResult('', '', 0), result)
+        self.assertEqual([b'a b\n', b'c'], channel.sent)
+        self.assertEqual('cat', channel.cmd)
+
+    def test_run_cmd_write_error_surfaces(self):
+        channel = FakeChannel(send_error=paramiko.SSHException("Broken"))
+
+        e = self.assertRaises(paramiko.SSHException,
+                              self._run_in_channel, channel, b'm 1\n')
+        self.assertEqual("Broken", str(e))
@@ -0,0 +1,70 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import hashlib
+
+import testtools
+
+from watcher_tempest_plugin.services import base
+
+
+class TestSubProcessCmdClient(testtools.TestCase):
+
+    def setUp(self):
+        super(TestSubProcessCmdClient, self).setUp()
+        self.client = base.SubProcessCmdClient()
+
+    def test_bytes_input(self):
+        result = self.client.run_cmd(['cat'], input_data=b'a b\nc')
+
+        self.assertEqual(base.CmdResult('a b\nc', '', 0), result)
+
+    def test_str_input(self):
+        self.assertEqual('hé\n', self.client.exec_cmd(
+            ['cat'], input_data='hé\n'))
+
+    def test_iterator_input(self):
+        # Larger than the chunks and the pipe buffers, the command writes
+        # its outputs while its input is being sent
+        lines = (f'metric{{i="{i}"}} {i}\n' for i in range(100000))
+        expected = hashlib.sha256(''.join(
+            f'metric{{i="{i}"}} {i}\n' for i in range(100000)).encode())
+
+        result = self.client.run_cmd(
+            ['sh', '-c', 'tee /dev/stderr | sha256sum'], input_data=lines)
+
+        self.assertEqual(0, result.exit_status)
+        self.assertEqual(expected.hexdigest(), result.stdout.split()[0])
+        self.assertEqual(100000, len(result.stderr.splitlines()))
+
+    def test_command_not_reading_its_input(self):
+        data = [b'x' * base.STDIN_CHUNK_SIZE] * 64
+
+        result = self.client.run_cmd(['head', '-c', '3'], input_data=data)
+
+        self.assertEqual(base.CmdResult('xxx', '', 0), result)
+
+    def test_input_error_surfaces(self):
+        def lines():
+            yield 'm 1\n'
+            raise ValueError("Invalid sample")
+
+        e = self.assertRaises(ValueError, self.client.run_cmd, ['cat'],
+                              input_data=lines())
+        self.assertEqual("Invalid sample", str(e))
+
+    def test_write_error_surfaces(self):
+        # Only str and bytes can be sent
+        self.assertRaises(TypeError, self.client.run_cmd, ['cat'],
+                          input_data=[b'm 1\n', 1])
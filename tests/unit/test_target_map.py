@@ -0,0 +1,110 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import testtools
+
+from tests.unit import base
+from watcher_tempest_plugin.services.metric import target_map
+
+
+def _target(fqdn, instance):
+    return {'fqdn': fqdn, 'instance': instance, 'job': 'node'}
+
+
+class TestTargetMap(testtools.TestCase):
+
+    def setUp(self):
+        super(TestTargetMap, self).setUp()
+        self.clock = self.useFixture(base.FakeClock(target_map))
+        self.targets = [
+            _target('compute-0.ctlplane.example.com', '192.0.2.10:9100'),
+            _target('compute-1.ctlplane.example.com', '192.0.2.11:9100'),
+        ]
+        self.fetches = 0
+        self.map = target_map.TargetMap(self._fetch_targets, ttl=300,
+                                        min_refresh_interval=10)
+
+    def _fetch_targets(self):
+        self.fetches += 1
+        return list(self.targets)
+
+    def test_lookup_by_fqdn(self):
+        self.assertEqual('192.0.2.10:9100',
+                         self.map['compute-0.ctlplane.example.com'])
+        self.assertEqual('192.0.2.11:9100',
+                         self.map['compute-1.ctlplane.example.com'])
+        self.assertEqual(1, self.fetches)
+
+    def test_lookup_by_short_hostname(self):
+        self.assertEqual('192.0.2.10:9100', self.map['compute-0'])
+        self.assertEqual('192.0.2.11:9100', self.map['compute-1.ctlplane'])
+        # Longer names match the target of their prefix
+        self.assertEqual('192.0.2.10:9100',
+                         self.map['compute-0.ctlplane.example.com.'])
+
+    def test_ambiguous_short_hostname(self):
+        self.targets.append(
+            _target('compute-0.other.example.com', '198.51.100.10:9100'))
+
+        self.assertNotIn('compute-0', self.map)
+        self.assertEqual('198.51.100.10:9100',
+                         self.map['compute-0.other'])
+        self.assertEqual('192.0.2.10:9100',
+                         self.map['compute-0.ctlplane'])
+
+    def test_targets_without_fqdn_ignored(self):
+        self.targets.append({'instance': 'prometheus:9090'})
+
+        self.assertEqual({'192.0.2.10:9100', '192.0.2.11:9100'},
+                         set(self.map.values()))
+
+    def test_refresh_after_ttl(self):
+        self.assertEqual('192.0.2.10:9100', self.map['compute-0'])
+        self.targets[0] = _target('compute-0.ctlplane.example.com',
+                                  '192.0.2.20:9100')
+
+        self.clock.now += 299
+        self.assertEqual('192.0.2.10:9100', self.map['compute-0'])
+        self.assertEqual(1, self.fetches)
+
+        self.clock.now += 2
+        self.assertEqual('192.0.2.20:9100', self.map['compute-0'])
+        self.assertEqual(2, self.fetches)
+
+    def test_refresh_on_miss(self):
+        self.assertEqual('192.0.2.10:9100', self.map['compute-0'])
+        self.targets.append(
+            _target('compute-2.ctlplane.example.com', '192.0.2.12:9100'))
+
+        # Misses refresh the map at most every min_refresh_interval
+        self.assertRaises(KeyError, self.map.__getitem__, 'compute-2')
+        self.assertEqual(1, self.fetches)
+        self.clock.now += 11
+        self.assertEqual('192.0.2.12:9100', self.map['compute-2'])
+        self.assertEqual(2, self.fetches)
+
+        self.clock.now += 11
+        self.assertRaises(KeyError, self.map.__getitem__, 'compute-3')
+        self.assertEqual(3, self.fetches)
+        self.assertEqual({'hits': 2, 'misses': 2, 'refreshes': 3,
+                          'miss_refreshes': 2}, self.map.stats())
+
+    def test_invalidate(self):
+        self.assertEqual('192.0.2.10:9100', self.map['compute-0'])
+        self.targets.pop(0)
+
+        self.map.invalidate()
+
+        self.assertIsNone(self.map.get('compute-0'))
+        self.assertEqual(2, self.fetches)
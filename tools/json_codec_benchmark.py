@@ -0,0 +1,84 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Compare the JSON codec backends on recorded Watcher API payloads.
+
+Usage: python tools/json_codec_benchmark.py [payload.json ...]
+
+Each payload file holds a raw response body, e.g., the output of
+'openstack optimize action list --detail -f json' or a body captured from
+GET /v1/data_model. Without payload files, a synthetic list_actions_detail
+response is used.
+"""
+
+import argparse
+import json
+import timeit
+import uuid
+
+from watcher_tempest_plugin.services import json_codec
+
+
+def _synthetic_actions_detail(count=5000):
+    actions = [{
+        'uuid': str(uuid.uuid4()),
+        'action_plan_uuid': str(uuid.uuid4()),
+        'action_type': 'migrate',
+        'state': 'PENDING',
+        'description': 'Moving a VM instance from source_node to '
+                       'destination_node',
+        'input_parameters': {
+            'migration_type': 'live',
+            'source_node': f'compute-{i % 100}.example.com',
+            'destination_node': f'compute-{(i + 1) % 100}.example.com',
+            'resource_id': str(uuid.uuid4()),
+        },
+        'parents': [str(uuid.uuid4())],
+        'created_at': '2025-01-01T00:00:00+00:00',
+        'updated_at': None,
+        'deleted_at': None,
+        'links': [{'href': 'http://watcher/v1/actions/x', 'rel': 'self'}],
+    } for i in range(count)]
+    return json.dumps({'actions': actions, 'next': ''}).encode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('payloads', nargs='*',
+                        help='Files holding raw JSON response bodies.')
+    parser.add_argument('-n', '--number', type=int, default=20,
+                        help='Number of decodings per measurement.')
+    args = parser.parse_args()
+
+    payloads = {}
+    for path in args.payloads:
+        with open(path, 'rb') as f:
+            payloads[path] = f.read()
+    if not payloads:
+        payloads['synthetic actions detail'] = _synthetic_actions_detail()
+
+    for name, data in payloads.items():
+        print(f"{name} ({len(data) / 1024:.0f} KiB)")
+        for codec in json_codec.CODECS.values():
+            obj = codec.loads(data)
+            loads = min(timeit.repeat(lambda: codec.loads(data),
+                                      number=args.number, repeat=3))
+            dumps = min(timeit.repeat(lambda: codec.dumps(obj),
+                                      number=args.number, repeat=3))
+            print(f"  {codec.name:8s} loads {loads / args.number * 1e3:8.2f} "
+                  f"ms  dumps {dumps / args.number * 1e3:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
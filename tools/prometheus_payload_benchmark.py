@@ -0,0 +1,125 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measure the throughput of the Prometheus metric payload builders.
+
+Usage: python tools/prometheus_payload_benchmark.py [-s SERIES] [-c COUNT]
+
+The payload mimics make_host_statistic_prometheus: one node_cpu counter
+series per vCPU, with COUNT samples each. Every payload is added to a
+MetricBatch and pushed as a snappy compressed remote-write message. The
+former string concatenation of the scenario tests, and exposition text
+rendered by a PayloadBuilder per series, are compared with a single
+PayloadBuilder whose series are added to the batch as is.
+"""
+
+import argparse
+import json
+import time
+import timeit
+
+from watcher_tempest_plugin.services.metric import prometheus_client
+from watcher_tempest_plugin.services.metric import prometheus_payload
+from watcher_tempest_plugin.services.metric import remote_write
+
+
+class _EncodingClient:
+    """PromtoolClient encoding the pushed series without sending them."""
+
+    def _push(self, series):
+        return len(remote_write.snappy_compress(
+            remote_write.encode_write_request(
+                series, {'job': remote_write.DEFAULT_JOB})))
+
+
+def _push(payloads):
+    batch = prometheus_client.MetricBatch(_EncodingClient())
+    for payload in payloads:
+        batch.add(payload)
+    batch.flush()
+
+
+def _labels(series):
+    return [{'instance': f'compute-{i // 64}:9100',
+             'fqdn': f'compute-{i // 64}.example.com',
+             'mode': 'idle', 'cpu': str(i % 64)} for i in range(series)]
+
+
+def _concatenation(all_labels, count, end_ms):
+    # The loop formerly used by _generate_prometheus_metrics
+    for labels in all_labels:
+        str_labels = json.dumps(labels, separators=(',', '='))
+        data = '# TYPE node_cpu_seconds_total counter\n'
+        value = 1.0
+        for i in range(count, 0, -1):
+            value += 30.0
+            data += '%s%s %s %s\n' % (
+                'node_cpu_seconds_total', str_labels,
+                value, end_ms - 30000 * i)
+        yield data
+
+
+def _builder_per_series(all_labels, count, end_ms):
+    for labels in all_labels:
+        builder = prometheus_payload.PayloadBuilder()
+        builder.add('node_cpu_seconds_total', labels,
+                    builder.timestamps(count, 30, end_ms),
+                    builder.counter_values(count, 1.0, 30.0),
+                    metric_type='counter')
+        yield builder.to_exposition()
+
+
+def _shared_builder(all_labels, count, end_ms):
+    builder = prometheus_payload.PayloadBuilder()
+    for labels in all_labels:
+        builder.add('node_cpu_seconds_total', labels,
+                    builder.timestamps(count, 30, end_ms),
+                    builder.counter_values(count, 1.0, 30.0),
+                    metric_type='counter')
+    yield builder.to_series()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-s', '--series', type=int, default=1280,
+                        help='Number of series, 20 hosts of 64 vCPUs by '
+                             'default.')
+    parser.add_argument('-c', '--count', type=int, default=120,
+                        help='Number of samples per series.')
+    parser.add_argument('-n', '--number', type=int, default=3,
+                        help='Number of payloads built per measurement.')
+    args = parser.parse_args()
+
+    all_labels = _labels(args.series)
+    end_ms = int(time.time() * 1000)
+    samples = args.series * args.count
+    print(f"{args.series} series x {args.count} samples, NumPy "
+          + ('enabled' if prometheus_payload.numpy is not None
+             else 'not installed'))
+
+    benchmarks = {
+        'concatenation': _concatenation,
+        'builder per series': _builder_per_series,
+        'shared builder': _shared_builder,
+    }
+    for name, payloads in benchmarks.items():
+        seconds = min(timeit.repeat(
+            lambda: _push(payloads(all_labels, args.count, end_ms)),
+            number=args.number, repeat=3)) / args.number
+        print(f"  {name:22s} {seconds * 1e3:9.1f} ms "
+              f"{samples / seconds / 1e6:7.2f} M samples/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -96,6 +96,78 @@ OptimizationGroup = [
         help="The label that Prometheus uses to store the fqdn of "
              "exporters.",
     ),
+    cfg.BoolOpt(
+        "prometheus_native_write",
+        default=False,
+        help="Push the injected metrics to the Prometheus remote-write "
+             "endpoint directly from the test process, instead of "
+             "running 'promtool push metrics'. promtool is still used "
+             "when the endpoint cannot be reached from the test process.",
+    ),
+    cfg.BoolOpt(
+        "prometheus_native_query",
+        default=False,
+        help="Send the queries used to verify the injected metrics to the "
+             "Prometheus HTTP API directly from the test process, instead "
+             "of running 'promtool query'. promtool is still used when "
+             "the API cannot be reached from the test process.",
+    ),
+    cfg.BoolOpt(
+        "prometheus_stable_series",
+        default=False,
+        help="Inject the metrics of the tests in the same series on every "
+             "run, instead of new series made unique by an "
+             "'orig_timestamp' label. The last timestamp written to every "
+             "series is tracked, and only newer samples are pushed, so "
+             "that Prometheus does not reject them as out of order. This "
+             "keeps the number of series flat on long-lived Prometheus "
+             "servers.",
+    ),
+    cfg.StrOpt(
+        "prometheus_tsdb_path",
+        default="/prometheus",
+        help="Data directory of the Prometheus server, where the TSDB "
+             "blocks of backfilled metrics are moved. It must be writable "
+             "by the user running promtool, i.e., in the prometheus pod "
+             "for podified deployments, or on the proxy host otherwise.",
+    ),
+    cfg.BoolOpt(
+        "prometheus_clean_tombstones",
+        default=False,
+        help="Remove the deleted samples of the injected metrics from the "
+             "disk when cleaning them up, instead of waiting for the next "
+             "compactions of the Prometheus TSDB. It requires the admin "
+             "APIs of Prometheus, like deleting series.",
+    ),
+    cfg.StrOpt(
+        "metrics_run_label",
+        default="",
+        help="Label set on every Prometheus series injected by the tests, "
+             "holding the id of the test worker, e.g., 'tempest_run'. The "
+             "cleanup of the injected metrics then only deletes the series "
+             "of its own worker, so that parallel workers can share a "
+             "Prometheus server. By default, the series are unlabelled and "
+             "the cleanup deletes the series injected by all the workers.",
+    ),
+    cfg.StrOpt(
+        "metrics_run_id",
+        default=None,
+        help="Value of the metrics_run_label label. Defaults to a random "
+             "id per test worker process, or to 'cassette' when "
+             "cassette_mode is set, so that recorded commands match on "
+             "replay. A fixed value is required by the "
+             "prometheus_stable_series option, to reuse the series of the "
+             "previous runs, when metrics_run_label is set.",
+    ),
+    cfg.IntOpt(
+        "prometheus_targets_ttl",
+        default=300,
+        min=0,
+        help="Seconds after which the map of the compute hosts to their "
+             "Prometheus instances is built again from the active "
+             "targets. Hosts missing from the map also trigger a rebuild, "
+             "at most every 10 seconds.",
+    ),
     cfg.StrOpt(
         "prometheus_write_path",
         default="/api/v1/write",
@@ -103,6 +175,138 @@ OptimizationGroup = [
              "remote write operations. Set to an empty string if the "
              "base URL already includes the full write endpoint.",
     ),
+    # HTTP transport configuration
+    cfg.BoolOpt(
+        "http_keep_alive",
+        default=False,
+        help="Whether or not the Watcher and Gnocchi clients share a "
+             "process-wide pool of keep-alive HTTP connections, instead "
+             "of opening a new connection for every request.",
+    ),
+    cfg.IntOpt(
+        "http_pool_maxsize",
+        default=10,
+        min=1,
+        help="Maximum number of connections kept open per endpoint in "
+             "the shared HTTP connection pool. Only used when "
+             "http_keep_alive is enabled.",
+    ),
+    cfg.IntOpt(
+        "response_cache_ttl",
+        default=0,
+        min=0,
+        help="Number of seconds the responses of immutable catalog "
+             "resources (goals, strategies and scoring engines) are "
+             "cached by the Watcher client. Set to 0 to disable the "
+             "response cache.",
+    ),
+    cfg.IntOpt(
+        "response_cache_size",
+        default=256,
+        min=1,
+        help="Maximum number of responses kept in the response cache of "
+             "each client.",
+    ),
+    cfg.StrOpt(
+        "json_codec",
+        default="json",
+        choices=["auto", "orjson", "ujson", "json"],
+        help="JSON backend used by the Watcher and Gnocchi clients to "
+             "serialize requests and parse responses. 'auto' uses orjson "
+             "or ujson when importable, and the standard library json "
+             "module otherwise.",
+    ),
+    cfg.IntOpt(
+        "retry_max_attempts",
+        default=1,
+        min=1,
+        help="Maximum number of attempts of a Watcher or Gnocchi API "
+             "request failing with a transient error, including the "
+             "first one. Set to 1 to disable retries.",
+    ),
+    cfg.FloatOpt(
+        "retry_backoff_base",
+        default=0.5,
+        min=0.0,
+        help="Upper bound, in seconds, of the randomized backoff before "
+             "the first retry. It doubles on every following retry.",
+    ),
+    cfg.FloatOpt(
+        "retry_backoff_max",
+        default=10.0,
+        min=0.0,
+        help="Maximum backoff, in seconds, between two attempts of a "
+             "request. A longer Retry-After header sent by the server "
+             "takes precedence.",
+    ),
+    cfg.FloatOpt(
+        "retry_max_elapsed",
+        default=60.0,
+        min=0.0,
+        help="Time budget, in seconds, of a request and all its retries.",
+    ),
+    cfg.ListOpt(
+        "retry_statuses",
+        default=[409, 503],
+        item_type=int,
+        help="HTTP statuses considered transient. Requests using a "
+             "non-idempotent method are only retried on 503.",
+    ),
+    cfg.BoolOpt(
+        "request_coalescing",
+        default=False,
+        help="Whether or not identical GET requests sent concurrently by "
+             "the same Watcher or Gnocchi client share a single request "
+             "and its result.",
+    ),
+    cfg.FloatOpt(
+        "request_coalescing_window",
+        default=0.0,
+        min=0.0,
+        help="Number of seconds the result of a completed GET request is "
+             "still shared with identical requests, when request "
+             "coalescing is enabled. With 0, only requests sent while the "
+             "first one is in flight are coalesced.",
+    ),
+    cfg.StrOpt(
+        "request_stats_dir",
+        default="",
+        help="Directory where every test worker writes the latency "
+             "statistics of the Watcher and Gnocchi API requests it sent, "
+             "as a 'watcher-requests-<pid>.json' file, when the run ends. "
+             "Set to an empty string to not write them.",
+    ),
+    cfg.BoolOpt(
+        "request_stats_attach",
+        default=False,
+        help="Whether or not to attach the API request latency statistics "
+             "of the test worker to the result of every scenario test.",
+    ),
+    cfg.StrOpt(
+        "cassette_mode",
+        default="",
+        choices=["", "record", "replay"],
+        help="Record the traffic of the Watcher, Gnocchi and Prometheus "
+             "clients into cassettes, or replay previously recorded "
+             "cassettes without any cloud. Every test worker records "
+             "its own cassette files, replacing the files of previous "
+             "recordings, and the files of all the workers are "
+             "replayed. Set to an empty string to disable both.",
+    ),
+    cfg.StrOpt(
+        "cassette_dir",
+        default=".",
+        help="Directory holding the cassette files, one per client "
+             "service.",
+    ),
+    cfg.FloatOpt(
+        "cassette_replay_speed",
+        default=0.0,
+        min=0.0,
+        help="Speed factor used to replay cassettes. 1.0 replays every "
+             "interaction with its recorded latency, 2.0 twice as fast, "
+             "and 0 without any delay.",
+    ),
     # Podified control plane configuration
     cfg.StrOpt(
         "podified_kubeconfig_path",
@@ -116,6 +320,35 @@ OptimizationGroup = [
         help="Namespace where OpenStack is deployed in a podified "
              "control plane environment."
     ),
+    cfg.BoolOpt(
+        "podified_persistent_shell",
+        default=False,
+        help="Run the promtool and curl commands sent to the prometheus "
+             "pod through a single long-lived 'oc rsh' shell, instead of "
+             "a new 'oc rsh' per command, in a podified control plane "
+             "environment."
+    ),
+    cfg.BoolOpt(
+        "podified_kube_api",
+        default=False,
+        help="List the prometheus pods and run commands in them with the "
+             "Kubernetes API, from the test process, instead of running "
+             "oc, in a podified control plane environment. The pods are "
+             "then cached by a watch. Requires the kubernetes python "
+             "library, and the podified_kubeconfig file, or the default "
+             "kubeconfig, to be readable by the test process. oc is used "
+             "when the library is not installed.",
+    ),
+    cfg.IntOpt(
+        "podified_pods_ttl",
+        default=15,
+        min=0,
+        help="Seconds during which the list of ready prometheus pods is "
+             "cached, in a podified control plane environment. Queries "
+             "run in every ready pod in turn, writes in the first one, "
+             "and commands failing in a pod which is no longer ready run "
+             "again in another pod.",
+    ),
     cfg.IntOpt(
         "real_workload_period",
         default=120,
@@ -19,13 +19,47 @@ import abc
 from tempest import clients
 from tempest.common import credentials_factory as creds_factory
 from tempest import config
+from tempest.lib.common.utils import data_utils
+from tempest.lib import exceptions
 
+from watcher_tempest_plugin.services import cassette
+from watcher_tempest_plugin.services.infra_optim.v1.json import (
+    async_client as aioc
+)
 from watcher_tempest_plugin.services.infra_optim.v1.json import client as ioc
 from watcher_tempest_plugin.services.metric import prometheus_client as pc
+from watcher_tempest_plugin.services.metric.v1.json import (
+    async_client as agc
+)
 from watcher_tempest_plugin.services.metric.v1.json import client as gc
 
 CONF = config.CONF
 
+# Tells apart the metrics injected by the test workers, which run in
+# different processes
+_RUN_ID = data_utils.rand_uuid_hex()[:12]
+
+
+def get_metrics_run_labels():
+    """Return the labels set on the Prometheus series injected here.
+
+    :raises: InvalidConfiguration if stable series are requested with a
+      random run id, which would create new series on every run.
+    """
+    if not CONF.optimize.metrics_run_label:
+        return {}
+    run_id = CONF.optimize.metrics_run_id
+    if not run_id:
+        if CONF.optimize.cassette_mode:
+            run_id = 'cassette'
+        elif CONF.optimize.prometheus_stable_series:
+            raise exceptions.InvalidConfiguration(
+                "[optimize] prometheus_stable_series requires a fixed "
+                "[optimize] metrics_run_id when metrics_run_label is set.")
+        else:
+            run_id = _RUN_ID
+    return {CONF.optimize.metrics_run_label: run_id}
+
 
 class BaseManager(clients.Manager, metaclass=abc.ABCMeta):
 
@@ -36,6 +70,12 @@ class BaseManager(clients.Manager, metaclass=abc.ABCMeta):
         self.gn_client = gc.GnocchiClientJSON(
             self.auth_provider, 'metric', CONF.identity.region)
         prom_ssl = "s" if CONF.optimize.prometheus_ssl_enabled else ""
+        prom_cassette = None
+        if CONF.optimize.cassette_mode:
+            prom_cassette = cassette.get_cassette(
+                CONF.optimize.cassette_dir, 'promtool',
+                CONF.optimize.cassette_mode,
+                speed=CONF.optimize.cassette_replay_speed)
         self.prometheus_client = pc.PromtoolClient(
             "http{}://{}:{}".format(prom_ssl,
                                     CONF.optimize.prometheus_host,
@@ -51,8 +91,30 @@ class BaseManager(clients.Manager, metaclass=abc.ABCMeta):
             prometheus_ssl_cert=CONF.optimize.prometheus_ssl_cert_dir,
             prometheus_fqdn_label=CONF.optimize.prometheus_fqdn_label,
             write_url_path=CONF.optimize.prometheus_write_path,
+            cassette=prom_cassette,
+            persistent_session=CONF.optimize.podified_persistent_shell,
+            native_write=CONF.optimize.prometheus_native_write,
+            native_query=CONF.optimize.prometheus_native_query,
+            stable_series=CONF.optimize.prometheus_stable_series,
+            tsdb_path=CONF.optimize.prometheus_tsdb_path,
+            targets_ttl=CONF.optimize.prometheus_targets_ttl,
+            pods_ttl=CONF.optimize.podified_pods_ttl,
+            kube_api=CONF.optimize.podified_kube_api,
+            run_labels=get_metrics_run_labels(),
         )
 
+    def get_async_io_client(self, max_concurrency=10):
+        """Build an asyncio Watcher client sharing this auth provider."""
+        return aioc.AsyncInfraOptimClient(
+            self.auth_provider, 'infra-optim', CONF.identity.region,
+            max_concurrency=max_concurrency)
+
+    def get_async_gn_client(self, max_concurrency=10):
+        """Build an asyncio Gnocchi client sharing this auth provider."""
+        return agc.AsyncGnocchiClient(
+            self.auth_provider, 'metric', CONF.identity.region,
+            max_concurrency=max_concurrency)
+
 
 class AdminManager(BaseManager):
     def __init__(self):
@@ -0,0 +1,217 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import asyncio
+import ssl
+import time
+
+import urllib.parse as urlparse
+
+from oslo_utils import importutils
+from tempest.lib import exceptions
+
+from watcher_tempest_plugin.services import instrumentation
+
+aiohttp = importutils.try_import('aiohttp')
+
+
+class _AsyncResponse(dict):
+    """Response wrapper compatible with tempest.lib.common.http."""
+
+    def __init__(self, info, url):
+        for key, value in info.headers.items():
+            self[str(key).lower()] = value
+        self.status = info.status
+        self['status'] = str(self.status)
+        self.reason = info.reason
+        self.version = info.version
+        self['content-location'] = url
+
+
+class _LoopState:
+    """Concurrency limit and HTTP session of a client in one event loop."""
+
+    def __init__(self, max_concurrency):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.session = None
+
+
+class AsyncClientMixin:
+    """Asyncio transport for BaseClient subclasses.
+
+    Mixed in front of a synchronous client, it turns the _list, _show,
+    _create, _patch, _delete and _put helpers into coroutines, so every
+    public method of the client returns an awaitable. Requests are sent
+    with aiohttp, authenticated by the same keystone auth provider as the
+    synchronous clients, and at most 'max_concurrency' of them are in
+    flight at any time.
+
+    The semaphore and the aiohttp session are bound to an event loop, the
+    client keeps one of each per loop, so that synchronous tests can call
+    it from successive asyncio.run() calls.
+    """
+
+    def __init__(self, *args, max_concurrency=10, **kwargs):
+        if aiohttp is None:
+            raise exceptions.InvalidConfiguration(
+                "The aiohttp library is required by the asyncio clients.")
+        super(AsyncClientMixin, self).__init__(*args, **kwargs)
+        self._ca_certs = kwargs.get('ca_certs')
+        self._max_concurrency = max_concurrency
+        self._loops = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Close the HTTP session of the running event loop."""
+        state = self._loops.pop(asyncio.get_running_loop(), None)
+        if state is not None and state.session is not None:
+            await state.session.close()
+
+    def _ssl_context(self):
+        """Return the ssl argument of the connector, as ClosingHttp does."""
+        if self.dscv:
+            return False
+        if self._ca_certs:
+            return ssl.create_default_context(cafile=self._ca_certs)
+        return True
+
+    def _loop_state(self):
+        """Return the semaphore and session of the running event loop."""
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            # The sessions of closed loops can no longer be closed, they
+            # are detached from their connectors and dropped.
+            for closed in [lp for lp in self._loops if lp.is_closed()]:
+                session = self._loops.pop(closed).session
+                if session is not None:
+                    session.detach()
+            state = self._loops[loop] = _LoopState(self._max_concurrency)
+        return state
+
+    def _get_session(self, state):
+        if state.session is None or state.session.closed:
+            state.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(ssl=self._ssl_context()))
+        return state.session
+
+    async def async_request(self, method, url, extra_headers=False,
+                            headers=None, body=None):
+        """Send a HTTP request using keystone auth and the catalog.
+
+        :param method: The HTTP verb to use for the request.
+        :param url: Relative url to send the request to.
+        :param extra_headers: Whether headers are added to the ones
+          returned by get_headers(), instead of replacing them.
+        :param headers: The headers to use for the request.
+        :param body: The body of the request.
+        :return: A tuple with the server response and the response body.
+        """
+        if headers is None:
+            headers = self.get_headers()
+        elif extra_headers:
+            headers = dict(self.get_headers(), **headers)
+
+        req_url, req_headers, req_body = self.auth_provider.auth_request(
+            method, url, headers, body, self.filters)
+
+        bytes_in = 0
+        start = time.monotonic()
+        try:
+            state = self._loop_state()
+            async with state.semaphore:
+                async with self._get_session(state).request(
+                        method, req_url, headers=req_headers,
+                        data=req_body) as r:
+                    resp_body = await r.read()
+            bytes_in = instrumentation.body_size(resp_body)
+        finally:
+            instrumentation.STATS.record(
+                instrumentation.RequestStats.endpoint(
+                    self.service, method, url),
+                time.monotonic() - start,
+                bytes_in=bytes_in,
+                bytes_out=instrumentation.body_size(body))
+
+        resp = _AsyncResponse(r, req_url)
+        self._error_checker(resp, resp_body)
+        return resp, resp_body
+
+    async def _list_request(self, resource, permanent=False, **kwargs):
+        uri = self._get_uri(resource, permanent=permanent)
+        if kwargs:
+            uri += "?%s" % urlparse.urlencode(kwargs)
+
+        resp, body = await self.async_request('GET', uri)
+        self.expected_success(200, resp.status)
+        return resp, self.deserialize(body)
+
+    async def _iter_request(self, resource, page_size=None, **kwargs):
+        collection = self._get_collection(resource)
+        params = dict(kwargs)
+        if page_size:
+            params['limit'] = page_size
+
+        while True:
+            _, body = await self._list_request(resource, **params)
+            for item in body.get(collection, []):
+                yield item
+
+            next_params = self._get_next_page_params(body, params)
+            if not next_params:
+                return
+            params.update(next_params)
+
+    async def _show_request(self, resource, uuid, permanent=False,
+                            **kwargs):
+        if 'uri' in kwargs:
+            uri = kwargs['uri']
+        else:
+            uri = self._get_uri(resource, uuid=uuid, permanent=permanent)
+
+        resp, body = await self.async_request('GET', uri)
+        self.expected_success(200, resp.status)
+        return resp, self.deserialize(body)
+
+    async def _create_request(self, resource, object_dict, headers=None):
+        uri = self._get_uri(resource)
+        resp, body = await self.async_request(
+            'POST', uri, headers=headers, body=self.serialize(object_dict))
+        self.expected_success([200, 201, 202], resp.status)
+        return resp, self.deserialize(body)
+
+    async def _delete_request(self, resource, uuid, headers=None):
+        uri = self._get_uri(resource, uuid)
+        resp, body = await self.async_request('DELETE', uri, headers=headers)
+        self.expected_success(204, resp.status)
+        return resp, body
+
+    async def _patch_request(self, resource, uuid, patch_object):
+        uri = self._get_uri(resource, uuid)
+        resp, body = await self.async_request(
+            'PATCH', uri, body=self.serialize(patch_object))
+        self.expected_success(200, resp.status)
+        return resp, self.deserialize(body)
+
+    async def _put_request(self, resource, put_object):
+        uri = self._get_uri(resource)
+        resp, body = await self.async_request(
+            'PUT', uri, body=self.serialize(put_object))
+        self.expected_success(202, resp.status)
+        return resp, body
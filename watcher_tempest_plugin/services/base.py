@@ -15,24 +15,152 @@
 # limitations under the License.
 
 import abc
-import base64
+import collections
+from concurrent import futures
 import functools
+import inspect
+import os
+import re
+import select
+import shlex
+import socket
 import subprocess
+import threading
+import time
+import uuid
 
 import urllib.parse as urlparse
 
 from oslo_log import log
+import paramiko
 from tempest import config
 from tempest.lib.common import rest_client
 from tempest.lib.common import ssh
+from tempest.lib import exceptions
+import urllib3
+
+from watcher_tempest_plugin.services import cassette
+from watcher_tempest_plugin.services import http_pool
+from watcher_tempest_plugin.services import instrumentation
+from watcher_tempest_plugin.services import json_codec
+from watcher_tempest_plugin.services import response_cache
+from watcher_tempest_plugin.services import retry
+from watcher_tempest_plugin.services import single_flight
 
 CONF = config.CONF
 LOG = log.getLogger(__name__)
 
+# Size of the chunks streamed to the stdin of the commands
+STDIN_CHUNK_SIZE = 64 * 1024
+
+
+def _iter_input_chunks(input_data, chunk_size=STDIN_CHUNK_SIZE):
+    """Split the input data of a command into bytes chunks.
+
+    :param input_data: A str or bytes, or an iterable of them, so that
+      large payloads can be generated while they are being sent.
+    :param chunk_size: Maximum size of a chunk.
+    """
+    if isinstance(input_data, (str, bytes, bytearray, memoryview)):
+        input_data = [input_data]
+    for data in input_data:
+        if isinstance(data, str):
+            for i in range(0, len(data), chunk_size):
+                yield data[i:i + chunk_size].encode('utf-8')
+        else:
+            data = memoryview(data)
+            for i in range(0, len(data), chunk_size):
+                yield data[i:i + chunk_size]
+
+
+class _InputWriter(threading.Thread):
+    """Thread streaming input data to the stdin of a command, then closing it.
+
+    The data is written from a separate thread, so that the caller keeps
+    reading the outputs of the command, which could otherwise block on a
+    full stdout pipe and never read the rest of its input. The errors of
+    the writer are raised by wait(), but for the write errors of a
+    command which stopped reading its input, e.g., 'head -n 1'.
+    """
+
+    def __init__(self, write, close, input_data, exited):
+        """Initialize _InputWriter.
+
+        :param write: Callable writing a chunk of data to the stdin.
+        :param close: Callable closing the stdin.
+        :param input_data: The data to write, see _iter_input_chunks.
+        :param exited: Callable returning whether the command exited.
+        """
+        super(_InputWriter, self).__init__(daemon=True)
+        self._write = write
+        self._close = close
+        self._input_data = input_data
+        self._exited = exited
+        self.error = None
+
+    def run(self):
+        chunks = _iter_input_chunks(self._input_data)
+        try:
+            while True:
+                # Errors of the input data are raised by the iterator
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    break
+                except Exception as e:
+                    self.error = e
+                    break
+                try:
+                    self._write(chunk)
+                except (OSError, ValueError, paramiko.SSHException) as e:
+                    if not self._stopped_reading(e):
+                        self.error = e
+                    break
+        finally:
+            try:
+                self._close()
+            except (OSError, ValueError, paramiko.SSHException) as e:
+                if self.error is None and not self._stopped_reading(e):
+                    self.error = e
+
+    def _stopped_reading(self, error):
+        if isinstance(error, BrokenPipeError) or self._exited():
+            LOG.debug(f"Command stopped reading its input: {error}")
+            return True
+        return False
+
+    def wait(self):
+        """Wait for the writer to end and raise its error, if any."""
+        self.join()
+        if self.error is not None:
+            raise self.error
+
+
+def _feed_input(write, close, input_data, exited):
+    """Stream input data to the stdin of a command, then close it.
+
+    :param write: Callable writing a chunk of data to the stdin.
+    :param close: Callable closing the stdin.
+    :param input_data: The data to write, see _iter_input_chunks.
+    :param exited: Callable returning whether the command exited.
+    :returns: The started _InputWriter thread, whose wait() raises the
+      errors of the writer.
+    """
+    writer = _InputWriter(write, close, input_data, exited)
+    writer.start()
+    return writer
+
 
 def handle_errors(f):
     """A decorator that allows to ignore certain types of errors."""
 
+    async def _await_ignoring(awaitable, ignored_errors):
+        try:
+            return await awaitable
+        except ignored_errors:
+            # Silently ignore errors
+            pass
+
     @functools.wraps(f)
     def wrapper(*args, **kwargs):
         param_name = 'ignore_errors'
@@ -42,10 +170,16 @@ def handle_errors(f):
             del kwargs[param_name]
 
         try:
-            return f(*args, **kwargs)
+            result = f(*args, **kwargs)
         except ignored_errors:
             # Silently ignore errors
-            pass
+            return None
+
+        # Methods of the asyncio clients return awaitables, which only
+        # raise once awaited.
+        if ignored_errors and inspect.isawaitable(result):
+            return _await_ignoring(result, ignored_errors)
+        return result
 
     return wrapper
 
@@ -55,6 +189,99 @@ class BaseClient(rest_client.RestClient, metaclass=abc.ABCMeta):
 
     URI_PREFIX = ''
 
+    # Resources whose GET responses may be cached, when the response
+    # cache is enabled.
+    CACHEABLE_RESOURCES = ()
+
+    def __init__(self, *args, **kwargs):
+        super(BaseClient, self).__init__(*args, **kwargs)
+        self.codec = json_codec.get_codec(CONF.optimize.json_codec)
+        self.retry_policy = None
+        if CONF.optimize.retry_max_attempts > 1:
+            self.retry_policy = retry.RetryPolicy(
+                max_attempts=CONF.optimize.retry_max_attempts,
+                backoff_base=CONF.optimize.retry_backoff_base,
+                backoff_max=CONF.optimize.retry_backoff_max,
+                max_elapsed=CONF.optimize.retry_max_elapsed,
+                retry_statuses=CONF.optimize.retry_statuses)
+        self.single_flight = None
+        if CONF.optimize.request_coalescing:
+            self.single_flight = single_flight.SingleFlight(
+                window=CONF.optimize.request_coalescing_window)
+        self.response_cache = None
+        if CONF.optimize.response_cache_ttl and self.CACHEABLE_RESOURCES:
+            self.response_cache = response_cache.ResponseCache(
+                ttls={res: CONF.optimize.response_cache_ttl
+                      for res in self.CACHEABLE_RESOURCES},
+                maxsize=CONF.optimize.response_cache_size)
+        # NOTE: proxied clients keep tempest's default transport
+        if (CONF.optimize.http_keep_alive
+                and not isinstance(self.http_obj, urllib3.ProxyManager)):
+            self.http_obj = http_pool.get_shared_http(
+                disable_ssl_certificate_validation=self.dscv,
+                ca_certs=kwargs.get('ca_certs'),
+                timeout=kwargs.get('http_timeout'),
+                follow_redirects=kwargs.get('follow_redirects', True),
+                maxsize=CONF.optimize.http_pool_maxsize)
+        if CONF.optimize.request_stats_dir:
+            instrumentation.dump_at_exit(CONF.optimize.request_stats_dir)
+        if CONF.optimize.cassette_mode:
+            self._use_cassette(cassette.get_cassette(
+                CONF.optimize.cassette_dir, self.service,
+                CONF.optimize.cassette_mode,
+                speed=CONF.optimize.cassette_replay_speed))
+
+    def _use_cassette(self, client_cassette):
+        """Record the traffic of the client, or replay it offline."""
+
+        def get_base_url():
+            return self.base_url
+
+        if client_cassette.mode == cassette.RECORD:
+            self.http_obj = cassette.RecordingHttp(
+                self.http_obj, client_cassette, get_base_url)
+        else:
+            self.auth_provider = cassette.OfflineAuthProvider()
+            self.http_obj = cassette.ReplayHttp(client_cassette, get_base_url)
+
+    def request(self, method, url, extra_headers=False, headers=None,
+                body=None, chunked=False):
+        """Send a HTTP request, retrying it on transient errors."""
+
+        send = functools.partial(
+            self._timed_request, method, url, extra_headers=extra_headers,
+            headers=headers, body=body, chunked=chunked)
+        if self.retry_policy is None:
+            return send()
+        return self.retry_policy.call(method, send)
+
+    def retry_stats(self):
+        """Return the retry counters, or None if retries are disabled."""
+
+        if self.retry_policy is None:
+            return None
+        return self.retry_policy.stats()
+
+    def _timed_request(self, method, url, extra_headers=False, headers=None,
+                       body=None, chunked=False):
+        """Send a HTTP request, recording its latency and size."""
+
+        bytes_in = 0
+        start = time.monotonic()
+        try:
+            resp, resp_body = super(BaseClient, self).request(
+                method, url, extra_headers=extra_headers, headers=headers,
+                body=body, chunked=chunked)
+            bytes_in = instrumentation.body_size(resp_body)
+            return resp, resp_body
+        finally:
+            instrumentation.STATS.record(
+                instrumentation.RequestStats.endpoint(
+                    self.service, method, url),
+                time.monotonic() - start,
+                bytes_in=bytes_in,
+                bytes_out=instrumentation.body_size(body))
+
     @abc.abstractmethod
     def serialize(self, object_dict):
         """Serialize an object."""
@@ -79,6 +306,89 @@ class BaseClient(rest_client.RestClient, metaclass=abc.ABCMeta):
                                            res=resource_name,
                                            uuid='/%s' % uuid if uuid else '')
 
+    @staticmethod
+    def _get_collection(resource):
+        """Get the collection name of a resource, e.g., 'audits'."""
+
+        return resource.strip('/').split('/')[0]
+
+    def _get_request(self, resource, uri):
+        """Send a GET request, going through the response cache.
+
+        Fresh cached responses are returned without any request. Stale
+        ones are revalidated with their ETag, when the server sent one.
+        Identical concurrent requests are coalesced, when enabled.
+
+        :param resource: The name of the REST resource, e.g., 'goals'.
+        :param uri: The URI of the request.
+        :return: A tuple with the server response and the response body.
+        """
+
+        collection = self._get_collection(resource)
+        cache = self.response_cache
+        if cache is None or not cache.is_cacheable(collection):
+            return self._coalesced_get(uri)
+
+        # Headers are part of the key, as they carry the API microversion
+        key = (uri, tuple(sorted(self.get_headers().items())))
+        entry, fresh = cache.lookup(key)
+        if fresh:
+            return entry.resp, entry.body
+
+        headers = None
+        if entry is not None and entry.etag:
+            headers = {'If-None-Match': entry.etag}
+        resp, body = self._coalesced_get(uri, headers=headers)
+
+        if resp.status == 304:
+            entry = cache.revalidated(key) or entry
+            return entry.resp, entry.body
+        if resp.status == 200:
+            cache.store(collection, key, resp, body)
+        return resp, body
+
+    def _coalesced_get(self, uri, headers=None):
+        """Send a GET request, sharing identical in-flight requests.
+
+        :param uri: The URI of the request.
+        :param headers: Headers added to the default ones.
+        :return: A tuple with the server response and the response body.
+        """
+
+        get = functools.partial(self.get, uri, headers=headers,
+                                extra_headers=True)
+        if self.single_flight is None:
+            return get()
+
+        key = (uri,
+               tuple(sorted(self.get_headers().items())),
+               tuple(sorted((headers or {}).items())))
+        return self.single_flight.do(key, get)
+
+    def coalescing_stats(self):
+        """Return the request coalescing statistics, or None if disabled."""
+
+        if self.single_flight is None:
+            return None
+        return self.single_flight.stats()
+
+    def invalidate_cache(self, resource=None):
+        """Drop cached responses of a resource, or all of them.
+
+        Called after every write request to the resource.
+        """
+
+        if self.response_cache is not None:
+            self.response_cache.invalidate(
+                self._get_collection(resource) if resource else None)
+
+    def cache_stats(self):
+        """Return the response cache statistics, or None if disabled."""
+
+        if self.response_cache is None:
+            return None
+        return self.response_cache.stats()
+
     def _make_patch(self, allowed_attributes, **kw):
         """Create a JSON patch according to RFC 6902.
 
@@ -121,11 +431,62 @@ class BaseClient(rest_client.RestClient, metaclass=abc.ABCMeta):
         if kwargs:
             uri += "?%s" % urlparse.urlencode(kwargs)
 
-        resp, body = self.get(uri)
+        resp, body = self._get_request(resource, uri)
         self.expected_success(200, int(resp['status']))
 
         return resp, self.deserialize(body)
 
+    def _iter_request(self, resource, page_size=None, **kwargs):
+        """Iterate over the objects of the specified type, page by page.
+
+        Pages are fetched lazily: the next page is only requested once
+        every object of the current one has been consumed, following the
+        'next' link returned by the API.
+
+        :param resource: The name of the REST resource, e.g., 'audits'.
+        :param page_size: Maximum number of objects requested per page.
+            When None, the API default page size is used.
+        :param **kwargs: Parameters for the request.
+        :return: A generator of deserialized objects.
+        """
+
+        collection = self._get_collection(resource)
+        params = dict(kwargs)
+        if page_size:
+            params['limit'] = page_size
+
+        while True:
+            _, body = self._list_request(resource, **params)
+            for item in body.get(collection, []):
+                yield item
+
+            next_params = self._get_next_page_params(body, params)
+            if not next_params:
+                return
+            params.update(next_params)
+
+    @staticmethod
+    def _get_next_page_params(body, params):
+        """Get the parameters of the next page of a list request.
+
+        :param body: The deserialized body of the current page.
+        :param params: Parameters used to request the current page.
+        :return: The parameters to update for the next page, or None when
+                 the current page is the last one.
+        """
+
+        next_link = body.get('next')
+        if not next_link:
+            return None
+
+        # NOTE: the 'next' link is absolute and may not keep every
+        # filter, so only the pagination parameters are taken from it.
+        next_params = dict(urlparse.parse_qsl(
+            urlparse.urlsplit(next_link).query))
+        if next_params.get('marker') in (None, params.get('marker')):
+            return None
+        return next_params
+
     def _show_request(self, resource, uuid, permanent=False, **kwargs):
         """Gets a specific object of the specified type.
 
@@ -137,7 +498,7 @@ class BaseClient(rest_client.RestClient, metaclass=abc.ABCMeta):
             uri = kwargs['uri']
         else:
             uri = self._get_uri(resource, uuid=uuid, permanent=permanent)
-        resp, body = self.get(uri)
+        resp, body = self._get_request(resource, uri)
         self.expected_success(200, int(resp['status']))
 
         return resp, self.deserialize(body)
@@ -156,6 +517,7 @@ class BaseClient(rest_client.RestClient, metaclass=abc.ABCMeta):
         uri = self._get_uri(resource)
 
         resp, body = self.post(uri, body=body, headers=headers)
+        self.invalidate_cache(resource)
         self.expected_success([200, 201, 202], int(resp['status']))
 
         return resp, self.deserialize(body)
@@ -171,6 +533,7 @@ class BaseClient(rest_client.RestClient, metaclass=abc.ABCMeta):
         uri = self._get_uri(resource, uuid)
 
         resp, body = self.delete(uri, headers=headers)
+        self.invalidate_cache(resource)
         self.expected_success(204, int(resp['status']))
         return resp, body
 
@@ -187,6 +550,7 @@ class BaseClient(rest_client.RestClient, metaclass=abc.ABCMeta):
         patch_body = self.serialize(patch_object)
 
         resp, body = self.patch(uri, body=patch_body)
+        self.invalidate_cache(resource)
         self.expected_success(200, int(resp['status']))
         return resp, self.deserialize(body)
 
@@ -213,10 +577,105 @@ class BaseClient(rest_client.RestClient, metaclass=abc.ABCMeta):
         put_body = self.serialize(put_object)
 
         resp, body = self.put(uri, body=put_body)
+        self.invalidate_cache(resource)
         self.expected_success(202, int(resp['status']))
         return resp, body
 
 
+CmdResult = collections.namedtuple(
+    'CmdResult', ['stdout', 'stderr', 'exit_status'])
+
+
+class StreamingNotSupported(Exception):
+    """A command client cannot stream the stdin or outputs of commands."""
+
+
+class CmdStream(metaclass=abc.ABCMeta):
+    """A running command, with its stdin and outputs left open."""
+
+    @abc.abstractmethod
+    def write(self, data):
+        """Write bytes to the stdin of the command."""
+
+    @abc.abstractmethod
+    def read(self, stderr=False):
+        """Read bytes from the stdout, or stderr, of the command.
+
+        Blocks until some data is available.
+
+        :return: The bytes read, or b'' when the output was closed.
+        """
+
+    @abc.abstractmethod
+    def close(self):
+        """Stop the command and release its resources."""
+
+
+class _SubProcessStream(CmdStream):
+
+    def __init__(self, process):
+        self.process = process
+        # The outputs are closed once no thread is reading them, as their
+        # file descriptors may be reused by other processes right away.
+        self._lock = threading.Lock()
+        self._readers = 0
+        self._closed = False
+
+    def write(self, data):
+        self.process.stdin.write(data)
+        self.process.stdin.flush()
+
+    def read(self, stderr=False):
+        pipe = self.process.stderr if stderr else self.process.stdout
+        with self._lock:
+            if self._closed:
+                return b''
+            self._readers += 1
+        try:
+            return os.read(pipe.fileno(), STDIN_CHUNK_SIZE)
+        finally:
+            with self._lock:
+                self._readers -= 1
+                if self._closed and not self._readers:
+                    self._close_pipes(self.process.stdout,
+                                      self.process.stderr)
+
+    @staticmethod
+    def _close_pipes(*pipes):
+        for pipe in pipes:
+            try:
+                pipe.close()
+            except OSError:
+                pass
+
+    def close(self):
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        self._close_pipes(self.process.stdin)
+        with self._lock:
+            self._closed = True
+            if not self._readers:
+                self._close_pipes(self.process.stdout, self.process.stderr)
+
+
+class _SshStream(CmdStream):
+
+    def __init__(self, channel):
+        self.channel = channel
+
+    def write(self, data):
+        self.channel.sendall(data)
+
+    def read(self, stderr=False):
+        if stderr:
+            return self.channel.recv_stderr(STDIN_CHUNK_SIZE)
+        return self.channel.recv(STDIN_CHUNK_SIZE)
+
+    def close(self):
+        self.channel.close()
+
+
 class BaseCmdClient(metaclass=abc.ABCMeta):
 
     @abc.abstractmethod
@@ -225,13 +684,61 @@ class BaseCmdClient(metaclass=abc.ABCMeta):
 
         :param cmd: command to be execute, which can be a string
             or a sequence of arguments.
-        :param input_data: data to be sent to process stdin
+        :param input_data: data to be sent to process stdin, either a str
+            or bytes, or an iterable of them, which is streamed in chunks.
         :param timeout: communication timeout in seconds
         :return: output written to stdout.
         :raises: Exception when command fails.
         """
         pass
 
+    @abc.abstractmethod
+    def run_cmd(self, cmd, input_data=None, timeout=None):
+        """Execute a command and return its outputs and exit status.
+
+        Unlike exec_cmd, a command exiting with an error is not considered
+        as a failure of the client.
+
+        :param cmd: command to be execute, which can be a string
+            or a sequence of arguments.
+        :param input_data: data to be sent to process stdin, as in
+            exec_cmd.
+        :param timeout: communication timeout in seconds
+        :return: A CmdResult.
+        :raises: Exception when the command cannot be executed.
+        """
+        pass
+
+    def open_stream(self, cmd):
+        """Start a long-running command whose stdin and outputs are streamed.
+
+        :param cmd: command to be execute, which can be a string
+            or a sequence of arguments.
+        :return: A CmdStream.
+        :raises: StreamingNotSupported if the client cannot stream
+            commands.
+        """
+        raise StreamingNotSupported(
+            f"{type(self).__name__} does not support command streams.")
+
+
+_ENV_ASSIGNMENT = re.compile(r'[A-Za-z_][A-Za-z0-9_]*=')
+
+
+def _popen_args(cmd):
+    """Return the arguments and environment of a command run without shell.
+
+    String commands are split as by a shell, and the leading variable
+    assignments, e.g., 'KUBECONFIG=/path oc', are set in the environment.
+    """
+    argv = shlex.split(cmd) if isinstance(cmd, str) else list(cmd)
+    env = None
+    while argv and _ENV_ASSIGNMENT.match(argv[0]):
+        env = env if env is not None else dict(os.environ)
+        name, _, value = argv.pop(0).partition('=')
+        env[name] = value
+    return argv, env
+
 
 class SubProcessCmdClient(BaseCmdClient):
     """Command execution client based on subprocess"""
@@ -241,38 +748,92 @@ class SubProcessCmdClient(BaseCmdClient):
 
         :param cmd: command to be execute, which can be a string
           or a sequence of arguments.
-        :param input_data: data to be sent to process stdin
+        :param input_data: data to be sent to process stdin, either a str
+          or bytes, or an iterable of them, which is streamed in chunks.
         :param timeout: communication timeout in seconds
         :return: output written to stdout.
-        :raises: Exception when command fails.
+        :raises: CommandFailed when command fails.
         """
-        LOG.debug(f"Executing command '{cmd}' with input data '{input_data}'")
-        sp = subprocess.Popen(cmd,
+        result = self.run_cmd(cmd, input_data=input_data, timeout=timeout)
+        if len(result.stderr) > 1:
+            raise exceptions.CommandFailed(
+                result.exit_status, cmd, result.stdout, result.stderr)
+
+        return result.stdout
+
+    def run_cmd(self, cmd, input_data=None, timeout=None):
+        LOG.debug(f"Executing command '{cmd}'"
+                  + (" with input data" if input_data is not None else ""))
+        argv, env = _popen_args(cmd)
+        sp = subprocess.Popen(argv, env=env,
                               stdout=subprocess.PIPE,
                               stdin=subprocess.PIPE,
-                              stderr=subprocess.PIPE, text=True)
-        out, err = sp.communicate(input=input_data, timeout=timeout)
-
-        if len(err) > 1:
-            raise Exception(f"Subprocess command failed with: {err}")
-
-        return out
+                              stderr=subprocess.PIPE, bufsize=0)
+        writer = None
+        if input_data is not None:
+            # The stdin is owned by the writer thread, communicate() only
+            # collects the outputs.
+            stdin, sp.stdin = sp.stdin, None
+            writer = _feed_input(stdin.write, stdin.close, input_data,
+                                 lambda: sp.poll() is not None)
+        try:
+            out, err = sp.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            sp.kill()
+            sp.communicate()
+            if writer is not None:
+                # The timeout is reported rather than the writer errors
+                # it caused
+                writer.join()
+            raise
+        if writer is not None:
+            writer.wait()
+
+        return CmdResult(out.decode('utf-8'), err.decode('utf-8'),
+                         sp.returncode)
+
+    def open_stream(self, cmd):
+        LOG.debug(f"Starting command stream '{cmd}'")
+        argv, env = _popen_args(cmd)
+        sp = subprocess.Popen(argv, env=env,
+                              stdout=subprocess.PIPE,
+                              stdin=subprocess.PIPE,
+                              stderr=subprocess.PIPE, bufsize=0)
+        return _SubProcessStream(sp)
 
 
 class SshCmdClient(BaseCmdClient, ssh.Client):
+    """Command execution client based on SSH.
+
+    A single authenticated SSH transport is kept open per client, and
+    every command runs in a new channel of that transport. The transport
+    is re-established when it dies or after being idle for
+    'idle_timeout' seconds. List commands are quoted for the remote
+    shell, string commands are run as is.
+    """
 
     def __init__(self, host, username, password=None, timeout=300, pkey=None,
                  channel_timeout=10, look_for_keys=True, key_filename=None,
-                 port=22, pkey_type='rsa'):
+                 port=22, pkey_type='rsa', keepalive_interval=30,
+                 idle_timeout=300):
 
         # Prefix to be always include in all commands
         self._cmd_prefix = ""
 
-        super(SshCmdClient, self).__init__(
+        ssh_kwargs = dict(
             host=host, username=username, password=password, timeout=timeout,
             pkey=pkey, channel_timeout=channel_timeout,
             look_for_keys=look_for_keys, key_filename=key_filename, port=port,
             ssh_key_type=pkey_type)
+        super(SshCmdClient, self).__init__(**ssh_kwargs)
+        # Settings of the clients connecting for a single command
+        self._ssh_kwargs = ssh_kwargs
+
+        self.keepalive_interval = keepalive_interval
+        self.idle_timeout = idle_timeout
+        self._connection = None
+        self._last_used = 0.0
+        self._connection_lock = threading.Lock()
 
     @property
     def cmd_prefix(self):
@@ -282,36 +843,250 @@ class SshCmdClient(BaseCmdClient, ssh.Client):
     def cmd_prefix(self, value):
         self._cmd_prefix = value
 
+    def close(self):
+        """Close the SSH transport kept open by the client."""
+        with self._connection_lock:
+            self._close_connection()
+
+    def _close_connection(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _connect(self):
+        """Open the SSH connection kept by the client.
+
+        tempest.lib only exposes per-command connections publicly, the
+        connection is opened with its private helper.
+
+        :returns: A connected paramiko SSHClient, or None if the helper is
+          no longer available.
+        """
+        connect = getattr(super(SshCmdClient, self), '_get_ssh_connection',
+                          None)
+        if connect is None:
+            LOG.warning("tempest.lib cannot open persistent SSH "
+                        "connections, connecting for every command.")
+            return None
+        return connect()
+
+    def _get_transport(self, reconnect=False):
+        """Return the SSH transport, connecting it when needed.
+
+        :param reconnect: Whether to drop the current transport first.
+        :returns: An active paramiko Transport, or None if the connection
+          cannot be kept open.
+        """
+        with self._connection_lock:
+            now = time.monotonic()
+            if self._connection is not None:
+                transport = self._connection.get_transport()
+                if (reconnect or transport is None
+                        or not transport.is_active()
+                        or now - self._last_used > self.idle_timeout):
+                    self._close_connection()
+
+            if self._connection is None:
+                self._connection = self._connect()
+                if self._connection is None:
+                    return None
+                transport = self._connection.get_transport()
+                transport.set_keepalive(self.keepalive_interval)
+                # Small command packets must not wait for delayed ACKs
+                if isinstance(transport.sock, socket.socket):
+                    transport.sock.setsockopt(
+                        socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._last_used = now
+            return self._connection.get_transport()
+
+    def _open_channel(self):
+        """Open a channel of the SSH transport, or return None."""
+        try:
+            transport = self._get_transport()
+            return transport and transport.open_session()
+        except (EOFError, OSError, paramiko.SSHException) as e:
+            LOG.debug(f"SSH transport to host '{self.host}' failed: {e}. "
+                      "Reconnecting.")
+            transport = self._get_transport(reconnect=True)
+            return transport and transport.open_session()
+
+    def _read_channel(self, channel, cmd_str, timeout):
+        """Read the stdout and stderr of a command until it exits."""
+        out_chunks = []
+        err_chunks = []
+        start = time.monotonic()
+        while True:
+            received = False
+            while channel.recv_ready():
+                out_chunks.append(channel.recv(self.buf_size))
+                received = True
+            while channel.recv_stderr_ready():
+                err_chunks.append(channel.recv_stderr(self.buf_size))
+                received = True
+            if (channel.exit_status_ready() and not channel.recv_ready()
+                    and not channel.recv_stderr_ready()):
+                break
+            if not received:
+                remaining = timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    raise exceptions.TimeoutException(
+                        f"Command: '{cmd_str}' executed on host "
+                        f"'{self.host}'.")
+                select.select([channel], [], [],
+                              min(remaining, self.channel_timeout))
+        return b''.join(out_chunks), b''.join(err_chunks)
+
     def exec_cmd(self, cmd, input_data=None, timeout=None):
         """Execute a command with an optional input data.
 
         :param cmd: command to be execute, which can be a string
             or a sequence of arguments.
-        :param input_data: data to be sent to process stdin
+        :param input_data: data to be sent to process stdin, either a str
+            or bytes, or an iterable of them, which is streamed in chunks.
         :param timeout: communication timeout in seconds
 
         :returns: output written to stdout.
-        :raises: Exception when command fails.
+        :raises: SSHExecCommandFailed if the command exits with a nonzero
+            status.
+        :raises: TimeoutException if the command doesn't end when timeout
+            expires.
         """
-        cmd_str = " ".join(cmd) if isinstance(cmd, list) else cmd
-
-        if input_data:
-            # if stdin data, encode to base64 and decode in the remote host
-            b64_input_str = base64.b64encode(
-                input_data.encode("ascii")).decode("ascii")
-            cmd_str = (
-                f"sh -c \"echo \"{b64_input_str}\" | base64 -d | {cmd_str}\"")
-
+        result = self.run_cmd(cmd, input_data=input_data, timeout=timeout)
+        if result.exit_status != 0:
+            raise exceptions.SSHExecCommandFailed(
+                command=self._build_cmd(cmd), exit_status=result.exit_status,
+                stderr=result.stderr, stdout=result.stdout)
+        return result.stdout
+
+    def _build_cmd(self, cmd):
+        cmd_str = shlex.join(cmd) if isinstance(cmd, list) else cmd
         if self.cmd_prefix:
             cmd_str = f"{self.cmd_prefix} {cmd_str}"
+        return cmd_str
+
+    def _run_cmd_once(self, cmd_str, input_data, timeout):
+        """Run a command with a SSH connection of its own.
 
+        Only the public API of tempest.lib is used, so the input data is
+        passed as a here-document, and the exit status is printed after
+        the outputs. The stderr of the commands is not available.
+        """
+        token = f"__watcher_{uuid.uuid4().hex}__"
+        # The subshell keeps the status line when the command exits
+        cmd_str = f"({cmd_str}\n)"
+        if input_data is not None:
+            data = b''.join(_iter_input_chunks(input_data)).decode('utf-8')
+            if not data.endswith('\n'):
+                data += '\n'
+            cmd_str = f"{cmd_str} <<'{token}'\n{data}{token}"
+        cmd_str += f"\nprintf '\\n%s %d' {token} $?"
+        client = ssh.Client(**dict(self._ssh_kwargs,
+                                   timeout=timeout or self.timeout))
+        # Built like in run_cmd, the input data is quoted by the token
+        out = client.exec_command(cmd_str)  # nosec B601
+        out, _, status = out.rpartition(f"\n{token} ")
+        return CmdResult(out, '', int(status))
+
+    def run_cmd(self, cmd, input_data=None, timeout=None):
+        cmd_str = self._build_cmd(cmd)
         LOG.debug(f"Executing command '{cmd_str}' on host '{self.host}'")
 
-        if timeout:
-            original_timeout = self.timeout
-            self.timeout = timeout
-        try:
-            return super(SshCmdClient, self).exec_command(cmd=cmd_str)
-        finally:
-            if timeout:
-                self.timeout = original_timeout
+        channel = self._open_channel()
+        if channel is None:
+            return self._run_cmd_once(cmd_str, input_data, timeout)
+        with channel:
+            # List commands are quoted by _build_cmd, string commands are
+            # shell snippets written by the callers
+            channel.exec_command(cmd_str)  # nosec B601
+            writer = None
+            if input_data is not None:
+                writer = _feed_input(channel.sendall, channel.shutdown_write,
+                                     input_data, channel.exit_status_ready)
+            else:
+                channel.shutdown_write()
+            out_data, err_data = self._read_channel(
+                channel, cmd_str, timeout or self.timeout)
+            exit_status = channel.recv_exit_status()
+            if writer is not None:
+                writer.wait()
+
+        return CmdResult(out_data.decode('utf-8'), err_data.decode('utf-8'),
+                         exit_status)
+
+    def open_stream(self, cmd):
+        cmd_str = self._build_cmd(cmd)
+        LOG.debug(f"Starting command stream '{cmd_str}' on host "
+                  f"'{self.host}'")
+        channel = self._open_channel()
+        if channel is None:
+            return super(SshCmdClient, self).open_stream(cmd)
+        # List commands are quoted by _build_cmd, string commands are
+        # shell snippets written by the callers
+        channel.exec_command(cmd_str)  # nosec B601
+        return _SshStream(channel)
+
+
+FanOutResult = collections.namedtuple(
+    'FanOutResult',
+    ['target', 'stdout', 'stderr', 'exit_status', 'duration', 'error'])
+
+
+class FanOutCmdExecutor:
+    """Run commands on many command clients concurrently.
+
+    Every target is a command client, e.g., a SshCmdClient per compute
+    node, and at most 'max_workers' commands are running at any time.
+    """
+
+    def __init__(self, clients, max_workers=16):
+        """Initialize FanOutCmdExecutor.
+
+        :param clients: A dict of BaseCmdClient, by target name.
+        :param max_workers: Maximum number of concurrent commands.
+        """
+        self.clients = dict(clients)
+        self.max_workers = max_workers
+
+    def run(self, cmd, input_data=None, timeout=None):
+        """Run a command on every target, or a command per target.
+
+        :param cmd: The command run on every target, or a dict with the
+            command to run by target name, in which case only those
+            targets are run.
+        :param input_data: data sent to the stdin of every command, a str
+            or bytes, as an iterable would only be consumed once.
+        :param timeout: communication timeout of each command, in seconds
+        :return: A dict of FanOutResult by target name. error holds the
+            exception raised when the command could not be executed, in
+            which case exit_status is None.
+        """
+        if isinstance(cmd, dict):
+            cmds = cmd
+        else:
+            cmds = {target: cmd for target in self.clients}
+
+        def _run(target):
+            start = time.monotonic()
+            try:
+                result = self.clients[target].run_cmd(
+                    cmds[target], input_data=input_data, timeout=timeout)
+            except Exception as e:
+                return FanOutResult(target, None, None, None,
+                                    time.monotonic() - start, e)
+            return FanOutResult(target, result.stdout, result.stderr,
+                                result.exit_status,
+                                time.monotonic() - start, None)
+
+        if not cmds:
+            return {}
+
+        workers = max(1, min(self.max_workers, len(cmds)))
+        with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            return {result.target: result
+                    for result in executor.map(_run, list(cmds))}
+
+    @staticmethod
+    def failures(results):
+        """Return the results of the commands which did not succeed."""
+        return {target: result for target, result in results.items()
+                if result.error is not None or result.exit_status != 0}
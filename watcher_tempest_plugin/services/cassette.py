@@ -0,0 +1,396 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Record and replay the traffic of the REST and command clients.
+
+Cassettes are JSON Lines files, one interaction per line, written as
+they happen when recording, which replaces any previous recording, and
+read lazily when replaying, so neither mode holds a whole cassette in
+memory. Every test worker records its own file, and the files of all the
+workers are replayed together. Interactions are matched on replay by
+request method and path, or by command line, in recorded order.
+Arguments holding the current time, e.g., promtool's '--time=', are left
+out of the command lines matched. When a request is repeated more times
+than recorded, e.g., by a waiter, the last recorded response is returned
+again.
+"""
+
+import base64
+import collections
+import fcntl
+import glob
+import json
+import os
+import re
+import threading
+import time
+
+RECORD = 'record'
+REPLAY = 'replay'
+
+# Same fields as base.CmdResult, which cannot be imported from here
+_CmdResult = collections.namedtuple(
+    '_CmdResult', ['stdout', 'stderr', 'exit_status'])
+
+# Arguments of the commands whose value changes on every run
+_VOLATILE_ARGS = re.compile(r'((?:--|-d )(?:time|start|end)=)\S+')
+
+_CASSETTES = {}
+_CASSETTES_LOCK = threading.Lock()
+
+# Cassette files written before the test worker started are left by
+# previous recordings
+_PROCESS_START = time.time()
+
+
+class CassetteMismatch(Exception):
+    """A replayed request was never recorded in the cassette."""
+
+
+def _encode_body(body):
+    if body is None:
+        return {}
+    if isinstance(body, str):
+        return {'body': body}
+    try:
+        return {'body': body.decode('utf-8'), 'bytes': True}
+    except UnicodeDecodeError:
+        return {'body_b64': base64.b64encode(body).decode('ascii')}
+
+
+def _decode_body(interaction):
+    if 'body_b64' in interaction:
+        return base64.b64decode(interaction['body_b64'])
+    body = interaction.get('body')
+    if body is not None and interaction.get('bytes'):
+        return body.encode('utf-8')
+    return body
+
+
+def _cmd_key(cmd):
+    """Return the command line matching a command on replay."""
+    cmd_str = " ".join(cmd) if isinstance(cmd, list) else cmd
+    return _VOLATILE_ARGS.sub(r'\1*', cmd_str)
+
+
+class Cassette:
+    """A cassette file, either being recorded or replayed."""
+
+    # Interactions read ahead of the replayed ones, while looking for the
+    # next interaction of a request
+    MAX_PENDING = 10000
+
+    def __init__(self, path, mode, speed=0.0, max_pending=MAX_PENDING):
+        """Initialize Cassette.
+
+        :param path: Path of the cassette file. On replay, a list of paths
+          whose interactions are read in turn.
+        :param mode: Either 'record' or 'replay'.
+        :param speed: Replay speed factor. 1.0 replays interactions with
+          their recorded latency, 2.0 twice as fast, and 0 without any
+          delay.
+        :param max_pending: Maximum number of interactions read ahead on
+          replay. A request not found within them is a mismatch.
+        """
+        self.paths = [path] if isinstance(path, str) else list(path)
+        self.path = ', '.join(self.paths)
+        self.mode = mode
+        self.speed = speed
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._file = None
+        self._replay_files = None
+        self._pending = collections.defaultdict(collections.deque)
+        self._pending_count = 0
+        self._last = {}
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            for replay_file in self._replay_files or ():
+                replay_file.close()
+            self._replay_files = None
+
+    def _open_recording(self):
+        # The file stays locked while recording, so that other test
+        # workers never remove it
+        while True:
+            recording = open(self.path, 'a')
+            fcntl.flock(recording, fcntl.LOCK_EX)
+            # Unless it was removed before being locked
+            if os.fstat(recording.fileno()).st_nlink:
+                break
+            recording.close()
+        recording.truncate(0)
+        return recording
+
+    def record(self, kind, key, elapsed, **fields):
+        """Append an interaction to the cassette.
+
+        The first interaction recorded truncates the cassette file.
+        """
+        line = json.dumps(dict(fields, kind=kind, key=key,
+                               elapsed=round(elapsed, 6)),
+                          separators=(',', ':'))
+        with self._lock:
+            if self._file is None:
+                self._file = self._open_recording()
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def _next_line(self):
+        # The files recorded by the test workers are read in turn
+        if self._replay_files is None:
+            self._replay_files = collections.deque(
+                open(path, 'r') for path in self.paths)
+        while self._replay_files:
+            replay_file = self._replay_files.popleft()
+            line = replay_file.readline()
+            if line:
+                self._replay_files.append(replay_file)
+                return json.loads(line)
+            replay_file.close()
+        return None
+
+    def replay(self, kind, key):
+        """Return the next recorded interaction for a request.
+
+        :param kind: Either 'http' or 'cmd'.
+        :param key: The request method and path, or the command line.
+        :raises: CassetteMismatch if the request was never recorded.
+        :returns: The recorded interaction, as a dict.
+        """
+        with self._lock:
+            match_key = (kind, key)
+            pending = self._pending[match_key]
+            while not pending and self._pending_count < self.max_pending:
+                interaction = self._next_line()
+                if interaction is None:
+                    break
+                self._pending[(interaction['kind'],
+                               interaction['key'])].append(interaction)
+                self._pending_count += 1
+            if pending:
+                interaction = pending.popleft()
+                self._pending_count -= 1
+                if not pending:
+                    del self._pending[match_key]
+                self._last[match_key] = interaction
+            elif match_key in self._last:
+                interaction = self._last[match_key]
+            else:
+                raise CassetteMismatch(
+                    f"No {kind} interaction recorded for '{key}' in "
+                    f"{self.path}, within the next {self.max_pending} "
+                    "interactions.")
+
+        if self.speed:
+            time.sleep(interaction['elapsed'] / self.speed)
+        return interaction
+
+
+def _cassette_paths(directory, name):
+    """Return the files of a cassette, recorded by any test worker."""
+    return sorted(glob.glob(os.path.join(
+        glob.escape(directory), f"{glob.escape(name)}.*jsonl")))
+
+
+def _remove_previous_recordings(paths):
+    """Remove the cassette files recorded by previous runs.
+
+    Files locked by a recording test worker, or written since this worker
+    started, belong to the current run and are kept.
+    """
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_WRONLY)
+        except FileNotFoundError:
+            continue
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            if os.fstat(fd).st_mtime < _PROCESS_START:
+                os.unlink(path)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def get_cassette(directory, name, mode, speed=0.0):
+    """Return the process-wide cassette of a client.
+
+    Every test worker process records its own '<name>.<pid>.jsonl' file,
+    and removes the files of previous recordings. On replay, the files
+    of all the workers are read.
+
+    :param directory: Directory holding the cassette files.
+    :param name: Name of the cassette, e.g., the service type.
+    :param mode: Either 'record' or 'replay'.
+    :param speed: Replay speed factor.
+    :returns: A Cassette instance.
+    """
+    key = (directory, name, mode, os.getpid())
+    with _CASSETTES_LOCK:
+        if key not in _CASSETTES:
+            if mode == RECORD:
+                path = os.path.join(directory, f"{name}.{os.getpid()}.jsonl")
+                _remove_previous_recordings(
+                    p for p in _cassette_paths(directory, name) if p != path)
+            else:
+                path = (_cassette_paths(directory, name)
+                        or os.path.join(directory, f"{name}.jsonl"))
+            _CASSETTES[key] = Cassette(path, mode, speed=speed)
+        return _CASSETTES[key]
+
+
+def _http_key(method, url, base_url):
+    # Keys are relative to the service endpoint, so that cassettes can be
+    # replayed against any other endpoint.
+    if base_url and url.startswith(base_url):
+        url = url[len(base_url):]
+    return f"{method} /{url.lstrip('/')}"
+
+
+class _ReplayResponse(dict):
+    """Response wrapper compatible with tempest.lib.common.http."""
+
+    def __init__(self, interaction, url):
+        self.update(interaction.get('headers', {}))
+        self.status = interaction['status']
+        self['status'] = str(self.status)
+        self.reason = interaction.get('reason')
+        self.version = interaction.get('version')
+        self['content-location'] = url
+
+
+class RecordingHttp:
+    """HTTP transport recording the responses of another transport."""
+
+    def __init__(self, http, cassette, get_base_url):
+        """Initialize RecordingHttp.
+
+        :param http: The transport whose responses are recorded.
+        :param cassette: The cassette to record into.
+        :param get_base_url: Callable returning the service endpoint.
+        """
+        self.http = http
+        self.cassette = cassette
+        self.get_base_url = get_base_url
+
+    def request(self, url, method, *args, **kwargs):
+        start = time.monotonic()
+        resp, body = self.http.request(url, method, *args, **kwargs)
+        if not kwargs.get('preload_content', True):
+            return resp, body
+        # NOTE: request headers are not recorded as they hold the token
+        self.cassette.record(
+            'http', _http_key(method, url, self.get_base_url()),
+            time.monotonic() - start,
+            status=resp.status, reason=resp.reason, version=resp.version,
+            headers={k: v for k, v in resp.items()
+                     if k not in ('status', 'content-location')},
+            **_encode_body(body))
+        return resp, body
+
+
+class ReplayHttp:
+    """HTTP transport serving the responses recorded in a cassette."""
+
+    def __init__(self, cassette, get_base_url):
+        self.cassette = cassette
+        self.get_base_url = get_base_url
+
+    def request(self, url, method, *args, **kwargs):
+        interaction = self.cassette.replay(
+            'http', _http_key(method, url, self.get_base_url()))
+        return _ReplayResponse(interaction, url), _decode_body(interaction)
+
+
+class OfflineAuthProvider:
+    """Auth provider used on replay, which never contacts keystone."""
+
+    def __init__(self, base_url='http://replay'):
+        self._base_url = base_url
+
+    def auth_request(self, method, url, headers=None, body=None,
+                     filters=None):
+        return (f"{self._base_url}/{url.lstrip('/')}", dict(headers or {}),
+                body)
+
+    def base_url(self, filters, auth_data=None):
+        return self._base_url
+
+    def get_token(self):
+        return 'replay'
+
+
+class CassetteCmdClient:
+    """Command client recording or replaying another command client."""
+
+    def __init__(self, client, cassette):
+        self.client = client
+        self.cassette = cassette
+        self._cmd_prefix = ""
+
+    @property
+    def cmd_prefix(self):
+        return self._cmd_prefix
+
+    @cmd_prefix.setter
+    def cmd_prefix(self, value):
+        self._cmd_prefix = value
+        if self.cassette.mode == RECORD:
+            self.client.cmd_prefix = value
+
+    def exec_cmd(self, cmd, input_data=None, timeout=None):
+        cmd_str = _cmd_key(cmd)
+        if self.cassette.mode == REPLAY:
+            interaction = self.cassette.replay('cmd', cmd_str)
+            if 'error' in interaction:
+                raise Exception(interaction['error'])
+            return interaction['output']
+
+        start = time.monotonic()
+        try:
+            out = self.client.exec_cmd(cmd, input_data=input_data,
+                                       timeout=timeout)
+        except Exception as e:
+            self.cassette.record('cmd', cmd_str, time.monotonic() - start,
+                                 error=str(e))
+            raise
+        self.cassette.record('cmd', cmd_str, time.monotonic() - start,
+                             output=out)
+        return out
+
+    def run_cmd(self, cmd, input_data=None, timeout=None):
+        cmd_str = _cmd_key(cmd)
+        if self.cassette.mode == REPLAY:
+            interaction = self.cassette.replay('run', cmd_str)
+            if 'error' in interaction:
+                raise Exception(interaction['error'])
+            return _CmdResult(*interaction['result'])
+
+        start = time.monotonic()
+        try:
+            result = self.client.run_cmd(cmd, input_data=input_data,
+                                         timeout=timeout)
+        except Exception as e:
+            self.cassette.record('run', cmd_str, time.monotonic() - start,
+                                 error=str(e))
+            raise
+        self.cassette.record('run', cmd_str, time.monotonic() - start,
+                             result=list(result))
+        return result
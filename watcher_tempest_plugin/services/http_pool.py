@@ -0,0 +1,180 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import collections
+import functools
+import socket
+import threading
+
+import urllib3
+from urllib3 import connection
+from urllib3 import connectionpool
+
+# Shared pool managers, keyed by their connection settings
+_SHARED_HTTP = {}
+_SHARED_HTTP_LOCK = threading.Lock()
+
+
+class _Response(dict):
+    """Response wrapper compatible with tempest.lib.common.http."""
+
+    def __init__(self, info, url):
+        for key, value in info.getheaders().items():
+            self[str(key).lower()] = value
+        self.status = info.status
+        self['status'] = str(self.status)
+        self.reason = info.reason
+        self.version = info.version
+        self['content-location'] = url
+
+
+class _CountingPoolMixin:
+    """Connection pool counting its requests and opened connections."""
+
+    # Callable counting an event of the endpoint, set by KeepAliveHttp
+    count = None
+
+    def _new_conn(self):
+        self.count('connections')
+        return super(_CountingPoolMixin, self)._new_conn()
+
+    def urlopen(self, *args, **kwargs):
+        self.count('requests')
+        return super(_CountingPoolMixin, self).urlopen(*args, **kwargs)
+
+
+class _HTTPConnectionPool(_CountingPoolMixin,
+                          connectionpool.HTTPConnectionPool):
+    pass
+
+
+class _HTTPSConnectionPool(_CountingPoolMixin,
+                           connectionpool.HTTPSConnectionPool):
+    pass
+
+
+class KeepAliveHttp(urllib3.PoolManager):
+    """HTTP pool manager that keeps connections open between requests.
+
+    Unlike tempest's ClosingHttp, requests are not sent with a
+    'connection: close' header and the pools are not cleared after each
+    request, so connections to the same endpoint are reused. Reuse is
+    counted by endpoint, and the counters outlive the pools evicted by
+    the manager.
+    """
+
+    def __init__(self, disable_ssl_certificate_validation=False,
+                 ca_certs=None, timeout=None, follow_redirects=True,
+                 maxsize=10, ca_cert_dir=None):
+        self.follow_redirects = follow_redirects
+        kwargs = {'maxsize': maxsize}
+
+        if disable_ssl_certificate_validation:
+            urllib3.disable_warnings()
+            kwargs['cert_reqs'] = 'CERT_NONE'
+        elif ca_certs or ca_cert_dir:
+            kwargs['cert_reqs'] = 'CERT_REQUIRED'
+            kwargs['ca_certs'] = ca_certs
+            kwargs['ca_cert_dir'] = ca_cert_dir
+
+        if timeout:
+            kwargs['timeout'] = timeout
+
+        # Detect dead idle connections instead of hanging on them
+        kwargs['socket_options'] = (
+            connection.HTTPConnection.default_socket_options
+            + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)])
+
+        super(KeepAliveHttp, self).__init__(**kwargs)
+        self.pool_classes_by_scheme = {'http': _HTTPConnectionPool,
+                                       'https': _HTTPSConnectionPool}
+        self._counters = collections.defaultdict(collections.Counter)
+        self._counters_lock = threading.Lock()
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        pool = super(KeepAliveHttp, self)._new_pool(
+            scheme, host, port, request_context=request_context)
+        pool.count = functools.partial(self._count,
+                                       f"{scheme}://{host}:{port}")
+        return pool
+
+    def _count(self, endpoint, name):
+        with self._counters_lock:
+            self._counters[endpoint][name] += 1
+
+    def request(self, url, method, *args, **kwargs):
+        if self.follow_redirects:
+            retry = urllib3.util.Retry(raise_on_redirect=False, redirect=5)
+        else:
+            retry = urllib3.util.Retry(redirect=False)
+        r = super(KeepAliveHttp, self).request(method, url, retries=retry,
+                                               *args, **kwargs)
+
+        if not kwargs.get('preload_content', True):
+            return r, b''
+        return _Response(r, url), r.data
+
+    def pool_stats(self):
+        """Return connection reuse counters for each endpoint.
+
+        :return: A dict mapping 'scheme://host:port' to the number of
+          requests sent, connections opened and requests served by an
+          already open connection.
+        """
+        with self._counters_lock:
+            return {endpoint: {
+                'requests': counters['requests'],
+                'connections': counters['connections'],
+                'reused': max(
+                    counters['requests'] - counters['connections'], 0),
+            } for endpoint, counters in self._counters.items()}
+
+
+def _setting_key(value):
+    # urllib3.Timeout objects are compared by identity
+    if isinstance(value, urllib3.Timeout):
+        return (urllib3.Timeout, value.connect_timeout, value.read_timeout,
+                value.total)
+    return value
+
+
+def get_shared_http(**kwargs):
+    """Return the process-wide KeepAliveHttp for the given settings.
+
+    Clients created with the same connection settings share the same
+    pool manager, and therefore the same open connections.
+
+    :param kwargs: Arguments passed to KeepAliveHttp.
+    :return: A KeepAliveHttp instance.
+    """
+    key = tuple(sorted((name, _setting_key(value))
+                       for name, value in kwargs.items()))
+    with _SHARED_HTTP_LOCK:
+        if key not in _SHARED_HTTP:
+            _SHARED_HTTP[key] = KeepAliveHttp(**kwargs)
+        return _SHARED_HTTP[key]
+
+
+def pool_stats():
+    """Return the reuse counters of all shared pools, by endpoint."""
+    stats = {}
+    with _SHARED_HTTP_LOCK:
+        managers = list(_SHARED_HTTP.values())
+    for manager in managers:
+        for endpoint, counters in manager.pool_stats().items():
+            total = stats.setdefault(
+                endpoint, {'requests': 0, 'connections': 0, 'reused': 0})
+            for name, value in counters.items():
+                total[name] += value
+    return stats
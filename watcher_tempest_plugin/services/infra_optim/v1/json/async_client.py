@@ -0,0 +1,70 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import asyncio
+
+from watcher_tempest_plugin.services import async_base
+from watcher_tempest_plugin.services import base
+from watcher_tempest_plugin.services.infra_optim.v1.json import client
+
+
+class AsyncInfraOptimClient(async_base.AsyncClientMixin,
+                            client.InfraOptimClientJSON):
+    """Asyncio REST client for Watcher API v1.
+
+    It has the same methods as InfraOptimClientJSON, which return
+    awaitables, while the iter_* methods return asynchronous generators.
+    """
+
+    async def list_all(self, resource, page_size=None, **kwargs):
+        """List all objects of a resource, following pagination links.
+
+        :param resource: The name of the REST resource, e.g., 'audits'.
+        :param page_size: Maximum number of objects requested per page.
+        :return: A list with all the objects of the resource.
+        """
+        return [item async for item in self._iter_request(
+            resource, page_size=page_size, **kwargs)]
+
+    async def show_many(self, resource, uuids, max_workers=None):
+        """Gets many objects of the same type concurrently.
+
+        :param resource: The name of the REST resource, e.g., 'audits',
+            'action_plans' or 'actions'.
+        :param uuids: Unique identifiers of the objects to retrieve.
+        :param max_workers: Unused, concurrency is bounded by the
+            'max_concurrency' of the client.
+        :return: A list of ShowResult, in the same order as uuids.
+        """
+
+        async def _show(uuid):
+            try:
+                _, body = await self._show_request(resource, uuid)
+                return client.ShowResult(uuid, body, None)
+            except Exception as e:
+                return client.ShowResult(uuid, None, e)
+
+        return list(await asyncio.gather(*[_show(uuid) for uuid in uuids]))
+
+    @base.handle_errors
+    async def delete_action_plans_by_audit(self, audit_uuid):
+        """Deletes the action plans of an audit
+
+        :param audit_uuid: The unique identifier of the related Audit
+        """
+
+        _, action_plans = await self.list_action_plans(audit_uuid=audit_uuid)
+        await asyncio.gather(*[
+            self.delete_action_plan(action_plan['uuid'])
+            for action_plan in action_plans['action_plans']])
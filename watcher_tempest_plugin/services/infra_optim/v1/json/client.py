@@ -14,13 +14,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from oslo_serialization import jsonutils
+import collections
+from concurrent import futures
+
 from oslo_utils import uuidutils
 from watcher_tempest_plugin.services import base
 
 
 INFRA_OPTIM_VERSION = None
 
+# Result of a single object fetched by show_many. Either 'body' holds the
+# deserialized object or 'error' holds the exception raised fetching it.
+ShowResult = collections.namedtuple('ShowResult', ['uuid', 'body', 'error'])
+
 
 class InfraOptimClientJSON(base.BaseClient):
     """Base Tempest REST client for Watcher API v1."""
@@ -29,6 +35,9 @@ class InfraOptimClientJSON(base.BaseClient):
 
     api_microversion_header_name = 'OpenStack-API-Version'
 
+    # Catalog resources which do not change during a test run
+    CACHEABLE_RESOURCES = ('goals', 'strategies', 'scoring_engines')
+
     def get_headers(self):
         headers = super(InfraOptimClientJSON, self).get_headers()
         if INFRA_OPTIM_VERSION:
@@ -38,11 +47,46 @@ class InfraOptimClientJSON(base.BaseClient):
 
     def serialize(self, object_dict):
         """Serialize an Watcher object."""
-        return jsonutils.dumps(object_dict)
+        return self.codec.dumps(object_dict)
 
     def deserialize(self, object_str):
         """Deserialize an Watcher object."""
-        return jsonutils.loads(object_str.decode('utf-8'))
+        return self.codec.loads(object_str)
+
+    def list_all(self, resource, page_size=None, **kwargs):
+        """List all objects of a resource, following pagination links.
+
+        :param resource: The name of the REST resource, e.g., 'audits'.
+        :param page_size: Maximum number of objects requested per page.
+        :return: A list with all the objects of the resource.
+        """
+        return list(self._iter_request(resource, page_size=page_size,
+                                       **kwargs))
+
+    def show_many(self, resource, uuids, max_workers=8):
+        """Gets many objects of the same type concurrently.
+
+        :param resource: The name of the REST resource, e.g., 'audits',
+            'action_plans' or 'actions'.
+        :param uuids: Unique identifiers of the objects to retrieve.
+        :param max_workers: Maximum number of concurrent requests.
+        :return: A list of ShowResult, in the same order as uuids.
+        """
+
+        def _show(uuid):
+            try:
+                return ShowResult(
+                    uuid, self._show_request(resource, uuid)[1], None)
+            except Exception as e:
+                return ShowResult(uuid, None, e)
+
+        uuids = list(uuids)
+        if not uuids:
+            return []
+
+        workers = max(1, min(max_workers, len(uuids)))
+        with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_show, uuids))
 
     # ### AUDIT TEMPLATES ### #
 
@@ -127,6 +171,14 @@ class InfraOptimClientJSON(base.BaseClient):
         """Lists details of all existing audit templates."""
         return self._list_request('/audits/detail', **kwargs)
 
+    def iter_audits(self, page_size=None, **kwargs):
+        """Iterate over all existing audits, one page at a time.
+
+        :param page_size: Maximum number of audits requested per page.
+        :return: A generator of audits.
+        """
+        return self._iter_request('audits', page_size=page_size, **kwargs)
+
     @base.handle_errors
     def show_audit(self, audit_uuid):
         """Gets a specific audit template.
@@ -183,6 +235,15 @@ class InfraOptimClientJSON(base.BaseClient):
         """Lists details of all existing action plan"""
         return self._list_request('/action_plans/detail', **kwargs)
 
+    def iter_action_plans(self, page_size=None, **kwargs):
+        """Iterate over all existing action plans, one page at a time.
+
+        :param page_size: Maximum number of action plans requested per page.
+        :return: A generator of action plans.
+        """
+        return self._iter_request('action_plans', page_size=page_size,
+                                  **kwargs)
+
     @base.handle_errors
     def show_action_plan(self, action_plan_uuid):
         """Gets a specific action plan
@@ -270,6 +331,14 @@ class InfraOptimClientJSON(base.BaseClient):
         """Lists details of all existing actions"""
         return self._list_request('/actions/detail', **kwargs)
 
+    def iter_actions(self, page_size=None, **kwargs):
+        """Iterate over all existing actions, one page at a time.
+
+        :param page_size: Maximum number of actions requested per page.
+        :return: A generator of actions.
+        """
+        return self._iter_request('actions', page_size=page_size, **kwargs)
+
     @base.handle_errors
     def show_action(self, action_uuid):
         """Gets a specific action
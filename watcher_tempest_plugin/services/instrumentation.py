@@ -0,0 +1,171 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import atexit
+import collections
+import json
+import math
+import os
+import re
+import threading
+
+from oslo_log import log
+
+LOG = log.getLogger(__name__)
+
+_UUID_RE = re.compile(
+    r'[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?'
+    r'[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}')
+
+
+def body_size(body):
+    """Return the size of a request or response body, in bytes.
+
+    :param body: A str, encoded as UTF-8 when sent, bytes, or None.
+    """
+    if not body:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode('utf-8'))
+    return len(body)
+
+
+class LatencyHistogram:
+    """Latency histogram with logarithmic buckets.
+
+    Latencies are counted in buckets growing by 5%, so percentiles are
+    reported with at most a 5% error while memory stays bounded however
+    many requests are recorded.
+    """
+
+    MIN_LATENCY = 1e-4
+    GROWTH = 1.05
+
+    def __init__(self):
+        self.buckets = collections.Counter()
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def add(self, seconds, bytes_in=0, bytes_out=0):
+        if seconds <= self.MIN_LATENCY:
+            index = 0
+        else:
+            index = int(math.log(seconds / self.MIN_LATENCY,
+                                 self.GROWTH)) + 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+
+    def percentile(self, percent):
+        """Return the latency below which percent% of requests fall."""
+        if not self.count:
+            return None
+        rank = math.ceil(self.count * percent / 100.0)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                upper = self.MIN_LATENCY * self.GROWTH ** index
+                return min(max(upper, self.min), self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+        }
+
+
+class RequestStats:
+    """Thread-safe registry of latency histograms, by endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = collections.defaultdict(LatencyHistogram)
+
+    @staticmethod
+    def endpoint(service, method, url):
+        """Build an endpoint key, grouping URLs that only differ by UUID.
+
+        :param service: The catalog type of the service, e.g., 'metric'.
+        :param method: The HTTP method of the request.
+        :param url: The relative URL of the request.
+        :return: A key like 'infra-optim GET /v1/audits/{uuid}'.
+        """
+        path = '/' + url.split('?', 1)[0].lstrip('/')
+        return f"{service} {method} {_UUID_RE.sub('{uuid}', path)}"
+
+    def record(self, endpoint, seconds, bytes_in=0, bytes_out=0):
+        with self._lock:
+            self._histograms[endpoint].add(seconds, bytes_in, bytes_out)
+
+    def snapshot(self):
+        """Return the statistics of every endpoint as a dict."""
+        with self._lock:
+            return {endpoint: histogram.to_dict()
+                    for endpoint, histogram in sorted(
+                        self._histograms.items())}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def dump(self, path):
+        """Write the statistics of every endpoint to a JSON file."""
+        with open(path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2, sort_keys=True)
+
+
+# Process-wide statistics, shared by all the clients
+STATS = RequestStats()
+
+_dump_lock = threading.Lock()
+_dump_dirs = set()
+
+
+def dump_at_exit(directory):
+    """Write the process statistics in a directory when the run ends.
+
+    Every test worker writes its own 'watcher-requests-<pid>.json' file.
+
+    :param directory: Directory where the statistics file is written.
+    """
+
+    def _dump():
+        path = os.path.join(directory, f"watcher-requests-{os.getpid()}.json")
+        try:
+            STATS.dump(path)
+        except OSError as e:
+            LOG.warning(f"Could not write request statistics to {path}: {e}")
+
+    with _dump_lock:
+        if directory in _dump_dirs:
+            return
+        _dump_dirs.add(directory)
+    atexit.register(_dump)
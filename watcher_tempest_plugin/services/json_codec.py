@@ -0,0 +1,87 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+
+from oslo_log import log
+from oslo_serialization import jsonutils
+from oslo_utils import importutils
+
+LOG = log.getLogger(__name__)
+
+orjson = importutils.try_import('orjson')
+ujson = importutils.try_import('ujson')
+
+# Accelerated backends, in order of preference
+AUTO_BACKENDS = ('orjson', 'ujson')
+
+
+class JSONCodec:
+    """JSON encoder/decoder working directly on response bytes."""
+
+    def __init__(self, name, loads, dumps):
+        self.name = name
+        self._loads = loads
+        self._dumps = dumps
+
+    def loads(self, data):
+        """Deserialize a JSON document from bytes or str."""
+        return self._loads(data)
+
+    def dumps(self, obj):
+        """Serialize an object to a JSON document."""
+        return self._dumps(obj)
+
+
+def _orjson_dumps(obj):
+    return orjson.dumps(obj, default=jsonutils.to_primitive)
+
+
+def _ujson_loads(data):
+    if isinstance(data, (bytes, bytearray)):
+        data = data.decode('utf-8')
+    return ujson.loads(data)
+
+
+def _available_codecs():
+    codecs = {'json': JSONCodec('json', json.loads, jsonutils.dumps)}
+    if orjson is not None:
+        codecs['orjson'] = JSONCodec('orjson', orjson.loads, _orjson_dumps)
+    if ujson is not None:
+        codecs['ujson'] = JSONCodec('ujson', _ujson_loads, ujson.dumps)
+    return codecs
+
+
+CODECS = _available_codecs()
+
+
+def get_codec(name='json'):
+    """Return the JSON codec for a backend name.
+
+    :param name: One of 'auto', 'orjson', 'ujson' or 'json'. 'auto' picks
+      the fastest importable backend. Unavailable backends fall back to
+      the standard library json module.
+    :return: A JSONCodec instance.
+    """
+    if name == 'auto':
+        for backend in AUTO_BACKENDS:
+            if backend in CODECS:
+                return CODECS[backend]
+        return CODECS['json']
+
+    if name not in CODECS:
+        LOG.warning(f"JSON backend '{name}' is not available, falling "
+                    "back to the standard library json module.")
+        return CODECS['json']
+    return CODECS[name]
@@ -0,0 +1,340 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""List pods and run commands in them with the Kubernetes API.
+
+This is an in-process alternative to the 'oc get pods' and 'oc rsh'
+commands, based on the kubernetes library, which is optional. A single
+API client, and its connection pool, is shared by all the requests, and
+the pods are cached by a watch, so that listing them sends no request.
+"""
+
+import shlex
+import threading
+import time
+
+from oslo_log import log
+from oslo_utils import importutils
+from tempest.lib import exceptions
+
+from watcher_tempest_plugin.services import base
+
+kube_client = importutils.try_import('kubernetes.client')
+kube_config = importutils.try_import('kubernetes.config')
+kube_stream = importutils.try_import('kubernetes.stream')
+kube_watch = importutils.try_import('kubernetes.watch')
+
+LOG = log.getLogger(__name__)
+
+V5_CHANNEL_PROTOCOL = 'v5.channel.k8s.io'
+STDOUT_CHANNEL = 1
+STDERR_CHANNEL = 2
+
+# Seconds a blocked read waits for frames before checking the connection
+_POLL_INTERVAL = 0.1
+
+
+def is_available():
+    """Whether the kubernetes library is installed."""
+    return kube_stream is not None and kube_watch is not None
+
+
+class KubeClient:
+    """Client of the Kubernetes API, for the pods of a namespace."""
+
+    def __init__(self, kubeconfig=None, namespace=None, context=None):
+        """Initialize KubeClient.
+
+        :param kubeconfig: Path to the kubeconfig file. Defaults to the
+          KUBECONFIG environment variable, or ~/.kube/config.
+        :param namespace: The namespace of the pods. Defaults to the one
+          of the kubeconfig context.
+        :param context: The kubeconfig context. Defaults to the current
+          one.
+        """
+        self.api_client = kube_config.new_client_from_config(
+            config_file=kubeconfig, context=context)
+        self.core = kube_client.CoreV1Api(self.api_client)
+        if namespace is None:
+            _, active = kube_config.list_kube_config_contexts(
+                config_file=kubeconfig)
+            namespace = active['context'].get('namespace', 'default')
+        self.namespace = namespace
+        # stream() patches the API client while connecting
+        self._stream_lock = threading.Lock()
+        # Protocol negotiated by the last exec stream
+        self.stream_protocol = None
+
+    def close(self):
+        self.api_client.close()
+
+    def list_pods(self, label_selector=None, field_selector=None):
+        """List the pods of the namespace.
+
+        :param label_selector: Labels of the pods, e.g., 'app=prometheus'.
+        :param field_selector: Fields of the pods, e.g.,
+          'status.phase=Running'.
+        :return: The pods, as dicts in the format of 'oc get pods -o json'.
+        """
+        kwargs = {}
+        if label_selector:
+            kwargs['label_selector'] = label_selector
+        if field_selector:
+            kwargs['field_selector'] = field_selector
+        pods = self.core.list_namespaced_pod(self.namespace, **kwargs)
+        return self.api_client.sanitize_for_serialization(pods.items)
+
+    def watch_pods(self, label_selector=None):
+        """Return a PodWatch caching the pods matching labels."""
+        return PodWatch(self, label_selector=label_selector)
+
+    def exec_stream(self, pod, command):
+        """Start a command in a pod.
+
+        :param pod: The name of the pod.
+        :param command: The command, as a list of arguments.
+        :return: The kubernetes WSClient of the command.
+        """
+        with self._stream_lock:
+            resp = kube_stream.stream(
+                self.core.connect_get_namespaced_pod_exec, pod,
+                self.namespace, command=command, stdin=True, stdout=True,
+                stderr=True, tty=False, binary=True, _preload_content=False)
+        self.stream_protocol = getattr(resp, 'subprotocol', None)
+        return resp
+
+
+class PodWatch:
+    """Pods of a namespace kept up to date by a watch.
+
+    The pods are listed once, then updated from the events of a watch,
+    run in a background thread. The pods are listed again whenever the
+    watch fails, e.g., when its resource version expired.
+    """
+
+    WATCH_TIMEOUT = 300
+    RETRY_INTERVAL = 5
+
+    def __init__(self, client, label_selector=None):
+        self.client = client
+        self.label_selector = label_selector
+        self._cond = threading.Condition()
+        self._pods = {}
+        self._synced = False
+        self._stopped = False
+        self._watch = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _list(self):
+        kwargs = {}
+        if self.label_selector:
+            kwargs['label_selector'] = self.label_selector
+        pods = self.client.core.list_namespaced_pod(
+            self.client.namespace, **kwargs)
+        items = self.client.api_client.sanitize_for_serialization(
+            pods.items)
+        with self._cond:
+            self._pods = {pod['metadata']['name']: pod for pod in items}
+            self._synced = True
+            self._cond.notify_all()
+        return pods.metadata.resource_version
+
+    def _run(self):
+        while not self._stopped:
+            try:
+                resource_version = self._list()
+                self._watch = kube_watch.Watch()
+                kwargs = {'resource_version': resource_version,
+                          'timeout_seconds': self.WATCH_TIMEOUT}
+                if self.label_selector:
+                    kwargs['label_selector'] = self.label_selector
+                for event in self._watch.stream(
+                        self.client.core.list_namespaced_pod,
+                        self.client.namespace, **kwargs):
+                    if event['type'] == 'ERROR':
+                        # e.g., the resource version expired
+                        LOG.debug(f"Watch of the pods ended: "
+                                  f"{event['raw_object']}")
+                        break
+                    pod = self.client.api_client.sanitize_for_serialization(
+                        event['object'])
+                    name = pod['metadata']['name']
+                    with self._cond:
+                        if event['type'] == 'DELETED':
+                            self._pods.pop(name, None)
+                        else:
+                            self._pods[name] = pod
+            except Exception as e:
+                if self._stopped:
+                    break
+                LOG.debug(f"Watch of the pods failed: {e}. Listing them "
+                          "again.")
+                time.sleep(self.RETRY_INTERVAL)
+
+    def pods(self, timeout=60):
+        """Return the pods, as dicts.
+
+        :param timeout: Seconds to wait for the first listing of the pods.
+        :raises: TimeoutException if the pods could not be listed.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._synced, timeout):
+                raise exceptions.TimeoutException(
+                    "Could not list the pods with the Kubernetes API.")
+            return list(self._pods.values())
+
+    def stop(self):
+        self._stopped = True
+        if self._watch is not None:
+            self._watch.stop()
+
+
+class _KubeStream(base.CmdStream):
+
+    def __init__(self, resp):
+        self.resp = resp
+        self._lock = threading.Lock()
+
+    def write(self, data):
+        self.resp.write_stdin(bytes(data))
+
+    def read(self, stderr=False):
+        channel = STDERR_CHANNEL if stderr else STDOUT_CHANNEL
+        # The readers of both outputs pump the frames of the connection
+        while True:
+            with self._lock:
+                data = self.resp.read_channel(channel)
+                if data:
+                    return data
+                if not self.resp.is_open():
+                    return b''
+                self.resp.update(timeout=_POLL_INTERVAL)
+
+    def close(self):
+        self.resp.close()
+
+
+class KubeExecCmdClient(base.BaseCmdClient):
+    """Command client running commands in a pod with the Kubernetes API.
+
+    Commands run in a shell, as with 'oc rsh', and the input data is
+    sent on their stdin, which is then closed. Closing stdin requires a
+    Kubernetes API server and library supporting the v5 stream protocol,
+    the commands with input data run with the fallback client otherwise.
+    Shell sessions are not affected as they pass input data as
+    here-documents.
+    """
+
+    def __init__(self, client, pod, fallback=None):
+        """Initialize KubeExecCmdClient.
+
+        :param client: The KubeClient.
+        :param pod: The name of the pod.
+        :param fallback: The command client running the commands with
+          input data in the pod, e.g., a PodCmdClient, when the v5
+          protocol is not supported.
+        """
+        self.client = client
+        self.pod = pod
+        self.fallback = fallback
+
+    def _command(self, cmd):
+        cmd_str = shlex.join(cmd) if isinstance(cmd, list) else cmd
+        return ['sh', '-c', cmd_str]
+
+    def _can_close_stdin(self):
+        if self.client.stream_protocol is None:
+            # The protocol is negotiated when connecting
+            self.client.exec_stream(self.pod, ['true']).close()
+        return self.client.stream_protocol == V5_CHANNEL_PROTOCOL
+
+    def run_cmd(self, cmd, input_data=None, timeout=None):
+        try:
+            return self._exec(cmd, input_data, timeout)
+        except base.StreamingNotSupported:
+            if self.fallback is None:
+                raise
+        LOG.debug(f"Executing command '{cmd}' in pod {self.pod} with the "
+                  "fallback client")
+        return self.fallback.run_cmd(cmd, input_data=input_data,
+                                     timeout=timeout)
+
+    def _exec(self, cmd, input_data, timeout):
+        # Commands reading their stdin are not started when it cannot be
+        # closed, as they would never end
+        if input_data is not None and not self._can_close_stdin():
+            raise base.StreamingNotSupported(
+                "Sending input data requires the v5 stream protocol.")
+        LOG.debug(f"Executing command '{cmd}' in pod {self.pod}")
+        resp = self.client.exec_stream(self.pod, self._command(cmd))
+        try:
+            # Only the v5 protocol can close stdin
+            v5 = getattr(resp, 'subprotocol', None) == V5_CHANNEL_PROTOCOL
+            if input_data is not None:
+                if not v5:
+                    raise base.StreamingNotSupported(
+                        "Sending input data requires the v5 stream "
+                        "protocol.")
+                for chunk in base._iter_input_chunks(input_data):
+                    if len(chunk):
+                        resp.write_stdin(bytes(chunk))
+            if v5:
+                resp.close_channel(0)
+
+            deadline = time.monotonic() + timeout if timeout else None
+            out = bytearray()
+            err = bytearray()
+            while resp.is_open():
+                if deadline is not None and time.monotonic() > deadline:
+                    raise exceptions.TimeoutException(
+                        f"Command: '{cmd}' executed in pod {self.pod}.")
+                resp.update(timeout=1)
+                out += resp.read_channel(STDOUT_CHANNEL)
+                err += resp.read_channel(STDERR_CHANNEL)
+            out += resp.read_channel(STDOUT_CHANNEL)
+            err += resp.read_channel(STDERR_CHANNEL)
+            exit_status = resp.returncode
+        finally:
+            resp.close()
+        return base.CmdResult(out.decode('utf-8'), err.decode('utf-8'),
+                              exit_status)
+
+    def exec_cmd(self, cmd, input_data=None, timeout=None):
+        """Execute a command with an optional input data.
+
+        :param cmd: command to be execute, which can be a string
+            or a sequence of arguments.
+        :param input_data: data to be sent to process stdin, either a str
+            or bytes, or an iterable of them, which is streamed in chunks.
+        :param timeout: communication timeout in seconds
+
+        :returns: output written to stdout.
+        :raises: SSHExecCommandFailed if the command exits with a nonzero
+            status.
+        :raises: TimeoutException if the command doesn't end when timeout
+            expires.
+        """
+        result = self.run_cmd(cmd, input_data=input_data, timeout=timeout)
+        if result.exit_status != 0:
+            raise exceptions.SSHExecCommandFailed(
+                command=shlex.join(cmd) if isinstance(cmd, list) else cmd,
+                exit_status=result.exit_status,
+                stderr=result.stderr, stdout=result.stdout)
+        return result.stdout
+
+    def open_stream(self, cmd):
+        LOG.debug(f"Starting command stream '{cmd}' in pod {self.pod}")
+        return _KubeStream(
+            self.client.exec_stream(self.pod, self._command(cmd)))
@@ -0,0 +1,195 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Run commands in the replicas of a pod, with failover.
+
+The pods are listed with 'oc get pods', and only the Running pods whose
+containers are all ready, i.e., passing their readiness probes, are used.
+The list is cached for a few seconds. A command failing in a pod which
+is no longer ready is run again in another pod.
+"""
+
+import json
+import threading
+import time
+
+from oslo_log import log
+
+from watcher_tempest_plugin.services import base
+
+LOG = log.getLogger(__name__)
+
+
+def ready_pods(pods_json):
+    """Return the names of the ready pods of an 'oc get pods -o json'.
+
+    :param pods_json: The output of 'oc get pods -o json'.
+    :return: The names of the ready pods, sorted.
+    """
+    return ready_pod_names(json.loads(pods_json).get('items', []))
+
+
+def ready_pod_names(pods):
+    """Return the names of the ready pods.
+
+    :param pods: The pods, as dicts in the format of 'oc get pods -o json'.
+    :return: The names of the ready pods, sorted.
+    """
+    names = []
+    for pod in pods:
+        metadata = pod.get('metadata', {})
+        status = pod.get('status', {})
+        containers = status.get('containerStatuses') or []
+        if (status.get('phase') == 'Running'
+                and not metadata.get('deletionTimestamp')
+                and containers
+                and all(c.get('ready') for c in containers)):
+            names.append(metadata['name'])
+    return sorted(names)
+
+
+class PodPool:
+    """Cached list of the ready replicas of a pod."""
+
+    def __init__(self, list_pods, ttl=15):
+        """Initialize PodPool.
+
+        :param list_pods: Callable returning the names of the ready pods.
+        :param ttl: Seconds during which the list of pods is cached.
+        """
+        self.list_pods = list_pods
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._pods = []
+        self._listed_at = None
+        self._next = 0
+
+    def pods(self):
+        """Return the names of the ready pods.
+
+        :raises: Exception if no pod is ready.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._listed_at is None or now - self._listed_at > self.ttl:
+                self._pods = self.list_pods()
+                self._listed_at = now
+                LOG.debug(f"Ready pods: {self._pods}")
+            if not self._pods:
+                # Pods may be listed again right away
+                self._listed_at = None
+                raise Exception("Could not find a ready pod.")
+            return list(self._pods)
+
+    def primary(self):
+        """Return the first ready pod, the same one until it goes away."""
+        return self.pods()[0]
+
+    def next(self):
+        """Return the ready pods one after the other."""
+        pods = self.pods()
+        with self._lock:
+            self._next += 1
+            return pods[self._next % len(pods)]
+
+    def invalidate(self):
+        """List the pods again on the next call."""
+        with self._lock:
+            self._listed_at = None
+
+
+class PodCmdClient(base.BaseCmdClient):
+    """Command client running commands in a pod with 'oc rsh'."""
+
+    def __init__(self, client, oc_cmd, pod):
+        """Initialize PodCmdClient.
+
+        :param client: The command client running the oc commands.
+        :param oc_cmd: The oc command, as a list of arguments.
+        :param pod: The name of the pod.
+        """
+        self.client = client
+        self.prefix = oc_cmd + ['rsh', pod]
+
+    def _build_cmd(self, cmd):
+        if isinstance(cmd, list):
+            return self.prefix + cmd
+        return " ".join(self.prefix + [cmd])
+
+    def exec_cmd(self, cmd, input_data=None, timeout=None):
+        return self.client.exec_cmd(self._build_cmd(cmd),
+                                    input_data=input_data, timeout=timeout)
+
+    def run_cmd(self, cmd, input_data=None, timeout=None):
+        return self.client.run_cmd(self._build_cmd(cmd),
+                                   input_data=input_data, timeout=timeout)
+
+
+class PodRouterCmdClient(base.BaseCmdClient):
+    """Command client spreading commands over the pods of a PodPool.
+
+    Commands run in the primary pod, or in every pod in turn. A command
+    failing in a pod that is no longer ready runs again in another one.
+    """
+
+    def __init__(self, pool, get_pod_client, round_robin=False):
+        """Initialize PodRouterCmdClient.
+
+        :param pool: The PodPool.
+        :param get_pod_client: Callable returning the command client of a
+          pod.
+        :param round_robin: Run the commands in every pod in turn, instead
+          of in the primary pod.
+        """
+        self.pool = pool
+        self.get_pod_client = get_pod_client
+        self.round_robin = round_robin
+
+    def _is_gone(self, pod):
+        self.pool.invalidate()
+        try:
+            return pod not in self.pool.pods()
+        except Exception:
+            return True
+
+    def _run(self, method, cmd, input_data, timeout):
+        # Iterators cannot be sent again to another pod
+        replayable = input_data is None or isinstance(
+            input_data, (str, bytes, bytearray, memoryview, list, tuple))
+        tried = set()
+        while True:
+            pod = self.pool.next() if self.round_robin else self.pool.primary()
+            if pod in tried:
+                pod = next((p for p in self.pool.pods() if p not in tried),
+                           pod)
+            try:
+                result = getattr(self.get_pod_client(pod), method)(
+                    cmd, input_data=input_data, timeout=timeout)
+            except Exception:
+                if not replayable or pod in tried or not self._is_gone(pod):
+                    raise
+            else:
+                if (method == 'exec_cmd' or result.exit_status == 0
+                        or not replayable or pod in tried
+                        or not self._is_gone(pod)):
+                    return result
+            LOG.warning(f"Pod {pod} is no longer ready. Running the "
+                        "command in another pod.")
+            tried.add(pod)
+
+    def exec_cmd(self, cmd, input_data=None, timeout=None):
+        return self._run('exec_cmd', cmd, input_data, timeout)
+
+    def run_cmd(self, cmd, input_data=None, timeout=None):
+        return self._run('run_cmd', cmd, input_data, timeout)
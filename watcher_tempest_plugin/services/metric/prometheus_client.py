@@ -12,19 +12,236 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import collections
 import json
+import threading
+import time
 from urllib import parse
 
 from oslo_log import log
+from tempest.lib import exceptions
+import urllib3
 
 from watcher_tempest_plugin.services import base
+from watcher_tempest_plugin.services import cassette as cassette_lib
+from watcher_tempest_plugin.services import http_pool
+from watcher_tempest_plugin.services.metric import kube_client
+from watcher_tempest_plugin.services.metric import pod_pool
+from watcher_tempest_plugin.services.metric import prometheus_query
+from watcher_tempest_plugin.services.metric import remote_write
+from watcher_tempest_plugin.services.metric import target_map
+from watcher_tempest_plugin.services import shell_session
 
 LOG = log.getLogger(__name__)
 
+# Timeout of the requests sent to Prometheus from the test process
+HTTP_TIMEOUT = urllib3.Timeout(connect=5, read=60)
+
+# Errors of the queries, evaluated natively or by promtool commands
+QUERY_ERRORS = (prometheus_query.QueryError, exceptions.CommandFailed,
+                exceptions.SSHExecCommandFailed, exceptions.TimeoutException)
+
+# Process-wide series trackers, keyed by Prometheus URL and series labels
+_SERIES_TRACKERS = {}
+_SERIES_TRACKERS_LOCK = threading.Lock()
+
+
+def _selector(labels):
+    """Return the series selector matching a dict of labels."""
+    return '{' + ','.join(
+        f'{name}="{remote_write.escape_label_value(str(value))}"'
+        for name, value in labels.items()) + '}'
+
+
+class MetricBatch:
+    """Buffer measures and push them to Prometheus in a few large pushes.
+
+    Measures added to the batch, in exposition format or as series, are
+    merged by series and pushed, in a single remote-write request or
+    promtool call, whenever 'max_samples' samples are buffered, and when
+    the batch is used as a context manager and exits without error.
+    """
+
+    MAX_SAMPLES = 50000
+
+    def __init__(self, client, max_samples=MAX_SAMPLES):
+        """Initialize MetricBatch.
+
+        :param client: The PromtoolClient pushing the measures.
+        :param max_samples: Number of buffered samples triggering a push.
+        """
+        self.client = client
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._series = {}
+        self._samples = 0
+        self._stats = collections.Counter()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+
+    def add(self, input_data):
+        """Add measures to the batch, pushing it when it is full.
+
+        :param input_data: metric data in exposition format, or a list of
+          remote_write.Series.
+        """
+        if isinstance(input_data, str):
+            input_data = remote_write.parse_exposition(input_data)
+        with self._lock:
+            for labels, samples in input_data:
+                key = tuple(sorted(labels.items()))
+                if key not in self._series:
+                    self._series[key] = remote_write.Series(labels, [])
+                self._series[key].samples.extend(samples)
+                self._samples += len(samples)
+            full = self._samples >= self.max_samples
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Push the buffered measures, if any."""
+        with self._lock:
+            if not self._series:
+                return
+            series = list(self._series.values())
+            samples = self._samples
+            self._series = {}
+            self._samples = 0
+
+            start = time.monotonic()
+            size = self.client._push(series)
+            elapsed = time.monotonic() - start
+            self._stats['flushes'] += 1
+            self._stats['series'] += len(series)
+            self._stats['samples'] += samples
+            self._stats['bytes'] += size
+            self._stats['seconds'] += elapsed
+        LOG.debug(f"Pushed a batch of {len(series)} series, {samples} "
+                  f"samples, {size} bytes in {elapsed:.3f}s")
+
+    def stats(self):
+        """Return the number of pushes, series, samples, bytes and seconds.
+
+        Series are counted once per push they are part of.
+        """
+        with self._lock:
+            return {name: self._stats[name] for name in (
+                'flushes', 'series', 'samples', 'bytes', 'seconds')}
+
+
+class SeriesTracker:
+    """Track the last timestamp written to every series.
+
+    Prometheus rejects the samples older than the last sample of their
+    series. Pushing the measures of every run to the same series is only
+    possible when the samples already written are skipped. The last
+    timestamps of the series of a metric are loaded from Prometheus the
+    first time the metric is pushed, so that series written by previous
+    runs are tracked too. Deleted series are still tracked, as Prometheus
+    keeps their last timestamp until they are compacted, while queries no
+    longer see their samples. The trackers are therefore shared by all the
+    clients of the process, see get_series_tracker().
+    """
+
+    def __init__(self, get_last_timestamps):
+        """Initialize SeriesTracker.
+
+        :param get_last_timestamps: Callable returning, for a metric
+          name, a dict mapping the label items of its series, sorted,
+          to their last timestamp in milliseconds.
+        """
+        self.get_last_timestamps = get_last_timestamps
+        self._lock = threading.Lock()
+        # sorted label items -> last timestamp in ms
+        self._last = {}
+        self._loaded_names = set()
+
+    @property
+    def live_series(self):
+        """Number of series written, by this client or previous runs."""
+        with self._lock:
+            return len(self._last)
+
+    def _load(self, name):
+        if name in self._loaded_names:
+            return
+        self._loaded_names.add(name)
+        for key, timestamp in self.get_last_timestamps(name).items():
+            if timestamp > self._last.get(key, timestamp - 1):
+                self._last[key] = timestamp
+
+    def filter(self, series):
+        """Return the samples of series newer than the last written ones.
+
+        :param series: An iterable of remote_write.Series.
+        :return: A list of remote_write.Series, with strictly increasing
+          timestamps, and without the series having no new sample.
+        """
+        result = []
+        dropped = 0
+        with self._lock:
+            for labels, samples in series:
+                self._load(labels.get('__name__'))
+                last = self._last.get(tuple(sorted(labels.items())))
+                newer = []
+                for sample in sorted(samples, key=lambda s: s[0]):
+                    if last is None or sample[0] > last:
+                        newer.append(sample)
+                        last = sample[0]
+                dropped += len(samples) - len(newer)
+                if newer:
+                    result.append(remote_write.Series(labels, newer))
+        if dropped:
+            LOG.debug(f"Skipped {dropped} samples not newer than the last "
+                      "samples of their series")
+        return result
+
+    def record(self, series):
+        """Record the last timestamps of series pushed to Prometheus."""
+        with self._lock:
+            for labels, samples in series:
+                key = tuple(sorted(labels.items()))
+                timestamp = max(s[0] for s in samples)
+                if timestamp > self._last.get(key, timestamp - 1):
+                    self._last[key] = timestamp
+
+
+def get_series_tracker(url, series_labels, get_last_timestamps):
+    """Return the process-wide SeriesTracker of a Prometheus server.
+
+    The tracker outlives the clients, so that the series deleted by the
+    cleanup of a test class are still known to the clients of the next
+    ones. The last timestamps are loaded with the callable of the most
+    recent client.
+
+    :param url: Base URL of the Prometheus server.
+    :param series_labels: Labels set on every series pushed by the client.
+    :param get_last_timestamps: Callable passed to SeriesTracker.
+    :returns: A SeriesTracker instance.
+    """
+    key = (url, tuple(sorted(series_labels.items())))
+    with _SERIES_TRACKERS_LOCK:
+        tracker = _SERIES_TRACKERS.get(key)
+        if tracker is None:
+            tracker = _SERIES_TRACKERS[key] = SeriesTracker(
+                get_last_timestamps)
+        else:
+            tracker.get_last_timestamps = get_last_timestamps
+        return tracker
+
 
 class PromtoolClient:
     """Promtool client to push/query metrics to/from Prometheus."""
 
+    PROMETHEUS_POD_LABELS = "app.kubernetes.io/name=prometheus"
+    # Time range searched for the last samples of the series
+    LAST_TIMESTAMPS_RANGE = "1d"
+
     def __init__(self, url, promtool_path="promtool",
                  openstack_type="devstack",
                  proxy_host_address=None, proxy_host_user=None,
@@ -32,7 +249,11 @@ class PromtoolClient:
                  podified_ns=None, podified_kubeconfig=None,
                  prometheus_ssl_cert=None,
                  prometheus_fqdn_label="fqdn",
-                 write_url_path=None):
+                 write_url_path=None, cassette=None,
+                 persistent_session=False, native_write=False,
+                 native_query=False, stable_series=False,
+                 tsdb_path="/prometheus", targets_ttl=300, pods_ttl=15,
+                 kube_api=False, run_labels=None):
         """Initialize PromtoolClient.
 
         :param url: Base URL of the Prometheus server (e.g.
@@ -56,6 +277,43 @@ class PromtoolClient:
           host FQDNs in target metadata (default: 'fqdn').
         :param write_url_path: URL path for the remote-write endpoint
           (default: '/api/v1/write').
+        :param cassette: Optional cassette used to record the commands
+          run by the client, or to replay them instead of running them.
+        :param persistent_session: In podified deployments, run the
+          commands through a long-lived 'oc rsh' shell per prometheus pod,
+          instead of a new 'oc rsh' per command. Ignored when a cassette
+          is used.
+        :param native_write: Push the measures to the remote-write
+          endpoint from this process, instead of running promtool. The
+          client falls back to promtool when the endpoint cannot be
+          reached. Ignored when a cassette is used.
+        :param native_query: Send the queries of query() and
+          query_range() to the Prometheus HTTP API from this process,
+          instead of running promtool. The client falls back to promtool
+          when the API cannot be reached. Ignored when a cassette is used.
+        :param stable_series: Track the last timestamp written to every
+          series, and only push the samples newer than it, so that the
+          measures of every run can be pushed to the same series.
+        :param tsdb_path: Data directory of the Prometheus server, where
+          backfill() moves the blocks it creates.
+        :param targets_ttl: Seconds after which the map of host names to
+          Prometheus instances is built again from the active targets.
+        :param pods_ttl: In podified deployments, seconds during which the
+          list of ready prometheus pods is cached. Writes run in the first
+          ready pod and queries in every ready pod in turn, and commands
+          failing in a pod which is no longer ready run again in another
+          one. Ignored when a cassette is used, the first pod is then
+          always used.
+        :param kube_api: In podified deployments, list the pods and run
+          commands in them with the Kubernetes API from this process,
+          instead of running oc. Requires the kubernetes library, and
+          podified_kubeconfig, or the default kubeconfig, to be readable
+          by this process. Ignored when a cassette is used.
+        :param run_labels: Labels set on every series pushed by the
+          client, e.g., {'tempest_run': 'a1b2c3'}. count_series() and
+          delete_series() only match these series by default, so that
+          clients with different run labels can share a Prometheus
+          server.
         """
         # Podified Control Plane
         self.is_podified = ("podified" == openstack_type)
@@ -72,6 +330,15 @@ class PromtoolClient:
         else:
             self.client = base.SubProcessCmdClient()
 
+        if cassette:
+            self.client = cassette_lib.CassetteCmdClient(self.client,
+                                                         cassette)
+
+        # Client running the oc commands, outside of the prometheus pod
+        self.oc_client = self.client
+        self.pod_pool = None
+        self.kube = None
+
         if self.is_podified:
             self.podified_ns = podified_ns
             self.oc_cmd = ['oc']
@@ -81,9 +348,36 @@ class PromtoolClient:
                 self.oc_cmd += ['-n', self.podified_ns]
             # podified control plane will run promtool inside
             # prometheus container
-            self.prometheus_pod = self.get_prometheus_pod()
-            cmd_prefix = self.oc_cmd + ["rsh", self.prometheus_pod]
-            self.client.cmd_prefix = " ".join(cmd_prefix)
+            if cassette:
+                # Recorded commands must not depend on the pods
+                self._prometheus_pod = self.get_prometheus_pod()
+                cmd_prefix = self.oc_cmd + ["rsh", self._prometheus_pod]
+                self.client.cmd_prefix = " ".join(cmd_prefix)
+            else:
+                if kube_api and kube_client.is_available():
+                    self.kube = kube_client.KubeClient(
+                        kubeconfig=podified_kubeconfig,
+                        namespace=podified_ns)
+                    self._pod_watch = self.kube.watch_pods(
+                        self.PROMETHEUS_POD_LABELS)
+                elif kube_api:
+                    LOG.warning("The kubernetes library is not installed. "
+                                "Running oc instead.")
+                self._persistent_session = persistent_session
+                self._pod_clients = {}
+                self._pod_clients_lock = threading.Lock()
+                self.pod_pool = pod_pool.PodPool(
+                    self._list_prometheus_pods, ttl=pods_ttl)
+                # Writes run in the primary pod, queries in every pod in
+                # turn
+                self.client = pod_pool.PodRouterCmdClient(
+                    self.pod_pool, self._get_pod_client)
+                self.query_cmd_client = pod_pool.PodRouterCmdClient(
+                    self.pod_pool, self._get_pod_client, round_robin=True)
+                LOG.debug("Prometheus pods: "
+                          f"{', '.join(self.pod_pool.pods())}")
+        if self.pod_pool is None:
+            self.query_cmd_client = self.client
 
         # We keep the raw URL for reference/labels
         self.prometheus_url = url
@@ -98,52 +392,106 @@ class PromtoolClient:
         self.prometheus_delete_series_url = parse.urljoin(
             base_url, "api/v1/admin/tsdb/delete_series"
         )
+        self.prometheus_clean_tombstones_url = parse.urljoin(
+            base_url, "api/v1/admin/tsdb/clean_tombstones"
+        )
+        self.prometheus_series_url = parse.urljoin(base_url, "api/v1/series")
         # active targets
         self.prometheus_targets_url = parse.urljoin(
             base_url, "api/v1/targets?state=active"
         )
         self.prometheus_fqdn_label = prometheus_fqdn_label
+        self.tsdb_path = tsdb_path.rstrip('/') or '/'
+        self.run_labels = dict(run_labels or {})
+        # Labels of all the series pushed by this client
+        self.series_labels = {'job': remote_write.DEFAULT_JOB,
+                              **self.run_labels}
+        self.series_selector = _selector(self.series_labels)
         self.promtool_cmd = [promtool_path]
         if prometheus_ssl_cert:
             self.promtool_cmd.insert(0, f"SSL_CERT_DIR={prometheus_ssl_cert}")
 
         # Map hostnames and fqdn to prometheus instances
-        self._prometheus_instances = {}
+        self._prometheus_instances = target_map.TargetMap(
+            self._fetch_targets, fqdn_label=prometheus_fqdn_label,
+            ttl=targets_ttl)
+
+        self.series_tracker = None
+        if stable_series:
+            self.series_tracker = get_series_tracker(
+                url, self.series_labels, self._get_last_timestamps)
+
+        self.remote_write = None
+        self.query_client = None
+        self.http = None
+        if (native_write or native_query) and not cassette:
+            self.http = http = http_pool.get_shared_http(
+                disable_ssl_certificate_validation=not prometheus_ssl_cert,
+                ca_cert_dir=prometheus_ssl_cert or None,
+                timeout=HTTP_TIMEOUT)
+            if native_write:
+                self.remote_write = remote_write.RemoteWriteClient(
+                    self.prometheus_write_url, http)
+            if native_query:
+                self.query_client = prometheus_query.PrometheusQueryClient(
+                    url, http)
+
+    @property
+    def prometheus_pod(self):
+        """The prometheus pod running the writes."""
+        if self.pod_pool is not None:
+            return self.pod_pool.primary()
+        return self._prometheus_pod
+
+    def _list_prometheus_pods(self):
+        if self.kube is not None:
+            return pod_pool.ready_pod_names(self._pod_watch.pods())
+        cmd = self.oc_cmd + [
+            "get", "pods", "-o", "json",
+            "-l", self.PROMETHEUS_POD_LABELS,
+            "--field-selector=status.phase=Running"]
+        return pod_pool.ready_pods(self.oc_client.exec_cmd(" ".join(cmd)))
+
+    def _get_pod_client(self, pod):
+        with self._pod_clients_lock:
+            client = self._pod_clients.get(pod)
+            if client is not None:
+                return client
+            # Drop the clients of the pods gone
+            for gone in set(self._pod_clients) - set(self.pod_pool.pods()):
+                gone_client = self._pod_clients.pop(gone)
+                if hasattr(gone_client, 'close'):
+                    gone_client.close()
+            client = pod_pool.PodCmdClient(
+                self.oc_client, self.oc_cmd, pod)
+            if self.kube is not None:
+                client = kube_client.KubeExecCmdClient(
+                    self.kube, pod, fallback=client)
+                if self._persistent_session:
+                    client = shell_session.ShellSessionCmdClient(
+                        client, lambda: "sh", fallback=client)
+            elif self._persistent_session:
+                shell_cmd = self.oc_cmd + ["rsh", "-T", pod, "sh"]
+                client = shell_session.ShellSessionCmdClient(
+                    self.oc_client, lambda: shell_cmd, fallback=client)
+            self._pod_clients[pod] = client
+            return client
 
     @property
     def prometheus_instances(self):
-        if not self._prometheus_instances:
-            self._build_host_fqdn_maps()
+        """The TargetMap of host names to Prometheus instances."""
         return self._prometheus_instances
 
-    def _build_host_fqdn_maps(self):
+    def _fetch_targets(self):
         # NOTE(dviroel): Promtool does not support 'targets'
         # endpoint. curl is preferred here since this command
         # will run inside a container in podified deployments.
         cmd = ['curl', '-k', '-s', self.prometheus_targets_url]
 
-        out = self.client.exec_cmd(cmd)
+        out = self.query_cmd_client.exec_cmd(cmd)
 
         targets = json.loads(out)['data']['activeTargets']
-
-        # 1. builds based on fqdn
-        self._prometheus_instances = {
-            fqdn: instance for (fqdn, instance) in (
-                (target['labels'].get(self.prometheus_fqdn_label),
-                 target['labels'].get('instance'))
-                for target in targets
-                if target.get('labels', {}).get(self.prometheus_fqdn_label)
-            )
-        }
-        # 2. update with hostname
-        host_instance_map = {
-            host: instance for (host, instance) in (
-                (fqdn.split('.')[0], inst)
-                for fqdn, inst in self._prometheus_instances.items()
-                if '.' in fqdn
-            )
-        }
-        self._prometheus_instances.update(host_instance_map)
+        return [target.get('labels', {}) for target in targets]
 
     def show_instant_measure(self, expr):
         """Sends instance query to Prometheus server.
@@ -159,34 +507,219 @@ class PromtoolClient:
         cmd = self.promtool_cmd + [
             "query", "instant", self.prometheus_url, expr]
 
-        return self.client.exec_cmd(cmd)
+        return self.query_cmd_client.exec_cmd(cmd)
 
-    def delete_series(self, expr='{job="promtool"}'):
-        """Delete prometheus time series with the specified parameters.
+    def query(self, expr, time=None):
+        """Evaluate an instant query.
 
-        :param expr: expression to match the time series
-        :returns: Stdout output generated by the command.
+        :param expr: promql query expression.
+        :param time: Evaluation timestamp, in seconds. Defaults to now.
+        :raises: QueryError if the query fails.
+        :returns: A list of prometheus_query.QuerySeries.
         """
+        if self.query_client is not None:
+            try:
+                return self.query_client.query(expr, time=time)
+            except (OSError, urllib3.exceptions.HTTPError) as e:
+                self._disable_native_query(e)
+
+        cmd = self.promtool_cmd + ["query", "-o", "json", "instant"]
+        if time is not None:
+            cmd.append(f"--time={time}")
+        return self._promtool_query(cmd + [self.prometheus_url, expr])
+
+    def query_range(self, expr, start, end, step):
+        """Evaluate a range query.
+
+        :param expr: promql query expression.
+        :param start: Start timestamp, in seconds.
+        :param end: End timestamp, in seconds.
+        :param step: Resolution of the query, in seconds.
+        :raises: QueryError if the query fails.
+        :returns: A list of prometheus_query.QuerySeries.
+        """
+        if self.query_client is not None:
+            try:
+                return self.query_client.query_range(expr, start, end, step)
+            except (OSError, urllib3.exceptions.HTTPError) as e:
+                self._disable_native_query(e)
 
-        # Having a lot of problems passing the expression
-        # with double quotes both on direct command and
-        # ssh command so using url encoding
-
-        quoted_expr = parse.quote(expr)
+        cmd = self.promtool_cmd + [
+            "query", "-o", "json", "range", f"--start={start}",
+            f"--end={end}", f"--step={step}s", self.prometheus_url, expr]
+        return self._promtool_query(cmd)
+
+    def _disable_native_query(self, error):
+        LOG.warning(f"Could not reach the Prometheus API at "
+                    f"{self.prometheus_url}: {error}. Falling back to "
+                    "promtool.")
+        self.query_client = None
+
+    def _promtool_query(self, cmd):
+        out = self.query_cmd_client.exec_cmd(cmd)
+        try:
+            result = json.loads(out)
+        except ValueError:
+            raise prometheus_query.QueryError(
+                f"Promtool returned an invalid query result: {out}")
+        # promtool prints the result without its type
+        if result and isinstance(result[0], dict):
+            result_type = 'matrix' if 'values' in result[0] else 'vector'
+        elif result:
+            result_type = 'scalar'
+        else:
+            result_type = 'vector'
+        return prometheus_query.decode_result(
+            {'resultType': result_type, 'result': result})
+
+    def _get_last_timestamps(self, name):
+        # An instant query only sees the samples of the last 5 minutes,
+        # the lookback delta. The subquery, stepping by the lookback delta,
+        # sees the older ones, and the instant query the ones following
+        # its last step. Series older than the range are older than the
+        # samples generated by the tests.
+        selector = _selector(dict(self.series_labels, __name__=name))
+        expr = (f'timestamp({selector}) or max_over_time(timestamp('
+                f'{selector})[{self.LAST_TIMESTAMPS_RANGE}:5m])')
+        try:
+            result = self.query(expr)
+        except QUERY_ERRORS as e:
+            LOG.warning(f"Could not get the last timestamps of {name}: {e}")
+            return {}
+        last_timestamps = {}
+        for labels, _, values in result:
+            # The job label is set when pushing, and timestamp() drops
+            # the metric name
+            labels = dict(labels, __name__=name)
+            labels.pop('job', None)
+            last_timestamps[tuple(sorted(labels.items()))] = int(
+                round(values[0] * 1000))
+        return last_timestamps
+
+    def count_series(self, expr=None):
+        """Return the number of series stored in Prometheus.
+
+        :param expr: expression to match the time series. Defaults to the
+          series pushed by this client.
+        :raises: One of QUERY_ERRORS if the query fails.
+        """
+        expr = expr or self.series_selector
+        result = self.query(f'count({expr})')
+        return int(result[0].values[0]) if result else 0
 
-        cmd = ['curl', '-s', '-k', '-X', 'POST', '-g',
-               self.prometheus_delete_series_url + '?match[]=' + quoted_expr]
+    def _api_request(self, method, url, params=()):
+        """Send a request to the Prometheus API, natively or with curl.
 
+        :param params: A list of (name, value) tuples, sent as a form.
+        :raises: Exception if Prometheus returns an error.
+        :returns: The response body, as a str.
+        """
+        if self.http is not None:
+            try:
+                if method == 'GET':
+                    resp, body = self.http.request(
+                        f"{url}?{parse.urlencode(params)}", method)
+                else:
+                    resp, body = self.http.request(
+                        url, method, body=parse.urlencode(params),
+                        headers={'Content-Type':
+                                 'application/x-www-form-urlencoded'})
+            except (OSError, urllib3.exceptions.HTTPError) as e:
+                LOG.warning(f"Could not reach the Prometheus API at "
+                            f"{self.prometheus_url}: {e}. Falling back to "
+                            "curl.")
+                self.http = None
+            else:
+                if isinstance(body, bytes):
+                    body = body.decode('utf-8', 'replace')
+                if resp.status >= 300:
+                    raise Exception(f"Request to {url} failed with status "
+                                    f"{resp.status}: {body}")
+                return body
+
+        # NOTE: every parameter is url encoded on its own, so that the
+        # command needs no quoting, either run directly or by a shell
+        cmd = ['curl', '-s', '-k', '-X', method]
+        if method == 'GET':
+            cmd.append('-G')
+        for param in params:
+            cmd += ['-d', parse.urlencode([param])]
+        cmd.append(url)
         LOG.debug(f"curl command: {' '.join(cmd)}")
-        out = self.client.exec_cmd(cmd)
-        if len(out) > 1:
-            LOG.debug(f"delete_series execution output: {out}")
+        body = self.client.exec_cmd(cmd)
+        if body.strip():
+            try:
+                error = json.loads(body).get('error')
+            except ValueError:
+                error = body
+            if error:
+                raise Exception(f"Request to {url} failed: {error}")
+        return body
+
+    def list_series(self, matchers, start=None, end=None):
+        """List the series matching any of a list of series selectors.
+
+        :param matchers: A list of series selectors, e.g.,
+          ['{job="promtool"}'].
+        :param start: Start timestamp, in seconds or RFC3339.
+        :param end: End timestamp, in seconds or RFC3339.
+        :raises: Exception if the request fails.
+        :returns: A list of dicts with the labels of the series.
+        """
+        params = self._series_params(matchers, start, end)
+        body = self._api_request('GET', self.prometheus_series_url, params)
+        return json.loads(body)['data']
+
+    def _series_params(self, matchers, start, end):
+        params = [('match[]', matcher) for matcher in matchers]
+        if start is not None:
+            params.append(('start', start))
+        if end is not None:
+            params.append(('end', end))
+        return params
+
+    def delete_series(self, expr=None, start=None, end=None,
+                      clean_tombstones=False):
+        """Delete prometheus time series with the specified parameters.
+
+        The series matching any of the expressions are deleted in a single
+        request.
+
+        :param expr: expression to match the time series, or a list of
+          expressions. Defaults to the series pushed by this client.
+        :param start: Only delete the samples after this timestamp, in
+          seconds or RFC3339.
+        :param end: Only delete the samples before this timestamp, in
+          seconds or RFC3339.
+        :param clean_tombstones: Remove the deleted samples from the disk
+          once they are deleted, instead of at the next compactions.
+        :raises: Exception if Prometheus returns an error.
+        :returns: A list of dicts with the labels of the deleted series.
+        """
+        if expr is None:
+            expr = self.series_selector
+        matchers = [expr] if isinstance(expr, str) else list(expr)
+        params = self._series_params(matchers, start, end)
+
+        # Series are listed first, as deletions return no content
+        deleted = self.list_series(matchers, start=start, end=end)
+        if deleted:
+            self._api_request('POST', self.prometheus_delete_series_url,
+                              params)
+            if clean_tombstones:
+                self._api_request('POST',
+                                  self.prometheus_clean_tombstones_url)
+        by_name = collections.Counter(
+            labels.get('__name__') for labels in deleted)
+        LOG.debug(f"Deleted {len(deleted)} series matching {matchers}: "
+                  f"{dict(by_name)}")
+        return deleted
 
     def add_measures(self, input_data):
         """Add measures resources with the specified parameters.
 
-        :param input_data: metric data  in exposition format,
-          to be pushed to prometheus.
+        :param input_data: metric data in exposition format, or a list of
+          remote_write.Series, to be pushed to prometheus.
 
         :raises: Exception when push metrics call doesn't return
          success.
@@ -195,6 +728,49 @@ class PromtoolClient:
           timeout expires.
         :returns: Stdout output generated by the command.
         """
+        self._push(input_data)
+
+    def _push(self, input_data):
+        """Push measures, either natively or with promtool.
+
+        :returns: The size of the payload sent, in bytes.
+        """
+        if self.run_labels:
+            if isinstance(input_data, str):
+                input_data = remote_write.parse_exposition(input_data)
+            input_data = [
+                remote_write.Series(dict(labels, **self.run_labels), samples)
+                for labels, samples in input_data]
+        if self.series_tracker is not None:
+            if isinstance(input_data, str):
+                input_data = remote_write.parse_exposition(input_data)
+            input_data = self.series_tracker.filter(input_data)
+            if not input_data:
+                return 0
+            size = self._send(input_data)
+            self.series_tracker.record(input_data)
+            return size
+        return self._send(input_data)
+
+    def _send(self, input_data):
+        if self.remote_write is not None:
+            series = (remote_write.parse_exposition(input_data)
+                      if isinstance(input_data, str) else input_data)
+            try:
+                size = self.remote_write.push(series)
+            except (OSError, urllib3.exceptions.HTTPError) as e:
+                LOG.warning(f"Could not reach the remote-write endpoint "
+                            f"{self.prometheus_write_url}: {e}. Falling "
+                            "back to promtool.")
+                self.remote_write = None
+            else:
+                LOG.debug(f"Pushed {len(series)} series to "
+                          f"{self.prometheus_write_url} ({size} bytes)")
+                return size
+
+        if not isinstance(input_data, str):
+            input_data = remote_write.render_exposition(input_data)
+
         cmd = self.promtool_cmd + [
             "push", "metrics", self.prometheus_write_url]
 
@@ -204,6 +780,87 @@ class PromtoolClient:
 
         if "SUCCESS" not in out:
             raise Exception(f"Promtool failed to push metrics: {out}")
+        return len(input_data)
+
+    def backfill(self, input_data, timeout=180):
+        """Write measures as TSDB blocks in the Prometheus data directory.
+
+        Unlike add_measures, hours of measures are written in a single
+        promtool call, and the measures may be older than the samples
+        already stored in their series. The blocks are created with
+        'promtool tsdb create-blocks-from openmetrics' in the data
+        directory, so that moving them in place is atomic. Prometheus
+        loads new blocks at its next compaction cycle, within a minute,
+        and must allow overlapping blocks, which is the default since
+        Prometheus 2.39. In podified deployments, the blocks are written
+        in the primary prometheus pod.
+
+        :param input_data: metric data in exposition format, or a list of
+          remote_write.Series.
+        :param timeout: Seconds to wait for Prometheus to load the blocks.
+        :raises: SSHExecCommandFailed if a command fails.
+        :raises: TimeoutException if Prometheus does not load the blocks
+          before timeout expires.
+        :returns: The ULIDs of the blocks created.
+        """
+        series = (remote_write.parse_exposition(input_data)
+                  if isinstance(input_data, str) else input_data)
+        series = [s for s in series if s.samples]
+        if not series:
+            return []
+        # Series are labelled as pushed ones, so that delete_series and
+        # queries match them the same way
+        extra_labels = self.series_labels
+        # All the steps run in the same pod
+        client = self.client
+        if self.pod_pool is not None:
+            client = self._get_pod_client(self.pod_pool.primary())
+
+        # The work directory is ignored by Prometheus, its name not being
+        # a block ULID
+        work_dir = client.exec_cmd(
+            ['mktemp', '-d', f"{self.tsdb_path}/backfill.XXXXXX"]).strip()
+        try:
+            # promtool maps its input file in memory, it cannot read
+            # from a pipe
+            client.exec_cmd(
+                ['cp', '/dev/stdin', f"{work_dir}/metrics.om"],
+                input_data=remote_write.render_openmetrics(
+                    series, extra_labels))
+            out = client.exec_cmd(self.promtool_cmd + [
+                "tsdb", "create-blocks-from", "openmetrics",
+                f"{work_dir}/metrics.om", f"{work_dir}/blocks"])
+            LOG.debug(f"Promtool create-blocks-from output: {out}")
+            blocks = client.exec_cmd(
+                ['ls', f"{work_dir}/blocks"]).split()
+            if blocks:
+                client.exec_cmd(
+                    ['mv'] + [f"{work_dir}/blocks/{block}"
+                              for block in blocks] + [self.tsdb_path])
+        finally:
+            client.exec_cmd(['rm', '-rf', work_dir])
+        LOG.debug(f"Backfilled {len(series)} series in blocks {blocks}")
+
+        self._wait_for_samples(series[0], extra_labels, timeout)
+        return blocks
+
+    def _wait_for_samples(self, series, extra_labels, timeout):
+        selector = _selector(dict(series.labels, **extra_labels))
+        last_timestamp = max(ts for ts, _ in series.samples) / 1000
+        deadline = time.monotonic() + timeout
+        while not self.query(selector, time=last_timestamp):
+            if time.monotonic() > deadline:
+                raise exceptions.TimeoutException(
+                    f"Prometheus did not load the backfilled blocks within "
+                    f"{timeout} seconds.")
+            time.sleep(5)
+
+    def batch(self, max_samples=MetricBatch.MAX_SAMPLES):
+        """Return a MetricBatch pushing its measures with this client.
+
+        :param max_samples: Number of buffered samples triggering a push.
+        """
+        return MetricBatch(self, max_samples=max_samples)
 
     def get_pods(self, labels={}, pod_state='Running'):
         """Retrive pods based on matching labels and pod status.
@@ -221,6 +878,13 @@ class PromtoolClient:
             raise Exception("This method is only available in a "
                             "podified deployment.")
 
+        if self.kube is not None:
+            pods = self.kube.list_pods(
+                label_selector=labels or None,
+                field_selector=(f"status.phase={pod_state}" if pod_state
+                                else None))
+            return [pod['metadata']['name'] for pod in pods]
+
         # pod_state as empty string can be used to get all pod states
         if pod_state:
             pod_state = f"--field-selector=status.phase={pod_state}"
@@ -230,7 +894,7 @@ class PromtoolClient:
         pods_list = f"{oc_cmd} get pods -o=name {pod_state} {labels}"
         cut_pod = "cut -d'/' -f 2"
 
-        pods_output = self.client.exec_cmd(
+        pods_output = self.oc_client.exec_cmd(
             f"{pods_list} | {cut_pod}; true")
 
         # output can be empty with len == 1
@@ -245,9 +909,10 @@ class PromtoolClient:
         :raises: Exception if no prometheus pod is found.
         :returns: Name of a prometheus pod.
         """
-        labels = "app.kubernetes.io/name=prometheus"
+        if self.pod_pool is not None:
+            return self.pod_pool.primary()
         LOG.debug("Getting prometheus service pod names.")
-        pods = self.get_pods(labels)
+        pods = self.get_pods(self.PROMETHEUS_POD_LABELS)
 
         if not pods:
             raise Exception("Could not find a prometheus service pod.")
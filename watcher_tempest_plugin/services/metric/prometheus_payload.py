@@ -0,0 +1,184 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Build the synthetic metric payloads injected in Prometheus.
+
+The timestamps and values of a series are generated as whole arrays,
+with NumPy when it is installed and plain lists otherwise. A payload is
+returned as remote_write.Series, which are added to a MetricBatch as is,
+or rendered as exposition text in a single join over all its samples.
+"""
+
+import operator
+
+from oslo_utils import importutils
+
+from watcher_tempest_plugin.services.metric import remote_write
+
+numpy = importutils.try_import('numpy')
+
+
+def sample_timestamps(count, interval_secs, end_ms):
+    """Return the timestamps of 'count' samples spaced by an interval.
+
+    :param count: Number of samples.
+    :param interval_secs: Seconds between two samples.
+    :param end_ms: Timestamp in ms following the last sample by one
+      interval.
+    :return: Ascending timestamps, in ms.
+    """
+    step_ms = int(interval_secs * 1000)
+    if numpy is not None:
+        return end_ms - step_ms * numpy.arange(count, 0, -1, dtype='int64')
+    return [end_ms - step_ms * i for i in range(count, 0, -1)]
+
+
+def counter_values(count, start_value, increment):
+    """Return the values of a counter increasing at every sample.
+
+    :param count: Number of samples.
+    :param start_value: Value preceding the first sample.
+    :param increment: Increase between two samples.
+    """
+    if numpy is not None:
+        return start_value + increment * numpy.arange(
+            1, count + 1, dtype='float64')
+    return [start_value + increment * i for i in range(1, count + 1)]
+
+
+def _to_list(values):
+    return values.tolist() if hasattr(values, 'tolist') else list(values)
+
+
+def _series_prefix(name, labels):
+    if not labels:
+        return name
+    label_str = ','.join(
+        f'{k}="{remote_write.escape_label_value(str(v))}"'
+        for k, v in labels.items())
+    return f"{name}{{{label_str}}}"
+
+
+class PayloadBuilder:
+    """Payload of many series, rendered at once.
+
+    Timestamps and values arrays shared by several series, e.g., the
+    vCPUs of a host, are only generated and converted once.
+    """
+
+    def __init__(self):
+        # metric name -> (metric type, [(prefix, labels, timestamps id,
+        # values id)])
+        self._families = {}
+        # array id -> (array, {form: rendered array})
+        self._arrays = {}
+        # generator arguments -> array
+        self._generated = {}
+        # (timestamps id, values id) -> samples
+        self._samples_cache = {}
+        # timestamps -> rendered timestamps
+        self._timestamps = {}
+        self.samples = 0
+
+    def _register(self, array):
+        # The arrays are referenced, so that their ids stay unique
+        self._arrays.setdefault(id(array), (array, {}))
+        return id(array)
+
+    def _rendered(self, array_id, form):
+        array, rendered = self._arrays[array_id]
+        if form not in rendered:
+            if form == 'list':
+                rendered[form] = _to_list(array)
+            elif form == 'timestamps':
+                # Series generated separately usually have equal timestamps
+                timestamps = tuple(self._rendered(array_id, 'list'))
+                if timestamps not in self._timestamps:
+                    self._timestamps[timestamps] = [
+                        f" {timestamp}\n" for timestamp in timestamps]
+                rendered[form] = self._timestamps[timestamps]
+            else:
+                rendered[form] = list(map(repr,
+                                          self._rendered(array_id, 'list')))
+        return rendered[form]
+
+    def _generate(self, func, *args):
+        key = (func, args)
+        if key not in self._generated:
+            self._generated[key] = func(*args)
+        return self._generated[key]
+
+    def timestamps(self, count, interval_secs, end_ms):
+        """Return sample_timestamps(), shared by the series of the payload.
+
+        The returned array must not be modified.
+        """
+        return self._generate(sample_timestamps, count, interval_secs,
+                              end_ms)
+
+    def counter_values(self, count, start_value, increment):
+        """Return counter_values(), shared by the series of the payload.
+
+        The returned array must not be modified.
+        """
+        return self._generate(counter_values, count, start_value, increment)
+
+    def add(self, name, labels, timestamps, values, metric_type='untyped'):
+        """Add a series to the payload.
+
+        :param name: The metric name.
+        :param labels: A dict with the labels of the series.
+        :param timestamps: The timestamps of the samples, in ms.
+        :param values: The values of the samples.
+        :param metric_type: The type of the metric, e.g., 'counter'.
+        """
+        if len(timestamps) != len(values):
+            raise ValueError("timestamps and values have different sizes")
+        family = self._families.setdefault(name, (metric_type, []))
+        family[1].append((_series_prefix(name, labels), dict(labels),
+                          self._register(timestamps),
+                          self._register(values)))
+        self.samples += len(values)
+
+    def to_exposition(self):
+        """Render the payload in the Prometheus text exposition format."""
+        parts = []
+        for name, (metric_type, series) in self._families.items():
+            parts.append(f"# TYPE {name} {metric_type}\n")
+            for prefix, _, ts_id, values_id in series:
+                samples = map(operator.add,
+                              self._rendered(values_id, 'values'),
+                              self._rendered(ts_id, 'timestamps'))
+                parts.append(prefix + ' ')
+                parts.append((prefix + ' ').join(samples))
+        return ''.join(parts)
+
+    def _samples(self, ts_id, values_id):
+        key = (ts_id, values_id)
+        if key not in self._samples_cache:
+            self._samples_cache[key] = tuple(zip(
+                self._rendered(ts_id, 'list'),
+                self._rendered(values_id, 'list')))
+        return self._samples_cache[key]
+
+    def to_series(self):
+        """Return the payload as a list of remote_write.Series.
+
+        The samples of the series are tuples, shared by the series with
+        the same timestamps and values arrays.
+        """
+        return [remote_write.Series(dict(labels, __name__=name),
+                                    self._samples(ts_id, values_id))
+                for name, (_, series) in self._families.items()
+                for _, labels, ts_id, values_id in series]
@@ -0,0 +1,129 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Client of the Prometheus HTTP query API.
+
+Query results are decoded into QuerySeries, holding the timestamps and
+values of every series in compact arrays of doubles, which can be summed
+or compared without walking the JSON structure of the response.
+"""
+
+import array
+import collections
+from urllib import parse
+
+from watcher_tempest_plugin.services import json_codec
+
+QuerySeries = collections.namedtuple(
+    'QuerySeries', ['labels', 'timestamps', 'values'])
+QuerySeries.__doc__ = """A series of a query result.
+
+:param labels: A dict with the labels of the series.
+:param timestamps: An array of timestamps, in seconds.
+:param values: An array of values, as floats.
+"""
+
+
+class QueryError(Exception):
+    """Prometheus failed to evaluate a query."""
+
+
+def _to_series(labels, samples):
+    timestamps = array.array('d', (float(ts) for ts, _ in samples))
+    values = array.array('d', (float(value) for _, value in samples))
+    return QuerySeries(labels, timestamps, values)
+
+
+def decode_result(data):
+    """Decode the 'data' object of a query response.
+
+    :param data: A dict with the 'resultType' and 'result' of a query.
+    :raises: QueryError if the result is a string, or of an unknown type.
+    :return: A list of QuerySeries. Scalars are returned as a single
+      series without labels.
+    """
+    result_type = data.get('resultType')
+    result = data.get('result')
+    if result_type == 'matrix':
+        return [_to_series(item.get('metric', {}), item.get('values', []))
+                for item in result]
+    if result_type == 'vector':
+        return [_to_series(item.get('metric', {}), [item['value']])
+                for item in result]
+    if result_type == 'scalar':
+        return [_to_series({}, [result])]
+    if result_type == 'string':
+        # Values of the series are numbers
+        raise QueryError(f"Unsupported string query result: {result}")
+    raise QueryError(f"Unknown query result type: {result_type}")
+
+
+class PrometheusQueryClient:
+    """Send instant and range queries to the Prometheus HTTP API."""
+
+    def __init__(self, url, http, codec=None):
+        """Initialize PrometheusQueryClient.
+
+        :param url: Base URL of the Prometheus server.
+        :param http: The HTTP transport, e.g., a KeepAliveHttp.
+        :param codec: The JSONCodec decoding the responses.
+        """
+        base_url = url if url.endswith('/') else url + '/'
+        self.query_url = parse.urljoin(base_url, 'api/v1/query')
+        self.query_range_url = parse.urljoin(base_url, 'api/v1/query_range')
+        self.http = http
+        self.codec = codec or json_codec.get_codec()
+
+    def _post(self, url, params):
+        # Queries are sent as forms, so long expressions fit in the body
+        resp, body = self.http.request(
+            url, 'POST',
+            headers={'Content-Type': 'application/x-www-form-urlencoded'},
+            body=parse.urlencode(params))
+        try:
+            document = self.codec.loads(body)
+        except ValueError:
+            document = {}
+        if resp.status != 200 or document.get('status') != 'success':
+            error = document.get('error') or body
+            raise QueryError(
+                f"Query to {url} failed with status {resp.status}: "
+                f"{error}")
+        return decode_result(document['data'])
+
+    def query(self, expr, time=None):
+        """Evaluate an instant query.
+
+        :param expr: The PromQL expression.
+        :param time: Evaluation timestamp, in seconds. Defaults to now.
+        :raises: QueryError if the query fails.
+        :return: A list of QuerySeries, with a single sample each.
+        """
+        params = {'query': expr}
+        if time is not None:
+            params['time'] = time
+        return self._post(self.query_url, params)
+
+    def query_range(self, expr, start, end, step):
+        """Evaluate a range query.
+
+        :param expr: The PromQL expression.
+        :param start: Start timestamp, in seconds.
+        :param end: End timestamp, in seconds.
+        :param step: Resolution of the query, in seconds.
+        :raises: QueryError if the query fails.
+        :return: A list of QuerySeries.
+        """
+        return self._post(self.query_range_url, {
+            'query': expr, 'start': start, 'end': end, 'step': step})
@@ -0,0 +1,354 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Prometheus remote-write encoder and client.
+
+Samples are encoded in the protobuf WriteRequest message of the remote
+write 1.0 protocol and compressed with the snappy block format. The few
+messages involved are encoded by hand, so the protobuf library is not
+needed. The snappy compression uses python-snappy or cramjam when one of
+them is installed, and falls back to an uncompressed snappy block, which
+is valid but larger, otherwise.
+"""
+
+import collections
+import functools
+import math
+import struct
+import time
+
+from oslo_utils import importutils
+
+snappy = importutils.try_import('snappy')
+cramjam = importutils.try_import('cramjam')
+
+# Label added by 'promtool push metrics' to the series it pushes
+DEFAULT_JOB = 'promtool'
+
+Series = collections.namedtuple('Series', ['labels', 'samples'])
+Series.__doc__ = """A time series and its samples.
+
+:param labels: A dict of labels, including the metric name as
+  '__name__'.
+:param samples: A list of (timestamp in milliseconds, value) tuples.
+"""
+
+
+class ParseError(ValueError):
+    """Metrics are not valid Prometheus exposition text."""
+
+
+# ### Exposition format ### #
+
+_ESCAPES = {'\\': '\\', '"': '"', 'n': '\n'}
+
+
+def _parse_value(token):
+    lowered = token.lower()
+    if lowered in ('+inf', 'inf'):
+        return math.inf
+    if lowered == '-inf':
+        return -math.inf
+    return float(token)
+
+
+def _parse_labels(line, pos):
+    """Parse the labels of a line, starting after its '{'."""
+    labels = {}
+    length = len(line)
+    while True:
+        while pos < length and line[pos] in ' \t,':
+            pos += 1
+        if pos < length and line[pos] == '}':
+            return labels, pos + 1
+        eq = line.find('=', pos)
+        if eq < 0:
+            raise ParseError(f"Invalid labels in line: {line}")
+        name = line[pos:eq].strip()
+        # Label names may be quoted, as in the payloads of the tests
+        if len(name) > 1 and name[0] == name[-1] == '"':
+            name = name[1:-1]
+        pos = eq + 1
+        while pos < length and line[pos] in ' \t':
+            pos += 1
+        if pos >= length or line[pos] != '"':
+            raise ParseError(f"Invalid label value in line: {line}")
+        pos += 1
+        value = []
+        while True:
+            end = line.find('"', pos)
+            backslash = line.find('\\', pos, end if end >= 0 else length)
+            if backslash >= 0:
+                value.append(line[pos:backslash])
+                escaped = line[backslash + 1:backslash + 2]
+                value.append(_ESCAPES.get(escaped, '\\' + escaped))
+                pos = backslash + 2
+            elif end >= 0:
+                value.append(line[pos:end])
+                pos = end + 1
+                break
+            else:
+                raise ParseError(f"Unterminated label value in line: {line}")
+        labels[name] = ''.join(value)
+
+
+def parse_exposition(text, default_timestamp=None):
+    """Parse metrics in the Prometheus text exposition format.
+
+    :param text: The metrics, as a str.
+    :param default_timestamp: Timestamp in milliseconds of the samples
+      without a timestamp. Defaults to the current time.
+    :return: A list of Series, in order of first appearance.
+    """
+    if default_timestamp is None:
+        default_timestamp = int(time.time() * 1000)
+    series = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        brace = line.find('{')
+        space = line.find(' ')
+        if brace >= 0 and (space < 0 or brace < space):
+            labels, pos = _parse_labels(line, brace + 1)
+            name = line[:brace].strip()
+        else:
+            if space < 0:
+                raise ParseError(f"Missing value in line: {line}")
+            labels, pos = {}, space
+            name = line[:space]
+        tokens = line[pos:].split()
+        if not name or not 1 <= len(tokens) <= 2:
+            raise ParseError(f"Invalid sample line: {line}")
+        try:
+            value = _parse_value(tokens[0])
+            timestamp = (int(tokens[1]) if len(tokens) == 2
+                         else default_timestamp)
+        except ValueError:
+            raise ParseError(f"Invalid sample line: {line}")
+
+        labels['__name__'] = name
+        key = tuple(sorted(labels.items()))
+        if key not in series:
+            series[key] = Series(labels, [])
+        series[key].samples.append((timestamp, value))
+    return list(series.values())
+
+
+def escape_label_value(value):
+    """Escape a label value for the exposition format."""
+    return (value.replace('\\', '\\\\').replace('\n', '\\n')
+            .replace('"', '\\"'))
+
+
+def render_exposition(series):
+    """Render series in the Prometheus text exposition format.
+
+    :param series: An iterable of Series.
+    :return: The metrics, as a str.
+    """
+    lines = []
+    for labels, samples in series:
+        name = labels.get('__name__', '')
+        label_str = ','.join(
+            f'{k}="{escape_label_value(str(v))}"'
+            for k, v in labels.items() if k != '__name__')
+        prefix = f"{name}{{{label_str}}}" if label_str else name
+        lines.extend(f"{prefix} {repr(float(value))} {int(timestamp)}"
+                     for timestamp, value in samples)
+    lines.append('')
+    return '\n'.join(lines)
+
+
+def render_openmetrics(series, extra_labels=None):
+    """Render series in the OpenMetrics text format.
+
+    The samples of every series are sorted, and the series of a metric
+    are grouped, as required by OpenMetrics parsers. Metrics are left
+    untyped.
+
+    :param series: An iterable of Series.
+    :param extra_labels: Labels set on every series, overriding the
+      labels of the series with the same name.
+    :return: The metrics, as a str ending with the '# EOF' marker.
+    """
+    families = {}
+    for labels, samples in series:
+        labels = dict(labels, **(extra_labels or {}))
+        families.setdefault(labels.pop('__name__', ''), []).append(
+            (labels, samples))
+    lines = []
+    for name, family in families.items():
+        for labels, samples in family:
+            label_str = ','.join(
+                f'{k}="{escape_label_value(str(v))}"'
+                for k, v in labels.items())
+            prefix = f"{name}{{{label_str}}}" if label_str else name
+            # OpenMetrics timestamps are in seconds
+            lines.extend(
+                f"{prefix} {repr(float(value))} "
+                f"{'%d.%03d' % divmod(int(timestamp), 1000)}"
+                for timestamp, value in sorted(samples, key=lambda s: s[0]))
+    lines.append('# EOF\n')
+    return '\n'.join(lines)
+
+
+# ### Protobuf encoding ### #
+
+def _varint(value):
+    if value < 0:
+        value += 1 << 64
+    out = bytearray()
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _length_delimited(key, payload):
+    return key + _varint(len(payload)) + payload
+
+
+_pack_double = struct.Struct('<d').pack
+
+
+def encode_labels(labels):
+    """Encode the labels of a series, as TimeSeries message fields."""
+    parts = []
+    # Remote write receivers expect labels sorted by name
+    for name, value in sorted(labels.items()):
+        label = (_length_delimited(b'\x0a', name.encode('utf-8'))
+                 + _length_delimited(b'\x12', str(value).encode('utf-8')))
+        parts.append(_length_delimited(b'\x0a', label))
+    return b''.join(parts)
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _timestamp_field(timestamp):
+    # Most series of a payload share the same timestamps
+    return b'\x10' + _varint(timestamp)
+
+
+def encode_samples(samples):
+    """Encode the samples of a series, as TimeSeries message fields."""
+    parts = []
+    for timestamp, value in sorted(samples, key=lambda s: s[0]):
+        timestamp = _timestamp_field(int(timestamp))
+        # A Sample message is always shorter than 128 bytes, so its
+        # length is a single byte varint
+        parts.append(b'\x12' + bytes((9 + len(timestamp),)) + b'\x09'
+                     + _pack_double(float(value)) + timestamp)
+    return b''.join(parts)
+
+
+def encode_series(encoded_labels, encoded_samples):
+    """Encode a TimeSeries field of a WriteRequest message."""
+    return _length_delimited(b'\x0a', encoded_labels + encoded_samples)
+
+
+def _encode_series(labels, samples, extra_labels):
+    all_labels = dict(labels)
+    all_labels.update(extra_labels)
+    return encode_series(encode_labels(all_labels), encode_samples(samples))
+
+
+def encode_write_request(series, extra_labels=None):
+    """Encode series in a remote-write WriteRequest protobuf message.
+
+    :param series: An iterable of Series.
+    :param extra_labels: Labels set on every series, overriding the
+      labels of the series with the same name, as promtool does.
+    :return: The serialized message, as bytes.
+    """
+    extra_labels = extra_labels or {}
+    return b''.join(_encode_series(labels, samples, extra_labels)
+                    for labels, samples in series)
+
+
+# ### Snappy block format ### #
+
+_LITERAL_CHUNK = 1 << 16
+
+
+def _snappy_literals(data):
+    out = [_varint(len(data))]
+    for i in range(0, len(data), _LITERAL_CHUNK):
+        chunk = data[i:i + _LITERAL_CHUNK]
+        size = len(chunk) - 1
+        if size < 60:
+            out.append(bytes([size << 2]))
+        else:
+            # Tag 61 << 2 announces a 2 bytes little-endian length
+            out.append(bytes([61 << 2]) + struct.pack('<H', size))
+        out.append(chunk)
+    return b''.join(out)
+
+
+def snappy_compress(data):
+    """Compress data in the snappy block format."""
+    if snappy is not None:
+        return snappy.compress(data)
+    if cramjam is not None:
+        return bytes(cramjam.snappy.compress_raw(data))
+    return _snappy_literals(data)
+
+
+# ### Client ### #
+
+class RemoteWriteError(Exception):
+    """The remote write endpoint rejected a request."""
+
+
+class RemoteWriteClient:
+    """Push samples to a Prometheus remote-write endpoint."""
+
+    HEADERS = {
+        'Content-Encoding': 'snappy',
+        'Content-Type': 'application/x-protobuf',
+        'User-Agent': 'watcher-tempest-plugin',
+        'X-Prometheus-Remote-Write-Version': '0.1.0',
+    }
+
+    def __init__(self, url, http, extra_labels=None):
+        """Initialize RemoteWriteClient.
+
+        :param url: URL of the remote-write endpoint.
+        :param http: The HTTP transport, e.g., a KeepAliveHttp.
+        :param extra_labels: Labels set on every pushed series, by default
+          the 'job' label set by promtool.
+        """
+        self.url = url
+        self.http = http
+        self.extra_labels = (
+            {'job': DEFAULT_JOB} if extra_labels is None else extra_labels)
+
+    def push(self, series):
+        """Push series to the remote-write endpoint.
+
+        :param series: An iterable of Series.
+        :raises: RemoteWriteError if the endpoint rejects the samples.
+        :returns: The size of the compressed request body, in bytes.
+        """
+        body = snappy_compress(
+            encode_write_request(series, self.extra_labels))
+        resp, resp_body = self.http.request(
+            self.url, 'POST', headers=self.HEADERS, body=body)
+        if resp.status >= 300:
+            if isinstance(resp_body, bytes):
+                resp_body = resp_body.decode('utf-8', 'replace')
+            raise RemoteWriteError(
+                f"Remote write to {self.url} failed with status "
+                f"{resp.status}: {resp_body.strip()}")
+        return len(body)
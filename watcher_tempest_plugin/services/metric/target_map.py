@@ -0,0 +1,149 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Map of host names to the instances of their Prometheus targets.
+
+Hosts are looked up by FQDN, by short hostname, or by a name differing
+from the FQDN of their target by its domain suffix, e.g., 'compute-0.ctl'
+for the 'compute-0.ctl.example.com' target. Every dotted prefix of the
+FQDNs is indexed, so that any lookup is a few dict accesses.
+"""
+
+import collections
+from collections import abc
+import threading
+import time
+
+from oslo_log import log
+
+LOG = log.getLogger(__name__)
+
+# Marks an index key shared by targets of different instances
+_AMBIGUOUS = object()
+
+
+def _prefixes(name):
+    """Return the dotted prefixes of a name, longest first."""
+    parts = name.split('.')
+    return ['.'.join(parts[:i]) for i in range(len(parts), 0, -1)]
+
+
+class TargetMap(abc.Mapping):
+    """Self-refreshing map of host names to Prometheus instances.
+
+    The targets are fetched again once the map is older than its TTL,
+    and when a name is not found, at most once per 'min_refresh_interval'
+    seconds, so that hosts joining after the first lookup are found
+    without fetching the targets on every miss.
+    """
+
+    MIN_REFRESH_INTERVAL = 10
+
+    def __init__(self, fetch_targets, fqdn_label='fqdn', ttl=300,
+                 min_refresh_interval=MIN_REFRESH_INTERVAL):
+        """Initialize TargetMap.
+
+        :param fetch_targets: Callable returning the labels of the active
+          targets, as a list of dicts.
+        :param fqdn_label: Target label holding the FQDN of the host.
+        :param ttl: Seconds after which the targets are fetched again.
+        :param min_refresh_interval: Minimum number of seconds between
+          two fetches caused by missing names.
+        """
+        self.fetch_targets = fetch_targets
+        self.fqdn_label = fqdn_label
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self._lock = threading.Lock()
+        self._exact = {}
+        self._partial = {}
+        self._fetched_at = None
+        self._stats = collections.Counter()
+
+    def _index(self, targets):
+        exact = {}
+        partial = {}
+        for labels in targets:
+            fqdn = labels.get(self.fqdn_label)
+            instance = labels.get('instance')
+            if not fqdn or not instance:
+                continue
+            exact[fqdn] = instance
+            for prefix in _prefixes(fqdn)[1:]:
+                if partial.get(prefix, instance) != instance:
+                    partial[prefix] = _AMBIGUOUS
+                else:
+                    partial[prefix] = instance
+        self._exact = exact
+        self._partial = {name: instance for name, instance in partial.items()
+                         if instance is not _AMBIGUOUS}
+
+    def _refresh(self):
+        targets = self.fetch_targets()
+        self._fetched_at = time.monotonic()
+        self._stats['refreshes'] += 1
+        self._index(targets)
+        LOG.debug(f"Mapped {len(self._exact)} hosts to Prometheus "
+                  "instances.")
+
+    def _lookup(self, name):
+        instance = self._exact.get(name)
+        if instance is not None:
+            return instance
+        # A longer name matches the target of one of its prefixes
+        for prefix in _prefixes(name):
+            instance = self._exact.get(prefix) or self._partial.get(prefix)
+            if instance is not None:
+                return instance
+        return None
+
+    def invalidate(self):
+        """Fetch the targets again on the next lookup."""
+        with self._lock:
+            self._fetched_at = None
+
+    def __getitem__(self, name):
+        with self._lock:
+            now = time.monotonic()
+            if (self._fetched_at is None
+                    or now - self._fetched_at > self.ttl):
+                self._refresh()
+            instance = self._lookup(name)
+            if (instance is None
+                    and now - self._fetched_at > self.min_refresh_interval):
+                self._stats['miss_refreshes'] += 1
+                self._refresh()
+                instance = self._lookup(name)
+            self._stats['misses' if instance is None else 'hits'] += 1
+        if instance is None:
+            raise KeyError(name)
+        return instance
+
+    def _snapshot(self):
+        with self._lock:
+            if self._fetched_at is None:
+                self._refresh()
+            return dict(self._partial, **self._exact)
+
+    def __iter__(self):
+        return iter(self._snapshot())
+
+    def __len__(self):
+        return len(self._snapshot())
+
+    def stats(self):
+        """Return the number of hits, misses and target fetches."""
+        with self._lock:
+            return {name: self._stats[name] for name in (
+                'hits', 'misses', 'refreshes', 'miss_refreshes')}
@@ -0,0 +1,24 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from watcher_tempest_plugin.services import async_base
+from watcher_tempest_plugin.services.metric.v1.json import client
+
+
+class AsyncGnocchiClient(async_base.AsyncClientMixin,
+                         client.GnocchiClientJSON):
+    """Asyncio REST client for Gnocchi API v1.
+
+    It has the same methods as GnocchiClientJSON, which return awaitables.
+    """
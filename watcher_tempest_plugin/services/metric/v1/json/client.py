@@ -14,8 +14,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-
-from oslo_serialization import jsonutils
 from watcher_tempest_plugin.services import base
 
 
@@ -27,13 +25,13 @@ class GnocchiClientJSON(base.BaseClient):
 
     def serialize(self, object_dict):
         """Serialize a Gnocchi object."""
-        return jsonutils.dumps(object_dict)
+        return self.codec.dumps(object_dict)
 
     def deserialize(self, object_str):
         """Deserialize a Gnocchi object."""
         if not object_str:
             return object_str
-        return jsonutils.loads(object_str.decode('utf-8'))
+        return self.codec.loads(object_str)
 
     @base.handle_errors
     def create_resource(self, **kwargs):
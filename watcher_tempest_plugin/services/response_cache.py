@@ -0,0 +1,134 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import collections
+import threading
+import time
+
+
+class _CacheEntry:
+
+    __slots__ = ('resource', 'resp', 'body', 'etag', 'expires_at')
+
+    def __init__(self, resource, resp, body, etag, expires_at):
+        self.resource = resource
+        self.resp = resp
+        self.body = body
+        self.etag = etag
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """Bounded LRU cache of GET responses with a TTL per resource.
+
+    Only raw response bodies are stored, so callers always get a freshly
+    deserialized object and can not alter the cached copy.
+    """
+
+    def __init__(self, ttls=None, maxsize=256):
+        """Initialize ResponseCache.
+
+        :param ttls: A dict mapping resource names, e.g., 'goals', to the
+          number of seconds their responses are considered fresh.
+          Resources not in this dict are never cached.
+        :param maxsize: Maximum number of responses kept in the cache.
+        """
+        self._ttls = dict(ttls or {})
+        self._maxsize = maxsize
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = collections.Counter()
+
+    def set_ttl(self, resource, ttl):
+        """Set the TTL of a resource; a TTL of 0 disables its caching."""
+        with self._lock:
+            if ttl:
+                self._ttls[resource] = ttl
+            else:
+                self._ttls.pop(resource, None)
+                self._invalidate(resource)
+
+    def is_cacheable(self, resource):
+        return resource in self._ttls
+
+    def lookup(self, key):
+        """Look up a cached response.
+
+        :param key: The key of the GET request, e.g., its URI.
+        :return: A tuple with the cached entry, or None, and whether the
+          entry is still fresh.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None, False
+            self._entries.move_to_end(key)
+            if entry.expires_at > time.monotonic():
+                self._stats['hits'] += 1
+                return entry, True
+            self._stats['stale'] += 1
+            return entry, False
+
+    def store(self, resource, key, resp, body):
+        """Store the response of a GET request to a cacheable resource."""
+        with self._lock:
+            ttl = self._ttls.get(resource)
+            if not ttl:
+                return
+            self._entries[key] = _CacheEntry(
+                resource, resp, body, resp.get('etag'),
+                time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def revalidated(self, key):
+        """Extend the freshness of an entry the server reported unchanged.
+
+        :return: The revalidated entry, or None if it was evicted.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.expires_at = (time.monotonic()
+                                    + self._ttls.get(entry.resource, 0))
+                self._stats['revalidations'] += 1
+            return entry
+
+    def invalidate(self, resource=None):
+        """Drop cached responses.
+
+        :param resource: Only drop the responses of this resource. When
+          None, the whole cache is cleared.
+        """
+        with self._lock:
+            self._invalidate(resource)
+
+    def _invalidate(self, resource):
+        if resource is None:
+            self._entries.clear()
+            return
+        for key in [key for key, entry in self._entries.items()
+                    if entry.resource == resource]:
+            del self._entries[key]
+
+    def stats(self):
+        """Return the cache hit/miss counters and its current size."""
+        with self._lock:
+            stats = {name: self._stats[name] for name in (
+                'hits', 'misses', 'stale', 'revalidations', 'evictions')}
+            stats['size'] = len(self._entries)
+            return stats
@@ -0,0 +1,141 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import collections
+from email import utils as email_utils
+import random
+import threading
+import time
+
+from oslo_log import log
+import urllib3
+
+LOG = log.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset(
+    ['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+
+
+def _retry_after(resp):
+    """Parse the Retry-After header of a response, in seconds."""
+    value = (resp or {}).get('retry-after')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email_utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class RetryPolicy:
+    """Retry transient API errors with exponential backoff and jitter.
+
+    Idempotent requests are retried on the configured statuses and on
+    connection errors. Other requests, which the server may already have
+    processed, are only retried on 503 Service Unavailable.
+    """
+
+    def __init__(self, max_attempts=3, backoff_base=0.5, backoff_max=10.0,
+                 max_elapsed=60.0, retry_statuses=(409, 503)):
+        """Initialize RetryPolicy.
+
+        :param max_attempts: Maximum number of attempts of a request,
+          including the first one.
+        :param backoff_base: Upper bound of the first backoff, in seconds,
+          doubled on every retry.
+        :param backoff_max: Maximum backoff between two attempts.
+        :param max_elapsed: Time budget of a request and all its retries,
+          in seconds. No retry is attempted past it.
+        :param retry_statuses: HTTP statuses considered transient.
+        """
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_elapsed = max_elapsed
+        self.retry_statuses = frozenset(retry_statuses)
+        self._lock = threading.Lock()
+        self._stats = collections.Counter()
+
+    def _is_retryable(self, method, error):
+        resp = getattr(error, 'resp', None)
+        status = getattr(resp, 'status', None)
+        if status is not None:
+            if status not in self.retry_statuses:
+                return False
+            return method in IDEMPOTENT_METHODS or status == 503
+        if isinstance(error, (ConnectionError, urllib3.exceptions.HTTPError)):
+            return method in IDEMPOTENT_METHODS
+        return False
+
+    def _backoff(self, attempt, error):
+        # Full jitter spreads the retries of concurrent clients over time
+        delay = random.uniform(
+            0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+        retry_after = _retry_after(getattr(error, 'resp', None))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def call(self, method, fn):
+        """Call fn, retrying it on transient errors.
+
+        :param method: The HTTP method of the request sent by fn.
+        :param fn: A callable without arguments sending the request.
+        :return: The result of fn.
+        :raises: The last error raised by fn.
+        """
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                result = fn()
+            except Exception as e:
+                if not self._is_retryable(method, e):
+                    raise
+                delay = self._backoff(attempt, e)
+                elapsed = time.monotonic() - start
+                if (attempt >= self.max_attempts
+                        or elapsed + delay > self.max_elapsed):
+                    with self._lock:
+                        self._stats['exhausted'] += 1
+                    raise
+                with self._lock:
+                    self._stats['retries'] += 1
+                    if attempt == 1:
+                        self._stats['retried_requests'] += 1
+                LOG.debug(f"Retrying {method} request in {delay:.2f}s "
+                          f"after attempt {attempt} failed: {e}")
+                time.sleep(delay)
+            else:
+                if attempt > 1:
+                    with self._lock:
+                        self._stats['recovered'] += 1
+                return result
+
+    def stats(self):
+        """Return the retry counters.
+
+        :return: A dict with the number of requests retried at least once,
+          of retries, of retried requests that eventually succeeded and of
+          requests that ran out of attempts or time.
+        """
+        with self._lock:
+            return {name: self._stats[name] for name in (
+                'retried_requests', 'retries', 'recovered', 'exhausted')}
@@ -0,0 +1,263 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Run commands through a long-lived shell, e.g., 'oc rsh <pod> sh'.
+
+Commands are written to the stdin of the shell one after the other. The
+outputs of a command are delimited by a marker, unique to the command,
+printed on stdout, followed by its exit status, and on stderr once it
+ended. The input data of a command is passed as a here-document, so it
+is text always ending with a newline, and commands without input data
+read from /dev/null, so that they never consume the commands that follow
+them.
+"""
+
+import shlex
+import threading
+import time
+import uuid
+
+from oslo_log import log
+import paramiko
+from tempest.lib import exceptions
+
+from watcher_tempest_plugin.services import base
+
+LOG = log.getLogger(__name__)
+
+
+class SessionClosed(Exception):
+    """The shell of a session exited."""
+
+
+class _Output:
+    """Buffer of an output of the shell, filled by a reader thread."""
+
+    def __init__(self, stream, stderr, cond):
+        self.buffer = bytearray()
+        self.closed = False
+        self._cond = cond
+        self._reader = threading.Thread(
+            target=self._read, args=(stream, stderr), daemon=True)
+        self._reader.start()
+
+    def _read(self, stream, stderr):
+        try:
+            while True:
+                data = stream.read(stderr=stderr)
+                if not data:
+                    break
+                with self._cond:
+                    self.buffer += data
+                    self._cond.notify_all()
+        except Exception as e:
+            LOG.debug(f"Shell session output closed: {e}")
+        finally:
+            with self._cond:
+                self.closed = True
+                self._cond.notify_all()
+
+    def pop_until(self, marker):
+        """Pop the data written before a marker, and the marker itself.
+
+        :return: The data before the marker, or None if the marker was
+          not written yet.
+        """
+        index = self.buffer.find(marker)
+        if index < 0:
+            return None
+        data = bytes(self.buffer[:index])
+        del self.buffer[:index + len(marker)]
+        return data
+
+
+class _Session:
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._cond = threading.Condition()
+        self.stdout = _Output(stream, False, self._cond)
+        self.stderr = _Output(stream, True, self._cond)
+
+    def close(self):
+        self.stream.close()
+
+    def _write(self, data):
+        try:
+            self.stream.write(data)
+        except (OSError, paramiko.SSHException) as e:
+            raise SessionClosed() from e
+
+    def _write_input(self, delimiter, input_data):
+        last = b'\n'
+        for chunk in base._iter_input_chunks(input_data):
+            if len(chunk):
+                self._write(chunk)
+                last = bytes(chunk[-1:])
+        # The delimiter must start a new line
+        if last != b'\n':
+            self._write(b'\n')
+        self._write(delimiter + b'\n')
+
+    def _wait(self, cmd_str, deadline):
+        """Wait for more output, until a deadline."""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise exceptions.TimeoutException(
+                f"Command: '{cmd_str}' executed in a shell session.")
+        self._cond.wait(remaining)
+
+    def run(self, cmd_str, timeout, input_data=None):
+        token = f"__watcher_{uuid.uuid4().hex}__"
+        marker = token.encode('ascii')
+        if input_data is None:
+            self._write(f"{cmd_str} < /dev/null\n".encode('utf-8'))
+        else:
+            self._write(f"{cmd_str} <<'{token}'\n".encode('utf-8'))
+            self._write_input(marker, input_data)
+        self._write(
+            f"printf '%s %d\\n' {token} $?; printf '%s' {token} >&2\n"
+            .encode('utf-8'))
+
+        deadline = time.monotonic() + timeout
+        out = err = None
+        with self._cond:
+            while True:
+                if out is None:
+                    out = self.stdout.pop_until(marker)
+                if err is None:
+                    err = self.stderr.pop_until(marker)
+                if out is not None and err is not None:
+                    break
+                if self.stdout.closed or self.stderr.closed:
+                    raise SessionClosed()
+                self._wait(cmd_str, deadline)
+
+            # Wait for the exit status following the stdout marker
+            while b'\n' not in self.stdout.buffer:
+                if self.stdout.closed:
+                    raise SessionClosed()
+                self._wait(cmd_str, deadline)
+            status = self.stdout.pop_until(b'\n')
+
+        return base.CmdResult(out.decode('utf-8'), err.decode('utf-8'),
+                              int(status))
+
+
+class ShellSessionCmdClient(base.BaseCmdClient):
+    """Command client running commands in a long-lived shell.
+
+    The shell is started by another command client, and restarted when it
+    exits, e.g., when the pod it runs in is restarted. Commands are run
+    one at a time. When the client cannot stream the shell, the commands
+    run with the fallback client instead.
+    """
+
+    def __init__(self, client, get_shell_cmd, timeout=300, fallback=None):
+        """Initialize ShellSessionCmdClient.
+
+        :param client: The command client starting the shell.
+        :param get_shell_cmd: Callable returning the command starting the
+          shell, called again every time the shell is restarted.
+        :param timeout: Default timeout of the commands, in seconds. A
+          command still running when it expires is abandoned with its
+          shell.
+        :param fallback: The command client running the commands when the
+          client raises StreamingNotSupported, e.g., a PodCmdClient.
+        """
+        self.client = client
+        self.get_shell_cmd = get_shell_cmd
+        self.timeout = timeout
+        self.fallback = fallback
+        self._streaming_supported = True
+        self._session = None
+        self._lock = threading.Lock()
+
+    def close(self):
+        """Stop the shell."""
+        with self._lock:
+            self._close_session()
+
+    def _close_session(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def _get_session(self):
+        if self._session is None:
+            self._session = _Session(
+                self.client.open_stream(self.get_shell_cmd()))
+        return self._session
+
+    def run_cmd(self, cmd, input_data=None, timeout=None):
+        if self._streaming_supported:
+            try:
+                return self._run_in_session(cmd, input_data, timeout)
+            except base.StreamingNotSupported as e:
+                if self.fallback is None:
+                    raise
+                LOG.warning(f"Running the commands without a shell session: "
+                            f"{e}")
+                self._streaming_supported = False
+        return self.fallback.run_cmd(cmd, input_data=input_data,
+                                     timeout=timeout or self.timeout)
+
+    def _run_in_session(self, cmd, input_data, timeout):
+        cmd_str = shlex.join(cmd) if isinstance(cmd, list) else cmd
+        LOG.debug(f"Executing command '{cmd_str}' in a shell session")
+
+        # Iterators cannot be sent again to a restarted shell
+        replayable = input_data is None or isinstance(
+            input_data, (str, bytes, bytearray, memoryview, list, tuple))
+        with self._lock:
+            restarted = not replayable
+            while True:
+                session = self._get_session()
+                try:
+                    return session.run(cmd_str, timeout or self.timeout,
+                                       input_data=input_data)
+                except SessionClosed:
+                    self._close_session()
+                    # Only retry once, the command may be killing the shell
+                    if restarted:
+                        raise
+                    LOG.debug("Shell session closed. Restarting it.")
+                    restarted = True
+                except Exception:
+                    # The shell may be stuck in the middle of the command
+                    self._close_session()
+                    raise
+
+    def exec_cmd(self, cmd, input_data=None, timeout=None):
+        """Execute a command with an optional input data.
+
+        :param cmd: command to be execute, which can be a string
+            or a sequence of arguments.
+        :param input_data: data to be sent to process stdin, either a str
+            or bytes, or an iterable of them, which is streamed in chunks.
+        :param timeout: communication timeout in seconds
+
+        :returns: output written to stdout.
+        :raises: SSHExecCommandFailed if the command exits with a nonzero
+            status.
+        :raises: TimeoutException if the command doesn't end when timeout
+            expires.
+        """
+        result = self.run_cmd(cmd, input_data=input_data, timeout=timeout)
+        if result.exit_status != 0:
+            raise exceptions.SSHExecCommandFailed(
+                command=shlex.join(cmd) if isinstance(cmd, list) else cmd,
+                exit_status=result.exit_status,
+                stderr=result.stderr, stdout=result.stdout)
+        return result.stdout
@@ -0,0 +1,97 @@
+# Copyright 2025 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import collections
+import threading
+import time
+
+
+class _Call:
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.done_at = None
+
+
+class SingleFlight:
+    """Coalesce identical concurrent calls into a single one.
+
+    The first caller of a key runs the call, while the callers of the
+    same key arriving before it completes, or up to 'window' seconds
+    after it completed, wait for and share its result or error.
+    """
+
+    def __init__(self, window=0.0):
+        """Initialize SingleFlight.
+
+        :param window: Number of seconds the result of a completed call
+          is still shared with new callers of the same key.
+        """
+        self.window = window
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = collections.Counter()
+
+    def _purge(self, now):
+        for key in [key for key, call in self._calls.items()
+                    if call.done_at is not None
+                    and now - call.done_at > self.window]:
+            del self._calls[key]
+
+    def do(self, key, fn):
+        """Run fn, unless an identical call can be shared.
+
+        :param key: A hashable identifying identical calls.
+        :param fn: A callable without arguments.
+        :return: The result of fn, or of the shared call.
+        :raises: The exception raised by fn, or by the shared call.
+        """
+        with self._lock:
+            self._purge(time.monotonic())
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats['executed'] += 1
+            else:
+                self._stats['coalesced'] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                call.done_at = time.monotonic()
+                # Errors are only shared with the callers already waiting
+                if (not self.window or call.error is not None) and (
+                        self._calls.get(key) is call):
+                    del self._calls[key]
+            call.event.set()
+
+    def stats(self):
+        """Return the number of executed calls and of calls saved."""
+        with self._lock:
+            return {'executed': self._stats['executed'],
+                    'coalesced': self._stats['coalesced']}
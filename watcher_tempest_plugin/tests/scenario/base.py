@@ -18,7 +18,6 @@
 
 import base64
 import functools
-import json
 import os_traits
 import random
 import textwrap
@@ -37,11 +36,17 @@ from tempest.lib.common.utils import data_utils
 from tempest.lib.common.utils import test_utils
 from tempest.lib import exceptions
 from tempest.scenario import manager
+from testtools import content
 
 from watcher_tempest_plugin import infra_optim_clients as clients
 from watcher_tempest_plugin.services.infra_optim.v1.json import (
     api_microversion_fixture as watcher_microversion_fixture
 )
+from watcher_tempest_plugin.services import instrumentation
+from watcher_tempest_plugin.services.metric import (
+    prometheus_client as prometheus_lib
+)
+from watcher_tempest_plugin.services.metric import prometheus_payload
 from watcher_tempest_plugin.tests.common import base
 
 
@@ -134,6 +139,15 @@ class BaseInfraOptimScenarioTest(manager.ScenarioTest,
             placement_microversion=CONF.placement.min_microversion))
         self.useFixture(watcher_microversion_fixture.APIMicroversionFixture(
             optimize_microversion=self.request_microversion))
+        # Gnocchi metrics of the instance resources created by this test
+        self._injected_gnocchi_metrics = set()
+        if CONF.optimize.request_stats_attach:
+            self.addCleanup(self._attach_request_stats)
+
+    def _attach_request_stats(self):
+        """Attach the worker's API request statistics to the result."""
+        self.addDetail('watcher-request-stats', content.json_content(
+            instrumentation.STATS.snapshot()))
 
     @classmethod
     def resource_setup(cls):
@@ -506,18 +520,27 @@ class BaseInfraOptimScenarioTest(manager.ScenarioTest,
         return measures_body
 
     def clean_injected_metrics(self):
-        """Delete all injected metrics from datastore.
+        """Delete the metrics injected by this test worker from datastore.
 
         This is useful to ensure that the tests are not affected by
-        previously injected metrics.
+        previously injected metrics. When metrics_run_label is set, only
+        the Prometheus series labelled with the run label of this worker
+        are deleted, so that tests running in parallel workers do not
+        delete each other's metrics. With Gnocchi, only the metrics of the
+        instances created by this test are deleted.
         """
         LOG.debug("Deleting injected metrics from Datastore")
         if CONF.optimize.datasource == "gnocchi":
-            # TODO(morenod): Add function for deleting injected metrics
-            # from Gnocchi.
-            pass
+            # Gnocchi measures have no labels, the metrics are deleted
+            # instead. The host resources are shared by all the workers,
+            # their metrics are recreated by the next injection.
+            for metric_uuid in self._injected_gnocchi_metrics:
+                test_utils.call_and_ignore_notfound_exc(
+                    self.gnocchi.delete_metric, metric_uuid)
+            self._injected_gnocchi_metrics.clear()
         elif CONF.optimize.datasource == "prometheus":
-            self.prometheus_client.delete_series()
+            self.prometheus_client.delete_series(
+                clean_tombstones=CONF.optimize.prometheus_clean_tombstones)
 
     def make_host_statistic(self, metrics=dict(), loaded_hosts=[]):
         """Add host metrics to the datasource
@@ -680,6 +703,8 @@ class BaseInfraOptimScenarioTest(manager.ScenarioTest,
             max=int(flavor[0]['ram']) * 0.9,
             metric_type='ram')
         self.gnocchi.add_measures(ram_metric_uuid, ram_measures)
+        self._injected_gnocchi_metrics.update(
+            (cpu_metric_uuid, ram_metric_uuid))
 
         for metric_uuid in [cpu_metric_uuid, ram_metric_uuid]:
             self.assertTrue(test_utils.call_until_true(
@@ -718,7 +743,9 @@ class BaseInfraOptimScenarioTest(manager.ScenarioTest,
           label pair will be added to all samples, thus
           creating a new series in prometheus. Providing a
           different label pair for every metric generation
-          will have the same effect.
+          will have the same effect. Ignored when the
+          prometheus_stable_series option is set, the client
+          then skips the samples already written instead.
         :param inc_factor: factor used when calculating the
           value of a sample, which is a factor of the sample's
           interval.
@@ -728,32 +755,42 @@ class BaseInfraOptimScenarioTest(manager.ScenarioTest,
 
         :return: String with all samples for a given metric.
         """
+        builder = prometheus_payload.PayloadBuilder()
+        self._add_prometheus_metrics(
+            builder, metric_name, metric_type=metric_type, labels=labels,
+            count=count, interval_secs=interval_secs,
+            add_unique_label=add_unique_label, inc_factor=inc_factor,
+            start_value=start_value, timestamp=timestamp)
+        return builder.to_exposition()
+
+    def _add_prometheus_metrics(self, builder, metric_name,
+                                metric_type="counter", labels={}, count=10,
+                                interval_secs=30, add_unique_label=True,
+                                inc_factor=0.8, start_value=1.0,
+                                timestamp=None):
+        """Add the samples of a metric to a payload.
+
+        The samples are the ones of _generate_prometheus_metrics. Series
+        of the same payload generated with the same parameters share
+        their timestamps and values arrays.
+
+        :param builder: The prometheus_payload.PayloadBuilder of the
+          payload.
+        """
         ts_now_ms = timestamp or int(datetime.now().timestamp()*1000)
 
         # NOTE(dviroel): by including a unique label value, we avoid the
         #  'out of order sample' error when pushing multiple
         #  samples to prometheus that overlap the timestamp
-        if add_unique_label:
+        if add_unique_label and not CONF.optimize.prometheus_stable_series:
             labels.update({"orig_timestamp": str(ts_now_ms)})
 
-        # convert labels to exposition format
-        str_labels = ""
-        if labels:
-            str_labels = json.dumps(labels, separators=(',', '='))
-
-        # timestamp is in ms
-        step_ms = interval_secs * 1000
-        data = '# TYPE %s %s\n' % (metric_name, metric_type)
-        # generate 'count' samples with incremental values
-        # samples need to be ordered by their timestamp
-        value = start_value
-        for i in range(count, 0, -1):
-            value += inc_factor * interval_secs
-            data += '%s%s %s %s\n' % (
-                metric_name, str_labels,
-                value, ts_now_ms - step_ms * i
-            )
-        return data
+        builder.add(
+            metric_name, labels,
+            builder.timestamps(count, interval_secs, ts_now_ms),
+            builder.counter_values(
+                count, start_value, inc_factor * interval_secs),
+            metric_type=metric_type)
 
     def make_instance_statistic_prometheus(self, instance):
         """Create Prometheus metrics for a instance
@@ -763,10 +800,11 @@ class BaseInfraOptimScenarioTest(manager.ScenarioTest,
         instance_labels = {
             "resource": instance['id'],
         }
+        builder = prometheus_payload.PayloadBuilder()
         # Generate cpu usage data for a instance
         # unit is ns, so for a 80%, inc_factor is 0.8 * 1e+9
-        cpu_data = self._generate_prometheus_metrics(
-            self.PROMETHEUS_METRIC_MAP['instance_cpu_usage'],
+        self._add_prometheus_metrics(
+            builder, self.PROMETHEUS_METRIC_MAP['instance_cpu_usage'],
             labels=instance_labels,
             start_value=1.0,
             inc_factor=8e+8)
@@ -775,15 +813,16 @@ class BaseInfraOptimScenarioTest(manager.ScenarioTest,
         # unit is megabytes, total is obtained from flavor
         # no inc_factor as memory is saved as gauge
         mem_usage_mb = int(instance['flavor']['ram'] * 0.8)
-        ram_data = self._generate_prometheus_metrics(
-            self.PROMETHEUS_METRIC_MAP['instance_ram_usage'],
+        self._add_prometheus_metrics(
+            builder, self.PROMETHEUS_METRIC_MAP['instance_ram_usage'],
             metric_type='gauge',
             labels=instance_labels,
             start_value=mem_usage_mb,
             inc_factor=0)
 
-        self.prometheus_client.add_measures(cpu_data)
-        self.prometheus_client.add_measures(ram_data)
+        with self.prometheus_client.batch() as batch:
+            batch.add(builder.to_series())
+        self._log_prometheus_series()
 
     def make_host_statistic_prometheus(self, loaded_hosts=[]):
         """Create host resource and its measures in Prometheus.
@@ -793,6 +832,9 @@ class BaseInfraOptimScenarioTest(manager.ScenarioTest,
         """
 
         hypervisors = self.get_hypervisors_setup()
+        # Measures of all the hosts are built in a single payload, pushed
+        # in a few large pushes
+        builder = prometheus_payload.PayloadBuilder()
 
         for h in hypervisors:
             # When doing maths with prometheus, we need to
@@ -817,20 +859,21 @@ class BaseInfraOptimScenarioTest(manager.ScenarioTest,
                     # Generate host usage data
                     # unit is seconds, that represent cpu in idle
                     if h['hypervisor_hostname'] in loaded_hosts:
-                        cpu_data = self._generate_prometheus_metrics(
+                        self._add_prometheus_metrics(
+                            builder,
                             self.PROMETHEUS_METRIC_MAP['host_cpu_usage'],
                             labels=host_labels,
                             start_value=1.0,
                             inc_factor=0.0,
                             timestamp=timestamp)
                     else:
-                        cpu_data = self._generate_prometheus_metrics(
+                        self._add_prometheus_metrics(
+                            builder,
                             self.PROMETHEUS_METRIC_MAP['host_cpu_usage'],
                             labels=host_labels,
                             start_value=1.0,
                             inc_factor=1.0,
                             timestamp=timestamp)
-                    self.prometheus_client.add_measures(cpu_data)
 
                 host_labels_ram = {
                     "instance": instance,
@@ -847,14 +890,13 @@ class BaseInfraOptimScenarioTest(manager.ScenarioTest,
                 mem_available_mb = int(h['memory_mb'] * (1 - load))
                 # metric is node_memory_MemAvailable_bytes which is in bytes
                 mem_available_bytes = mem_available_mb * 1024 * 1024
-                ram_data = self._generate_prometheus_metrics(
-                    self.PROMETHEUS_METRIC_MAP['host_ram_usage'],
+                self._add_prometheus_metrics(
+                    builder, self.PROMETHEUS_METRIC_MAP['host_ram_usage'],
                     metric_type='gauge',
                     labels=host_labels_ram,
                     start_value=mem_available_bytes,
                     inc_factor=0,
                     timestamp=timestamp)
-                self.prometheus_client.add_measures(ram_data)
 
                 # Generate host total memory data for a hypervisor
                 # unit is megabytes, total is obtained from hypervisor
@@ -862,14 +904,30 @@ class BaseInfraOptimScenarioTest(manager.ScenarioTest,
                 mem_total_mb = int(h['memory_mb'])
                 # metric is node_memory_MemTotal_bytes which is in bytes
                 mem_total_bytes = mem_total_mb * 1024 * 1024
-                ram_total_data = self._generate_prometheus_metrics(
-                    self.PROMETHEUS_METRIC_MAP['host_ram_total'],
+                self._add_prometheus_metrics(
+                    builder, self.PROMETHEUS_METRIC_MAP['host_ram_total'],
                     metric_type='gauge',
                     labels=host_labels_ram,
                     start_value=mem_total_bytes,
                     inc_factor=0,
                     timestamp=timestamp)
-                self.prometheus_client.add_measures(ram_total_data)
+
+        with self.prometheus_client.batch() as batch:
+            batch.add(builder.to_series())
+        self._log_prometheus_series()
+
+    def _log_prometheus_series(self):
+        """Log the number of series of the injected metrics."""
+        tracker = self.prometheus_client.series_tracker
+        if tracker is None:
+            return
+        try:
+            stored = self.prometheus_client.count_series()
+        except prometheus_lib.QUERY_ERRORS as e:
+            stored = f"unknown ({e})"
+        LOG.info(f"Injected metrics are stored in {stored} Prometheus "
+                 f"series, {tracker.live_series} of them tracked by the "
+                 "client.")
 
     def has_audit_succeeded(self, audit_uuid):
         _, audit = self.client.show_audit(audit_uuid)
@@ -895,22 +953,27 @@ class BaseInfraOptimScenarioTest(manager.ScenarioTest,
         return action_plan.get(
             'state') in self.ACTIONPLAN_FINISHED_STATES.values()
 
+    def _show_listed_action_plans(self, **kwargs):
+        _, action_plans = self.client.list_action_plans(**kwargs)
+        results = self.client.show_many(
+            'action_plans',
+            [ap['uuid'] for ap in action_plans['action_plans']])
+        for result in results:
+            if result.error:
+                raise result.error
+        return [result.body for result in results]
+
     def has_action_plans_finished(self):
-        _, action_plans = self.client.list_action_plans()
-        for ap in action_plans['action_plans']:
-            _, action_plan = self.client.show_action_plan(ap['uuid'])
+        for action_plan in self._show_listed_action_plans():
             if (action_plan.get('state') not in
                     self.ACTIONPLAN_FINISHED_STATES.values()):
                 return False
         return True
 
     def has_action_plans_recommended(self, audit_uuid=None):
-        _, action_plans = self.client.list_action_plans(audit_uuid=audit_uuid)
-        for ap in action_plans['action_plans']:
-            _, action_plan = self.client.show_action_plan(ap['uuid'])
-            if action_plan.get('state') == 'RECOMMENDED':
-                return True
-        return False
+        action_plans = self._show_listed_action_plans(audit_uuid=audit_uuid)
+        return any(action_plan.get('state') == 'RECOMMENDED'
+                   for action_plan in action_plans)
 
     def create_audit_template_for_strategy(self, goal_name=None,
                                            strategy_name=None):